@@ -19,38 +19,48 @@ class ArduinoInterface:
         self.server = server
         self.baudrate = baudrate
         self.serial_conn = None
+        self.port = None
         self.running = False
         self.emergency_active = False
         
+    @staticmethod
+    def list_receiver_ports():
+        """Serial ports that look like an ESP32/Arduino receiver."""
+        return [
+            port.device for port in serial.tools.list_ports.comports()
+            # Check for ESP32, Arduino, or common USB identifiers
+            if any(x in port.description for x in ['CP2102', 'CP2104', 'CH340', 'Arduino', 'USB', 'UART', 'ESP32'])
+        ]
+
     def find_arduino_port(self):
         """Auto-detect LoRa receiver serial port."""
-        ports = serial.tools.list_ports.comports()
-        for port in ports:
-            # Check for ESP32, Arduino, or common USB identifiers
-            if any(x in port.description for x in ['CP2102', 'CP2104', 'CH340', 'Arduino', 'USB', 'UART', 'ESP32']):
-                logger.info(f"Found device on port: {port.device} ({port.description})")
-                return port.device
+        ports = self.list_receiver_ports()
+        if ports:
+            logger.info("Found device on port: %s", ports[0])
+            return ports[0]
         return None
     
     async def connect(self, port=None):
         """Connect to LoRa receiver via serial."""
         try:
             if port is None:
-                port = self.find_arduino_port()
+                # Enumerating ports hits sysfs/udev; keep it off the event loop
+                port = await asyncio.to_thread(self.find_arduino_port)
             
             if port is None:
                 logger.warning("⚠️  No LoRa receiver found. System will work without RF demo.")
                 logger.warning("   Connect ESP32 receiver via USB for full C-V2X demo")
                 return False
             
-            self.serial_conn = serial.Serial(port, self.baudrate, timeout=1)
+            self.serial_conn = await asyncio.to_thread(serial.Serial, port, self.baudrate, timeout=1)
+            self.port = port
             await asyncio.sleep(2)  # Wait for ESP32/Arduino to reset
-            logger.info(f"📡 Connected to LoRa receiver on {port}")
+            logger.info("📡 Connected to LoRa receiver on %s", port)
             self.server.arduino_connected = True
             return True
             
         except Exception as e:
-            logger.error(f"Failed to connect to receiver: {e}")
+            logger.error("Failed to connect to receiver: %s", e)
             return False
     
     async def read_loop(self):
@@ -62,40 +72,60 @@ class ArduinoInterface:
         while self.running:
             try:
                 if self.serial_conn and self.serial_conn.in_waiting > 0:
-                    line = self.serial_conn.readline().decode('utf-8', errors='ignore').strip()
-                    
-                    # Log all serial output for debugging
-                    if line and not line.startswith("Message:") and not line.startswith("RSSI"):
-                        logger.debug(f"Serial: {line}")
-                    
-                    if line == "EMERGENCY_DETECTED":
-                        if not self.emergency_active:
-                            self.emergency_active = True
-                            logger.info("╔═══════════════════════════════════════════╗")
-                            logger.info("║  🚨 RF EMERGENCY DETECTED VIA LORA! 🚨   ║")
-                            logger.info("╚═══════════════════════════════════════════╝")
-                            logger.info("📡 LoRa receiver confirmed RF signal reception")
-                            logger.info("🎮 Initiating emergency takeover mode...")
-                            await self.server.trigger_lora_emergency()
-                        
-                    elif line == "EMERGENCY_CLEAR":
-                        if self.emergency_active:
-                            self.emergency_active = False
-                            logger.info("╔═══════════════════════════════════════════╗")
-                            logger.info("║  🟢 EMERGENCY CLEARED VIA LORA 🟢        ║")
-                            logger.info("╚═══════════════════════════════════════════╝")
-                            logger.info("📡 LoRa receiver confirmed clear signal")
-                            logger.info("🎮 Returning control to students...\n")
-                            await self.server.clear_lora_emergency()
-                    
-                    elif line == "RECEIVER_READY":
-                        logger.info("✅ LoRa receiver initialized and ready!")
+                    # Drain everything already buffered before sleeping: a 10 Hz
+                    # channel prints 40 lines/s, more than one line per poll keeps up with
+                    lines = await asyncio.to_thread(self.read_waiting_lines)
+                    for line in lines:
+                        await self.handle_line(line)
                         
                 await asyncio.sleep(0.05)  # 50ms poll rate
                 
+            except (serial.SerialException, OSError) as e:
+                # Unplugged: stop so the serial watcher can detach and wait for it to return
+                logger.error("Lost LoRa receiver: %s", e)
+                self.running = False
             except Exception as e:
-                logger.error(f"Error reading from receiver: {e}")
+                logger.error("Error reading from receiver: %s", e)
                 await asyncio.sleep(1)
+
+    def read_waiting_lines(self) -> list:
+        """Read every line already in the serial buffer (blocking; run in a thread)."""
+        lines = []
+        while self.serial_conn.in_waiting > 0:
+            # readline can wait up to the 1s serial timeout for a partial line
+            raw = self.serial_conn.readline()
+            lines.append(raw.decode('utf-8', errors='ignore').strip())
+        return lines
+
+    async def handle_line(self, line: str):
+        """Act on one line of receiver output."""
+        # Log all serial output for debugging
+        if line and not line.startswith("Message:") and not line.startswith("RSSI"):
+            logger.debug("Serial: %s", line)
+        
+        if line == "EMERGENCY_DETECTED":
+            # Latch only once the server takes it; an absorbed detection
+            # (e.g. just after a clear) must not hide the retransmits
+            if not self.emergency_active and await self.server.trigger_lora_emergency():
+                self.emergency_active = True
+                logger.info("╔═══════════════════════════════════════════╗")
+                logger.info("║  🚨 RF EMERGENCY DETECTED VIA LORA! 🚨   ║")
+                logger.info("╚═══════════════════════════════════════════╝")
+                logger.info("📡 LoRa receiver confirmed RF signal reception")
+                logger.info("🎮 Emergency takeover mode initiated")
+            
+        elif line == "EMERGENCY_CLEAR":
+            if self.emergency_active:
+                self.emergency_active = False
+                logger.info("╔═══════════════════════════════════════════╗")
+                logger.info("║  🟢 EMERGENCY CLEARED VIA LORA 🟢        ║")
+                logger.info("╚═══════════════════════════════════════════╝")
+                logger.info("📡 LoRa receiver confirmed clear signal")
+                logger.info("🎮 Returning control to students...\n")
+                await self.server.clear_lora_emergency()
+        
+        elif line == "RECEIVER_READY":
+            logger.info("✅ LoRa receiver initialized and ready!")
     
     def stop(self):
         """Stop the Arduino interface."""
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark takeover choreography planning.
+
+Plans a takeover for fleets of 1k to 50k vehicles at constant traffic
+density (the road grows with the fleet) and reports planning time, how many
+vehicles change lane, and a check that no two planned slots conflict. Then
+plans growing classes on the server's fixed 800 unit road, where lanes fill
+up and some vehicles have to hold their position.
+
+Usage: python3 bench_choreography.py
+"""
+
+import random
+
+from bench_utils import time_per_call
+from choreography import TakeoverChoreographer
+
+VEHICLE_COUNTS = [1000, 5000, 10000, 20000, 50000]
+SPACING = 60.0  # average distance between vehicles in a lane
+NUM_LANES = 3
+SERVER_ROAD_LENGTH = 800.0
+SERVER_CLASS_SIZES = [20, 60, 100, 200]
+
+def make_fleet(count: int, road_length: float) -> dict:
+    rng = random.Random(count)
+    return {
+        f'{i:08x}': {
+            'position_x': rng.uniform(0, road_length),
+            'current_lane': rng.randint(1, NUM_LANES),
+            'speed': 50
+        }
+        for i in range(count)
+    }
+
+def count_conflicts(plan: dict, gap: float, road_length: float) -> int:
+    """Count pairs of slotted vehicles in a target lane closer than ``gap`` on the looping road.
+
+    Sorted by target_x, the closest pair in a lane is always a neighbouring
+    one (counting the last and first as neighbours across the wrap point),
+    so checking those covers every pair.
+    """
+    lanes = {}
+    for instruction in plan.values():
+        if instruction['slot'] is not None:
+            lanes.setdefault(instruction['target_lane'], []).append(instruction['target_x'])
+    conflicts = 0
+    for xs in lanes.values():
+        xs.sort()
+        for front, back in zip(xs[1:] + xs[:1], xs):
+            spacing = (front - back) % road_length
+            if len(xs) > 1 and spacing < gap - 0.1:  # target_x is rounded to 0.1
+                conflicts += 1
+    return conflicts
+
+def plan_row(count: int, road_length: float) -> str:
+    fleet = make_fleet(count, road_length)
+    device_ids = list(fleet)
+    choreographer = TakeoverChoreographer(num_lanes=NUM_LANES, road_length=road_length)
+    repeat = max(3, 200000 // count)
+
+    seconds = time_per_call(lambda: choreographer.plan(0.0, 2, device_ids, fleet), repeat)
+    plan = choreographer.plan(0.0, 2, device_ids, fleet)
+    changes = sum(1 for i in plan.values() if i['action'] == 'change_lane')
+    holding = sum(1 for i in plan.values() if i['action'] == 'hold_position')
+    conflicts = count_conflicts(plan, choreographer.gap, road_length)
+    max_drop = max(i['drop_back'] for i in plan.values())
+    return (f'{count:>10}{road_length:>9.0f}{seconds * 1000:>10.2f}{seconds / count * 1e6:>12.2f}'
+            f'{changes:>14}{holding:>9}{max_drop:>10.0f}{conflicts:>11}')
+
+def main():
+    header = (f"{'vehicles':>10}{'road':>9}{'plan ms':>10}{'µs/vehicle':>12}{'lane changes':>14}"
+              f"{'holding':>9}{'max drop':>10}{'conflicts':>11}")
+    print("Constant density")
+    print(header)
+    for count in VEHICLE_COUNTS:
+        print(plan_row(count, count / NUM_LANES * SPACING))
+
+    print(f"\nServer road ({SERVER_ROAD_LENGTH:.0f} units)")
+    print(header)
+    for count in SERVER_CLASS_SIZES:
+        print(plan_row(count, SERVER_ROAD_LENGTH))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark message decode, validation and dispatch.
+
+Compares the original ``json.loads`` plus if/elif chain against the Codec
+with compiled schemas and a dict handler registry, for each JSON backend
+that is installed.
+
+Usage: python3 bench_codec.py
+"""
+
+import json
+
+from bench_utils import time_per_call
+from codec import Codec
+
+REPEAT = 20000
+
+MESSAGES = {
+    'position_update': {'type': 'position_update', 'device_id': 'a1b2c3d4',
+                        'position': {'x': 312.5, 'y': 75, 'speed': 52.1}},
+    'lane_change': {'type': 'lane_change', 'device_id': 'a1b2c3d4', 'new_lane': 3, 'reason': 'manual'},
+    'register_user': {'type': 'register_user', 'name': 'Student', 'color': '#3498db', 'role': 'student'},
+    'clear_emergency': {'type': 'clear_emergency', 'device_id': 'a1b2c3d4', 'source': 'vehicle'},
+}
+
+def noop(device_id, data):
+    return None
+
+def legacy_dispatch(raw):
+    data = json.loads(raw)
+    message_type = data.get('type')
+    if message_type == 'register_user':
+        return noop(data.get('device_id'), data)
+    if message_type == 'register_emergency' or message_type == 'register':
+        return noop(data.get('device_id'), data)
+    elif message_type == 'clear_emergency':
+        return noop(data.get('device_id'), data)
+    elif message_type == 'position_update':
+        return noop(data.get('device_id'), data)
+    elif message_type == 'lane_change':
+        return noop(data.get('device_id'), data)
+
+def make_codec_dispatch(codec):
+    handlers = {name: noop for name in ('register_user', 'register_emergency', 'register',
+                                        'clear_emergency', 'position_update', 'lane_change')}
+
+    def dispatch(raw):
+        data = codec.decode(raw)
+        handler = handlers.get(data['type'])
+        if handler:
+            return handler(data.get('device_id'), data)
+    return dispatch
+
+def main():
+    runners = [('json + if/elif (no validation)', legacy_dispatch)]
+    for backend in ('json', 'orjson'):
+        codec = Codec(backend=backend)
+        if codec.backend == backend:
+            runners.append((f'{backend} codec + schema + dict', make_codec_dispatch(codec)))
+
+    print(f"{'message':<18}" + ''.join(f'{name:>36}' for name, _ in runners))
+    for name, message in MESSAGES.items():
+        raw = json.dumps(message)
+        row = f'{name:<18}'
+        for _, dispatch in runners:
+            row += f'{time_per_call(lambda: dispatch(raw), REPEAT) * 1e6:>33.2f} µs'
+        print(row)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark the CPU and bandwidth trade-off of per-message-class compression.
+
+Encodes a stream of realistic messages of each class through the
+permessage-deflate extension with compression always on (with and without
+context takeover) and with the adaptive per-class policy.
+
+Usage: python3 bench_compression.py
+"""
+
+import json
+import time
+
+from websockets import frames
+
+from bench_utils import make_device_states, make_roster
+from compression import CompressionPolicy, SelectivePerMessageDeflate
+
+STREAM_LENGTH = 50
+
+def position_stream(count):
+    states = make_device_states(1)
+    state = states['00000000']
+    for i in range(count):
+        state['position_x'] = (state['position_x'] + 7) % 800
+        yield json.dumps({'type': 'position_update', 'device_id': state['device_id'], 'position': state})
+
+def system_state_stream(vehicles):
+    def stream(count):
+        states = make_device_states(vehicles)
+        for i in range(count):
+            for state in states.values():
+                state['position_x'] = (state['position_x'] + 3) % 800
+            yield json.dumps({
+                'type': 'system_state',
+                'devices': states,
+                'emergency_status': {'active': False, 'active_emergency_device': None}
+            })
+    return stream
+
+def roster_stream(students):
+    def stream(count):
+        for i in range(count):
+            yield json.dumps({'type': 'roster_update', 'roster': make_roster(students)})
+    return stream
+
+CASES = [
+    ('position_update', '1 vehicle', position_stream),
+    ('system_state', '10 vehicles', system_state_stream(10)),
+    ('system_state', '100 vehicles', system_state_stream(100)),
+    ('system_state', '1000 vehicles', system_state_stream(1000)),
+    ('roster_update', '10 students', roster_stream(10)),
+    ('roster_update', '60 students', roster_stream(60)),
+    ('roster_update', '500 students', roster_stream(500)),
+]
+
+def make_extension(policy, always_compress):
+    if always_compress:
+        policy = CompressionPolicy(classes={}, default_min_size=0,
+                                   context_takeover=policy.context_takeover)
+    no_takeover = not policy.context_takeover
+    return SelectivePerMessageDeflate(
+        policy, False, no_takeover, policy.window_bits, policy.window_bits,
+        {'memLevel': policy.mem_level}
+    )
+
+def run_case(message_class, messages, extension):
+    """Return (average wire bytes, microseconds per message)."""
+    total_bytes = 0
+    start = time.perf_counter()
+    for message in messages:
+        if extension is not None:
+            extension.message_class = message_class
+            frame = extension.encode(frames.Frame(frames.OP_TEXT, message))
+            total_bytes += len(frame.data)
+        else:
+            total_bytes += len(message)
+    elapsed = time.perf_counter() - start
+    return total_bytes / len(messages), elapsed / len(messages) * 1e6
+
+def main():
+    modes = [
+        ('raw', lambda: None),
+        ('deflate', lambda: make_extension(CompressionPolicy(), True)),
+        ('deflate-no-ctx', lambda: make_extension(CompressionPolicy(context_takeover=False), True)),
+        ('adaptive', lambda: make_extension(CompressionPolicy(), False)),
+    ]
+
+    print(f"{'class':<16}{'size':<15}" + ''.join(f'{name:>24}' for name, _ in modes))
+    print(f"{'':<31}" + ''.join(f"{'bytes/msg    µs/msg':>24}" for _ in modes))
+    for message_class, label, stream in CASES:
+        messages = [m.encode() for m in stream(STREAM_LENGTH)]
+        row = f'{message_class:<16}{label:<15}'
+        for name, make in modes:
+            avg_bytes, us = run_case(message_class, messages, make())
+            row += f'{avg_bytes:>14.0f}{us:>10.1f}'
+        print(row)
+
+if __name__ == '__main__':
+    main()
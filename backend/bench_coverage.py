@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Benchmark segment-scoped fan-out.
+
+Places vehicles uniformly along the road and reports, for each segment
+length, how many vehicles an emergency reaches and how long resolving the
+recipient set takes.
+
+Usage: python3 bench_coverage.py
+"""
+
+import random
+
+from bench_utils import time_per_call
+from rsu_coverage import CoverageMap
+
+VEHICLES = 10000
+ROAD_LENGTH = 800
+SEGMENT_LENGTHS = [800, 400, 200, 100, 50]
+
+def main():
+    rng = random.Random(7)
+    positions = {f'{i:08x}': rng.uniform(0, ROAD_LENGTH) for i in range(VEHICLES)}
+    probe_ids = rng.sample(list(positions), 100)
+
+    print(f"{VEHICLES} vehicles on a {ROAD_LENGTH} unit road")
+    print(f"{'segment length':>16}{'segments':>10}{'avg fan-out':>14}{'% of fleet':>12}{'µs/scope':>10}")
+    for segment_length in SEGMENT_LENGTHS:
+        coverage = CoverageMap(road_length=ROAD_LENGTH, segment_length=segment_length)
+        for device_id, x in positions.items():
+            coverage.place(device_id, x)
+
+        fan_out = sum(len(coverage.recipients_near(d)) for d in probe_ids) / len(probe_ids)
+        per_scope = time_per_call(lambda: [coverage.recipients_near(d) for d in probe_ids], 20) / len(probe_ids)
+        print(f'{segment_length:>16}{len(coverage.segments):>10}{fan_out:>14.0f}'
+              f'{fan_out / VEHICLES * 100:>11.1f}%{per_scope * 1e6:>10.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Benchmark the position traffic saved by dead reckoning.
+
+Simulates a fleet driving a steady highway for a minute at a 20 Hz position
+sample rate. Speeds jitter slightly and change now and then. Compares
+reporting every sample with reporting only when the shared prediction drifts
+past the threshold, and measures how far the server's extrapolated position
+is from the truth.
+
+Usage: python3 bench_dead_reckoning.py
+"""
+
+import json
+import random
+
+from dead_reckoning import DeadReckoning, DeadReckoningSender
+
+VEHICLES = 200
+DURATION = 60.0  # seconds
+SAMPLE_RATE = 20  # Hz, how often a client samples its own position
+ROAD_LENGTH = 800
+THRESHOLDS = [2.0, 5.0, 10.0]
+
+def simulate(threshold: float = None) -> dict:
+    rng = random.Random(1)
+    dt = 1 / SAMPLE_RATE
+    server = DeadReckoning(road_length=ROAD_LENGTH, threshold=threshold or 0, max_silence=5.0)
+    senders = [DeadReckoningSender(threshold or 0, 5.0, ROAD_LENGTH) for _ in range(VEHICLES)]
+    xs = [rng.uniform(0, ROAD_LENGTH) for _ in range(VEHICLES)]
+    speeds = [rng.uniform(45, 55) for _ in range(VEHICLES)]
+
+    sent = 0
+    errors = []
+    steps = int(DURATION * SAMPLE_RATE)
+    for step in range(steps):
+        now = step * dt
+        for i in range(VEHICLES):
+            if rng.random() < dt / 10:  # a speed change every ~10s
+                speeds[i] = max(20.0, speeds[i] + rng.uniform(-10, 10))
+            speed = speeds[i] + rng.gauss(0, 0.5)  # cruise control wobble
+            xs[i] = (xs[i] + speed * dt) % ROAD_LENGTH
+            device_id = str(i)
+
+            if threshold is None or senders[i].should_send(xs[i], speed, now):
+                server.report(device_id, xs[i], speed, now)
+                sent += 1
+            error = abs(server.predict(device_id, now) - xs[i])
+            errors.append(min(error, ROAD_LENGTH - error))
+
+    errors.sort()
+    return {
+        'updates_per_vehicle_s': sent / VEHICLES / DURATION,
+        'mean_error': sum(errors) / len(errors),
+        'p99_error': errors[int(len(errors) * 0.99)],
+        'max_error': errors[-1],
+        'sent': sent
+    }
+
+def main():
+    frame = json.dumps({'type': 'position_update', 'device_id': 'a1b2c3d4',
+                        'position': {'x': 312.5, 'y': 75, 'speed': 52.1}})
+    print(f"{VEHICLES} vehicles, {DURATION:.0f}s at {SAMPLE_RATE} Hz, ~{len(frame)} byte frames")
+    print(f"{'mode':<18}{'updates/veh/s':>15}{'reduction':>11}{'upstream KB':>13}"
+          f"{'mean err':>10}{'p99 err':>9}{'max err':>9}")
+    baseline = simulate(None)
+    rows = [('every sample', baseline)] + [(f'DR threshold {t:g}', simulate(t)) for t in THRESHOLDS]
+    for name, result in rows:
+        reduction = baseline['sent'] / result['sent']
+        print(f"{name:<18}{result['updates_per_vehicle_s']:>15.2f}{reduction:>10.1f}x"
+              f"{result['sent'] * len(frame) / 1024:>13.0f}{result['mean_error']:>10.2f}"
+              f"{result['p99_error']:>9.2f}{result['max_error']:>9.2f}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark DeviceState memory and snapshot throughput.
+
+Reports bytes per vehicle and ``get_all_devices_state`` snapshots per second
+at 1k, 10k and 100k vehicles, for the slotted DeviceState and for the
+previous dataclass + ``asdict`` implementation.
+
+Usage: python3 bench_device_state.py
+"""
+
+import random
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+from device_manager import DeviceManager, DeviceState, LanePosition, VehicleType
+
+VEHICLE_COUNTS = [1000, 10000, 100000]
+
+@dataclass
+class DataclassDeviceState:
+    """The previous DeviceState, kept here for comparison."""
+    device_id: str
+    vehicle_type: VehicleType
+    current_lane: LanePosition
+    position_x: float
+    position_y: float
+    speed: float
+    is_emergency_active: bool = False
+    connection_status: str = "connected"
+
+    def to_dict(self) -> dict:
+        return {
+            **asdict(self),
+            'vehicle_type': self.vehicle_type.value,
+            'current_lane': self.current_lane.value,
+            'connection_status': self.connection_status
+        }
+
+def build_devices(state_class, count: int) -> dict:
+    rng = random.Random(42)
+    device_ids = [f'{i:032x}' for i in range(count)]
+    tracemalloc.start()
+    devices = {}
+    for device_id in device_ids:
+        lane = rng.choice(list(LanePosition))
+        devices[device_id] = state_class(
+            device_id=device_id,
+            vehicle_type=rng.choice(list(VehicleType)),
+            current_lane=lane,
+            position_x=rng.uniform(0, 800),
+            position_y=lane.value * 50.0,
+            speed=rng.uniform(0.8, 1.2)
+        )
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return devices, allocated / count
+
+def snapshots_per_second(manager: DeviceManager, min_time: float = 1.0) -> float:
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < min_time:
+        manager.get_all_devices_state()
+        count += 1
+    return count / (time.perf_counter() - start)
+
+def main():
+    print(f"{'vehicles':>10}{'state type':>14}{'bytes/vehicle':>16}{'snapshots/s':>14}")
+    for count in VEHICLE_COUNTS:
+        for name, state_class in [('dataclass', DataclassDeviceState), ('slots', DeviceState)]:
+            manager = DeviceManager()
+            manager.devices, bytes_per_vehicle = build_devices(state_class, count)
+            rate = snapshots_per_second(manager)
+            print(f'{count:>10}{name:>14}{bytes_per_vehicle:>16.0f}{rate:>14.1f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Benchmark broadcast fan-out on the stdlib asyncio loop vs uvloop.
+
+Starts a server in-process, connects N real WebSocket clients over
+localhost and broadcasts a burst of lane change frames to all of them,
+reporting delivered frames per second and the loop lag the watchdog saw
+during the burst. Clients share the server's loop, so both ends of every
+frame are on the loop being measured. The uvloop rows are skipped if
+uvloop is not installed.
+
+Usage: python3 bench_event_loop.py
+"""
+
+import asyncio
+import logging
+import time
+
+import websockets
+
+from loop_watchdog import LoopWatchdog
+from main import SimpleVehicleServer
+
+CLIENT_COUNTS = [50, 200, 500]
+MESSAGES = 200
+PORT = 8950
+
+async def fan_out(clients: int) -> dict:
+    server = SimpleVehicleServer(port=PORT)
+    watchdog = LoopWatchdog(interval=0.01, threshold=1.0)
+    async with websockets.serve(server.connection_handler, 'localhost', PORT, compression=None):
+        sockets = [await websockets.connect(f'ws://localhost:{PORT}', compression=None)
+                   for _ in range(clients)]
+        while len(server.outbound) < clients:
+            await asyncio.sleep(0.01)
+
+        async def drain(websocket):
+            received = 0
+            while received < MESSAGES:
+                if '"lane_change"' in await websocket.recv():
+                    received += 1
+
+        watchdog.start()
+        start = time.perf_counter()
+        receivers = [asyncio.create_task(drain(ws)) for ws in sockets]
+        for i in range(MESSAGES):
+            await server.broadcast_message({'type': 'lane_change', 'device_id': 'bench', 'new_lane': i % 3 + 1})
+            await asyncio.sleep(0)
+        await asyncio.gather(*receivers)
+        elapsed = time.perf_counter() - start
+        watchdog.stop()
+
+        for websocket in sockets:
+            await websocket.close()
+    return {'elapsed': elapsed, 'lag': watchdog.to_dict()}
+
+def run_mode(policy, clients: int) -> dict:
+    asyncio.set_event_loop_policy(policy)
+    try:
+        return asyncio.run(fan_out(clients))
+    finally:
+        asyncio.set_event_loop_policy(None)
+
+def main():
+    logging.disable(logging.WARNING)
+    modes = [('asyncio', asyncio.DefaultEventLoopPolicy())]
+    try:
+        import uvloop
+        modes.append(('uvloop', uvloop.EventLoopPolicy()))
+    except ImportError:
+        print('uvloop not installed - install it to compare (pip install uvloop)')
+
+    print(f"{MESSAGES} broadcast frames per run")
+    print(f"{'loop':<9}{'clients':>8}{'seconds':>10}{'frames/s':>12}{'lag p99 ms':>12}{'lag max ms':>12}")
+    for clients in CLIENT_COUNTS:
+        for name, policy in modes:
+            result = run_mode(policy, clients)
+            rate = clients * MESSAGES / result['elapsed']
+            print(f"{name:<9}{clients:>8}{result['elapsed']:>10.2f}{rate:>12,.0f}"
+                  f"{result['lag']['p99_ms']:>12.1f}{result['lag']['max_ms']:>12.1f}")
+
+if __name__ == '__main__':
+    main()
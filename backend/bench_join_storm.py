@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Benchmark a classroom join storm.
+
+Replays 500 clients connecting over one second, each registering a name
+shortly after connecting, against in-memory outbound queues. Compares
+announcing every join and re-broadcasting the full roster on every
+registration (window 0) with batched joins and roster deltas, and checks
+every client ends up with the server's roster. Wall time includes the fake
+clients parsing every roster frame they receive.
+
+Usage: python3 bench_join_storm.py
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+
+from main import SimpleVehicleServer
+
+CLIENTS = 500
+ARRIVAL_SPREAD = 1.0  # seconds over which the class connects
+REGISTER_DELAY = 0.05  # seconds from connecting to sending register_user
+WINDOWS = [0, 0.05, 0.1, 0.25]
+
+class CountingQueue:
+    """Stands in for OutboundQueue: counts frames and applies roster updates."""
+
+    def __init__(self, totals: dict):
+        self.totals = totals
+        self.roster = {}
+
+    def put(self, message_type: str, message: str, key=None):
+        self.totals['frames'] += 1
+        self.totals['bytes'] += len(message)
+        if message_type == 'roster_update':
+            data = json.loads(message)
+            self.roster = data['roster'] if 'roster' in data else {**self.roster, **data['changes']}
+
+    def close(self):
+        pass
+
+async def storm(window: float) -> dict:
+    server = SimpleVehicleServer()
+    server.join_batcher.window = window
+    totals = {'frames': 0, 'bytes': 0}
+    queues = {}
+    rng = random.Random(7)
+
+    async def client(i: int):
+        await asyncio.sleep(rng.uniform(0, ARRIVAL_SPREAD))
+        device_id = await server.register_device(object())
+        server.sessions.create(device_id)
+        queues[device_id] = server.outbound[device_id] = CountingQueue(totals)
+        await asyncio.sleep(REGISTER_DELAY)
+        await server._handle_register_user(device_id, {'type': 'register_user', 'name': f'Student {i}'})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(CLIENTS)))
+    await asyncio.sleep(window + 0.05)  # let the last batch flush
+    elapsed = time.perf_counter() - start - window - 0.05
+    consistent = sum(1 for queue in queues.values() if queue.roster == server.roster)
+    return {**totals, 'elapsed': elapsed, 'consistent': consistent}
+
+def main():
+    logging.disable(logging.WARNING)
+    print(f"{CLIENTS} clients joining over {ARRIVAL_SPREAD:.0f}s")
+    print(f"{'window s':>9}{'frames':>11}{'MB sent':>10}{'frames/client':>15}{'wall s':>8}{'rosters ok':>12}")
+    for window in WINDOWS:
+        result = asyncio.run(storm(window))
+        print(f"{window:>9}{result['frames']:>11,}{result['bytes'] / 1e6:>10.1f}"
+              f"{result['frames'] / CLIENTS:>15.1f}{result['elapsed']:>8.2f}"
+              f"{result['consistent']:>8}/{CLIENTS}")
+
+if __name__ == '__main__':
+    main()
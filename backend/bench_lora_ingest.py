@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark LoRa serial ingestion latency.
+
+Runs lora_simulator.py's channel on a pty at several packet rates (four
+serial lines per packet), attaches an ArduinoInterface to it and measures
+how long after the simulator writes them the first EMERGENCY_DETECTED and
+the EMERGENCY_CLEAR reach the server, reading one line per poll (the old
+loop) and draining the buffer on each poll.
+
+Usage: python3 bench_lora_ingest.py
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+
+import serial
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from lora_simulator import LoRaChannelSimulator  # noqa: E402
+
+from arduino_interface import ArduinoInterface  # noqa: E402
+
+RATES = [5, 10, 20]  # packets per second while the emergency is active
+ACTIVE_TIME = 4.0
+TIMEOUT = 30.0
+
+class TimedSimulator(LoRaChannelSimulator):
+    """Notes when the first emergency packet and the clear were written."""
+
+    first_sent = None
+    clear_sent = None
+
+    def receive(self, status):
+        now = time.monotonic()
+        if status == 'CLEAR':
+            self.clear_sent = now
+        elif self.first_sent is None:
+            self.first_sent = now
+        super().receive(status)
+
+class RecordingServer:
+    """Stands in for the server: notes when the receiver's events arrive."""
+
+    def __init__(self):
+        self.arduino_connected = True
+        self.triggered_at = None
+        self.cleared_at = None
+
+    async def trigger_lora_emergency(self) -> bool:
+        self.triggered_at = time.monotonic()
+        return True
+
+    async def clear_lora_emergency(self):
+        self.cleared_at = time.monotonic()
+
+async def ingest(rate: float, drain: bool) -> tuple:
+    simulator = TimedSimulator(rate=rate, active_time=ACTIVE_TIME, idle_time=0.5, seed=int(rate))
+    port = simulator.open()
+    server = RecordingServer()
+    interface = ArduinoInterface(server)
+    interface.serial_conn = serial.Serial(port, interface.baudrate, timeout=1)
+    if not drain:
+        interface.read_waiting_lines = lambda: [interface.serial_conn.readline().decode(errors='ignore').strip()]
+
+    reader = asyncio.create_task(interface.read_loop())
+    threading.Thread(target=simulator.run, kwargs={'cycles': 1}, daemon=True).start()
+    deadline = time.monotonic() + ACTIVE_TIME + TIMEOUT
+    while server.cleared_at is None and time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+    interface.running = False
+    await reader
+    interface.stop()
+    simulator.close()
+
+    trigger_ms = (server.triggered_at - simulator.first_sent) * 1000 if server.triggered_at else None
+    clear_ms = (server.cleared_at - simulator.clear_sent) * 1000 if server.cleared_at else None
+    return trigger_ms, clear_ms, simulator.lines
+
+def ms(value) -> str:
+    return f'{value:.0f}' if value is not None else 'lost'
+
+def main():
+    logging.disable(logging.WARNING)
+    print(f"{ACTIVE_TIME:.0f}s emergency, then clear")
+    print(f"{'rate Hz':>8}{'lines/s':>9}{'read':>14}{'trigger ms':>12}{'clear ms':>10}")
+    for rate in RATES:
+        for drain in (False, True):
+            trigger_ms, clear_ms, lines = asyncio.run(ingest(rate, drain))
+            print(f"{rate:>8}{rate * 4:>9}{'drain buffer' if drain else 'line per poll':>14}"
+                  f"{ms(trigger_ms):>12}{ms(clear_ms):>10}")
+
+if __name__ == '__main__':
+    main()
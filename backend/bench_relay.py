@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark emergency propagation across linked server nodes.
+
+Starts N local servers linked as a chain and as a binary tree, raises an
+emergency on the root node and reports the time until every node has
+applied it, along with per-hop latency and duplicate deliveries.
+
+Usage: python3 bench_relay.py
+"""
+
+import asyncio
+import logging
+import time
+
+import websockets
+
+from main import SimpleVehicleServer
+
+NODE_COUNTS = [2, 4, 8, 16]
+BASE_PORT = 8900
+ROUNDS = 5
+
+def chain_parent(i):
+    return i - 1
+
+def tree_parent(i):
+    return (i - 1) // 2
+
+async def run_topology(count: int, parent_of) -> dict:
+    servers = []
+    for i in range(count):
+        peers = [f'ws://localhost:{BASE_PORT + parent_of(i)}'] if i > 0 else []
+        servers.append(SimpleVehicleServer(port=BASE_PORT + i, node_id=f'node-{i}', relay_peers=peers))
+
+    listeners = [await websockets.serve(s.connection_handler, 'localhost', s.port) for s in servers]
+    for server in servers:
+        server.relay.max_hops = count  # a 16-node chain needs more than the default 8 hops
+        server.relay.start()
+    while sum(len(s.relay.links) for s in servers) < 2 * (count - 1):
+        await asyncio.sleep(0.01)
+
+    propagation = []
+    for round_index in range(ROUNDS):
+        arrived = asyncio.Event()
+        reached = set()
+
+        def on_event(envelope, node=None):
+            reached.add(node)
+            if len(reached) == count - 1:
+                arrived.set()
+
+        for server in servers[1:]:
+            server.relay.on_event = lambda envelope, node=server.relay.node_id: on_event(envelope, node)
+
+        start = time.perf_counter()
+        await servers[0].trigger_emergency(f'ev-{round_index}', source='vehicle')
+        await asyncio.wait_for(arrived.wait(), timeout=5)
+        propagation.append(time.perf_counter() - start)
+        await servers[0].clear_emergency(f'ev-{round_index}')
+        await asyncio.sleep(0.05)
+
+    stats = [s.relay.get_stats() for s in servers[1:]]
+    for server in servers:
+        server.relay.stop()
+        server.timers.stop()
+    for listener in listeners:
+        listener.close()
+        await listener.wait_closed()
+
+    hop_samples = [st['hop_latency_ms']['avg'] for st in stats if st['hop_latency_ms']['count']]
+    return {
+        'propagation_ms': sum(propagation) / len(propagation) * 1000,
+        'hop_ms': sum(hop_samples) / len(hop_samples) if hop_samples else 0.0,
+        'max_e2e_ms': max(st['end_to_end_latency_ms']['max'] for st in stats),
+        'duplicates': sum(st['duplicates'] for st in stats)
+    }
+
+async def main():
+    logging.disable(logging.INFO)
+    print(f"{'topology':<10}{'nodes':>7}{'propagation ms':>17}{'hop ms':>10}{'max e2e ms':>13}{'duplicates':>12}")
+    for name, parent_of in [('chain', chain_parent), ('tree', tree_parent)]:
+        for count in NODE_COUNTS:
+            result = await run_topology(count, parent_of)
+            print(f"{name:<10}{count:>7}{result['propagation_ms']:>17.2f}{result['hop_ms']:>10.3f}"
+                  f"{result['max_e2e_ms']:>13.2f}{result['duplicates']:>12}")
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Benchmark initial vehicle placement.
+
+Fills roads of growing length to capacity, then churns the fleet (a random
+vehicle leaves and a new one joins, five times the fleet size) and reports
+the cost per allocate/release and how many pairs of vehicles in a lane sit
+closer than a car length, next to the old ``len(device_states)`` modulo
+placement under the same churn. Then fills the server's 800 unit road with
+growing classes and reports how many vehicles find it full.
+
+Usage: python3 bench_slot_allocator.py
+"""
+
+import bisect
+import itertools
+import random
+
+from bench_utils import time_per_call
+from slot_allocator import SlotAllocator
+
+ROAD_LENGTHS = [800, 8000, 40000, 160000]
+NUM_LANES = 3
+CAR_LENGTH = 40.0  # choreography gap and frontend sprite length
+SERVER_ROAD_LENGTH = 800
+CLASS_SIZES = [20, 48, 60, 61, 100]
+
+def close_pairs(places: list, road_length: float) -> int:
+    """Count pairs of vehicles in the same lane less than a car length apart on the looping road."""
+    lanes = {}
+    for lane, x in places:
+        lanes.setdefault(lane, []).append(x % road_length)
+    pairs = 0
+    for xs in lanes.values():
+        xs.sort()
+        unrolled = xs + [x + road_length for x in xs]  # so pairs across the wrap point are seen
+        for i, x in enumerate(xs):
+            end = bisect.bisect_left(unrolled, x + CAR_LENGTH, i + 1, i + len(xs))
+            pairs += end - i - 1
+    return pairs
+
+def legacy_place(n: int, road_length: float) -> tuple:
+    return (n % NUM_LANES) + 1, (n * 150) % road_length
+
+def legacy_churn(count: int, road_length: float, rounds: int, rng: random.Random) -> int:
+    """Same churn with the old placement, which keys on the current vehicle count."""
+    places = [legacy_place(n, road_length) for n in range(count)]
+    for _ in range(rounds):
+        places.pop(rng.randrange(len(places)))
+        places.append(legacy_place(len(places), road_length))
+    return close_pairs(places, road_length)
+
+new_ids = (f'{n:08x}' for n in itertools.count(10 ** 6))
+
+def churn(allocator: SlotAllocator, rounds: int, rng: random.Random) -> int:
+    """Release and re-admit random vehicles, returning how many pairs end up too close."""
+    device_ids = list(allocator.owners)
+    for _ in range(rounds):
+        index = rng.randrange(len(device_ids))
+        allocator.release(device_ids[index])
+        device_ids[index] = next(new_ids)
+        allocator.allocate(device_ids[index])
+    places = [allocator.allocate(device_id) for device_id in device_ids]
+    return close_pairs(places, allocator.road_length)
+
+def main():
+    print(f"{'road':>8}{'slots':>8}{'fill µs/veh':>13}{'churn µs':>10}{'too close':>11}{'legacy too close':>18}")
+    for road_length in ROAD_LENGTHS:
+        allocator = SlotAllocator(road_length=road_length, num_lanes=NUM_LANES, spacing=CAR_LENGTH)
+        capacity = allocator.capacity
+
+        def fill():
+            fresh = SlotAllocator(road_length=road_length, num_lanes=NUM_LANES, spacing=CAR_LENGTH)
+            for i in range(capacity):
+                fresh.allocate(f'{i:08x}')
+        fill_seconds = time_per_call(fill, 5) / capacity
+
+        for i in range(capacity):
+            allocator.allocate(f'{i:08x}')
+        rng = random.Random(road_length)
+        rounds = capacity * 5
+        churn_seconds = time_per_call(lambda: churn(allocator, rounds, rng), 1) / rounds
+        too_close = churn(allocator, rounds, rng)
+        print(f"{road_length:>8}{capacity:>8}{fill_seconds * 1e6:>13.2f}{churn_seconds * 1e6:>10.2f}"
+              f"{too_close:>11}{legacy_churn(capacity, road_length, rounds, rng):>18}")
+
+    print(f"\n{SERVER_ROAD_LENGTH} unit road, one slot per {CAR_LENGTH:.0f} unit car")
+    print(f"{'class':>7}{'placed':>8}{'road full':>11}{'too close':>11}")
+    for size in CLASS_SIZES:
+        allocator = SlotAllocator(road_length=SERVER_ROAD_LENGTH, num_lanes=NUM_LANES, spacing=CAR_LENGTH)
+        places = [place for place in (allocator.allocate(f'{i:08x}') for i in range(size)) if place]
+        print(f"{size:>7}{len(places):>8}{allocator.overflows:>11}{close_pairs(places, SERVER_ROAD_LENGTH):>11}")
+
+if __name__ == '__main__':
+    main()
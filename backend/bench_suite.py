@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+In-process microbenchmark suite for the backend hot paths.
+
+Drives SimpleVehicleServer, WebSocketHandler, DeviceManager and
+EmergencyResponseSystem against in-memory fake sockets (no ports, no
+running server) at 10 to 10k vehicles, and measures broadcast fan-out,
+state snapshots, handle_message and simulation ticks. Results are saved as
+JSON; pass --compare with an earlier file to flag regressions (exit status
+1, as for a case that times out). Each figure is the fastest of several
+rounds, but on a shared or single-core machine compare runs made back to
+back.
+
+Usage: python3 bench_suite.py [--sizes 10 100 1000 10000] [--output results.json]
+                              [--compare baseline.json] [--threshold 0.25]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from device_manager import DeviceManager
+from emergency_system import EmergencyResponseSystem
+from main import SimpleVehicleServer
+from path_clearing import np
+from websocket_handler import WebSocketHandler
+
+SIZES = [10, 100, 1000, 10000]
+ROUNDS = 5  # each case reports its fastest round
+BROADCAST_CHUNK = 256  # broadcasts queued between yields, well under the 1024-frame control lane limit
+RESULTS_DIR = 'bench_results'
+
+class FakeWebSocket:
+    """Just enough of a websockets connection for the server: counts what is sent."""
+
+    def __init__(self):
+        self.path = '/'
+        self.request = None
+        self.extensions = ()
+        self.frames = 0
+        self.bytes = 0
+
+    async def send(self, message):
+        self.frames += 1
+        self.bytes += len(message)
+
+    async def ping(self):
+        waiter = asyncio.get_running_loop().create_future()
+        waiter.set_result(None)
+        return waiter
+
+    async def close(self, code: int = 1000, reason: str = ''):
+        pass
+
+def repeat_for(count: int, budget: int = 200000, minimum: int = 5) -> int:
+    """Iterations so each case does roughly ``budget`` vehicle-operations."""
+    return max(minimum, budget // count)
+
+def position_message(device_id: str, rng: random.Random) -> str:
+    return json.dumps({'type': 'position_update', 'device_id': device_id,
+                       'position': {'x': rng.uniform(0, 800), 'y': 75, 'speed': 50}})
+
+async def server_with_fleet(count: int):
+    """A SimpleVehicleServer with ``count`` vehicles attached to fake sockets."""
+    server = SimpleVehicleServer()
+    sockets = {}
+    for _ in range(count):
+        websocket = FakeWebSocket()
+        device_id = await server.register_device(websocket)
+        server.sessions.create(device_id)
+        server.attach_outbound(device_id, websocket)
+        sockets[device_id] = websocket
+    await asyncio.sleep(server.join_batcher.window + 0.05)  # flush the join batch
+    return server, sockets
+
+async def drained(sockets: dict, frames: int, timeout: float = 30.0):
+    """Wait until every fake socket has received ``frames`` frames.
+
+    Raises TimeoutError if they have not after ``timeout`` seconds, so a
+    delivery bug fails the case instead of hanging the suite.
+    """
+    deadline = time.perf_counter() + timeout
+    while any(websocket.frames < frames for websocket in sockets.values()):
+        if time.perf_counter() > deadline:
+            short = sum(1 for websocket in sockets.values() if websocket.frames < frames)
+            raise TimeoutError(f'{short} sockets still short of {frames} frames after {timeout:.0f}s')
+        await asyncio.sleep(0)
+
+async def best_of(step, repeat: int, rounds: int = ROUNDS) -> float:
+    """Seconds per ``await step(i)`` call, fastest of ``rounds`` runs of ``repeat`` calls.
+
+    Like timeit, the garbage collector is off while timing.
+    """
+    best = float('inf')
+    for round_index in range(rounds):
+        offset = round_index * repeat  # keeps per-call IDs unique across rounds
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            for i in range(offset, offset + repeat):
+                await step(i)
+            best = min(best, (time.perf_counter() - start) / repeat)
+        finally:
+            gc.enable()
+        await asyncio.sleep(0)  # let writer tasks drain between rounds
+    return best
+
+def result(repeat: int, seconds: float, **extra) -> dict:
+    return {'ops': repeat, 'us_per_op': seconds * 1e6, **extra}
+
+LANE_CHANGE = {'type': 'lane_change', 'device_id': 'bench', 'new_lane': 2, 'reason': 'bench'}
+
+def lane_change(i: int) -> dict:
+    """A lane change from a different vehicle each time, so queued frames are never superseded."""
+    return {**LANE_CHANGE, 'device_id': f'bench-{i}'}
+
+async def case_server_broadcast(count: int) -> dict:
+    server, sockets = await server_with_fleet(count)
+    repeat = repeat_for(count)
+    seconds = await best_of(lambda i: server.broadcast_message(lane_change(i)), repeat)
+
+    # End to end: until every writer task has handed its frames to the socket
+    await drained(sockets, min(websocket.frames for websocket in sockets.values()))
+    target = max(websocket.frames for websocket in sockets.values()) + repeat
+    start = time.perf_counter()
+    for i in range(repeat):
+        await server.broadcast_message(lane_change(i))
+        if i % BROADCAST_CHUNK == BROADCAST_CHUNK - 1:
+            await asyncio.sleep(0)  # let the writers drain, as between real handler calls
+    await drained(sockets, target)
+    return result(repeat, seconds, delivered_per_s=count * repeat / (time.perf_counter() - start))
+
+async def case_server_snapshot(count: int) -> dict:
+    server, _ = await server_with_fleet(count)
+
+    async def step(i):
+        server.encode_system_state()
+    seconds = await best_of(step, repeat_for(count, 50000))
+    return result(repeat_for(count, 50000), seconds, bytes=len(server.encode_system_state()))
+
+async def case_server_handle_message(count: int) -> dict:
+    server, _ = await server_with_fleet(count)
+    rng = random.Random(count)
+    device_ids = list(server.connections)
+    messages = [(device_id, position_message(device_id, rng))
+                for device_id in (rng.choice(device_ids) for _ in range(2000))]
+    repeat = repeat_for(count, minimum=20)
+
+    def step(i):
+        device_id, message = messages[i % len(messages)]
+        return server.handle_message(None, message, device_id)
+    seconds = await best_of(step, repeat)
+    return result(repeat, seconds, ops_per_s=1 / seconds)
+
+async def case_server_emergency(count: int) -> dict:
+    server, _ = await server_with_fleet(count)
+    device_ids = list(server.connections)
+    repeat = repeat_for(count, 100000, minimum=3)
+
+    async def step(i):
+        device_id = device_ids[i % len(device_ids)]
+        await server.trigger_emergency(device_id, emergency_id=f'bench-{i}')
+        await server.clear_emergency(device_id, emergency_id=f'bench-{i}')
+    seconds = await best_of(step, repeat)
+    return result(repeat, seconds, cycles_per_s=1 / seconds)
+
+async def handler_with_fleet(count: int):
+    manager = DeviceManager()
+    handler = WebSocketHandler(manager)
+    manager.set_websocket_handler(handler)
+    for _ in range(count):
+        websocket = FakeWebSocket()
+        device_id = manager.register_device(websocket)
+        await handler.register_connection(device_id, websocket)
+    return manager, handler
+
+async def case_handler_broadcast(count: int) -> dict:
+    _, handler = await handler_with_fleet(count)
+    repeat = repeat_for(count)
+    seconds = await best_of(lambda i: handler.broadcast_to_all(LANE_CHANGE), repeat)
+    return result(repeat, seconds, delivered_per_s=count / seconds)
+
+async def case_handler_handle_message(count: int) -> dict:
+    manager, handler = await handler_with_fleet(count)
+    rng = random.Random(count)
+    device_ids = list(manager.devices)
+    messages = [(device_id, position_message(device_id, rng))
+                for device_id in (rng.choice(device_ids) for _ in range(200))]
+    repeat = repeat_for(count)  # every position update fans out to the whole fleet here
+
+    def step(i):
+        device_id, message = messages[i % len(messages)]
+        return handler.handle_raw_message(device_id, message)
+    seconds = await best_of(step, repeat)
+    return result(repeat, seconds, ops_per_s=1 / seconds)
+
+async def case_simulation_tick(count: int) -> dict:
+    manager, _ = await handler_with_fleet(count)
+    repeat = repeat_for(count, 100000)
+
+    async def step(i):
+        manager.simulate_vehicle_movement(0.05)
+        manager.get_road_state()
+    seconds = await best_of(step, repeat)
+    return result(repeat, seconds, ticks_per_s=1 / seconds)
+
+async def case_emergency_cycle(count: int) -> dict:
+    manager, _ = await handler_with_fleet(count)
+    emergency = EmergencyResponseSystem(manager)
+    device_ids = list(manager.devices)
+    repeat = repeat_for(count, 100000, minimum=3)
+
+    async def step(i):
+        device_id = device_ids[i % len(device_ids)]
+        await emergency.activate_emergency_signal(device_id)
+        await emergency.deactivate_emergency_signal(device_id)
+    seconds = await best_of(step, repeat)
+    return result(repeat, seconds, cycles_per_s=1 / seconds)
+
+CASES = {
+    'server.broadcast': case_server_broadcast,
+    'server.snapshot': case_server_snapshot,
+    'server.handle_message': case_server_handle_message,
+    'server.emergency_cycle': case_server_emergency,
+    'handler.broadcast': case_handler_broadcast,
+    'handler.handle_message': case_handler_handle_message,
+    'device_manager.simulation_tick': case_simulation_tick,
+    'emergency.activate_clear': case_emergency_cycle,
+}
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def run_suite(sizes: list, cases: list) -> dict:
+    results = []
+    eta_backend = 'numpy' if np is not None else 'python'
+    if np is None:
+        print('numpy not installed - path clearing ETAs use the pure-Python fallback (pip install numpy)')
+    print(f"{'case':<32}{'vehicles':>9}{'ops':>8}{'µs/op':>12}")
+    for name in cases:
+        for count in sizes:
+            try:
+                result = asyncio.run(CASES[name](count))
+            except TimeoutError as e:
+                results.append({'case': name, 'vehicles': count, 'error': str(e)})
+                print(f"{name:<32}{count:>9}  FAILED: {e}")
+                continue
+            results.append({'case': name, 'vehicles': count, **result})
+            print(f"{name:<32}{count:>9}{result['ops']:>8}{result['us_per_op']:>12.1f}")
+    return {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'eta_backend': eta_backend,
+        'results': results
+    }
+
+def compare(current: dict, baseline: dict, threshold: float) -> int:
+    """Print per-case change against a baseline; return the number of regressions."""
+    previous = {(r['case'], r['vehicles']): r['us_per_op'] for r in baseline['results'] if 'us_per_op' in r}
+    regressions = 0
+    print(f"\nvs {baseline.get('commit', '?')} ({baseline.get('created', '?')}), "
+          f"regression threshold {threshold:.0%}")
+    if baseline.get('eta_backend', current['eta_backend']) != current['eta_backend']:
+        print(f"note: path clearing ETAs ran on {baseline['eta_backend']} before, {current['eta_backend']} now")
+    print(f"{'case':<32}{'vehicles':>9}{'before µs':>12}{'after µs':>12}{'change':>9}")
+    for result in current['results']:
+        before = previous.get((result['case'], result['vehicles']))
+        if before is None or 'error' in result:
+            continue
+        change = result['us_per_op'] / before - 1
+        flag = ''
+        if change > threshold:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{result['case']:<32}{result['vehicles']:>9}{before:>12.1f}"
+              f"{result['us_per_op']:>12.1f}{change:>+9.0%}{flag}")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='Backend hot path microbenchmarks')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--cases', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--output', help=f'results file (default: {RESULTS_DIR}/<commit>-<time>.json)')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='slowdown counted as a regression (default 0.25 = 25%%)')
+    args = parser.parse_args()
+    logging.disable(logging.WARNING)
+
+    current = run_suite(args.sizes, args.cases)
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{current['commit']}-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(output, 'w') as f:
+        json.dump(current, f, indent=2)
+    print(f"\nSaved {output}")
+
+    failed = sum(1 for result in current['results'] if 'error' in result)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        failed += compare(current, baseline, args.threshold)
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
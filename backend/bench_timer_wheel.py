@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark event loop overhead of per-connection timers versus the shared timer wheel.
+
+Runs N simulated connections that each need a 0.5 s state push, either as
+N ``asyncio.sleep`` loops (the old ``send_periodic_updates`` pattern) or as
+one TimerWheel job, and reports CPU time spent by the loop.
+
+Usage: python3 bench_timer_wheel.py [duration_seconds]
+"""
+
+import asyncio
+import sys
+import time
+
+from timer_wheel import TimerWheel
+
+CONNECTION_COUNTS = [100, 1000, 5000, 10000]
+INTERVAL = 0.5
+
+async def run_sleep_loops(connections: int, duration: float) -> int:
+    pushes = 0
+
+    async def periodic():
+        nonlocal pushes
+        while True:
+            await asyncio.sleep(INTERVAL)
+            pushes += 1
+
+    tasks = [asyncio.create_task(periodic()) for _ in range(connections)]
+    await asyncio.sleep(duration)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return pushes
+
+async def run_timer_wheel(connections: int, duration: float) -> int:
+    pushes = 0
+
+    def push(keys):
+        nonlocal pushes
+        pushes += len(keys)
+
+    wheel = TimerWheel(tick_interval=0.1)
+    wheel.register_job('state_push', INTERVAL, push)
+    for i in range(connections):
+        wheel.add(str(i))
+    wheel.start()
+    await asyncio.sleep(duration)
+    wheel.stop()
+    return pushes
+
+def measure(runner, connections: int, duration: float):
+    cpu_start = time.process_time()
+    pushes = asyncio.run(runner(connections, duration))
+    cpu = time.process_time() - cpu_start
+    return cpu, pushes
+
+def main():
+    duration = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    print(f"{'connections':>12}{'mode':>14}{'cpu s':>10}{'pushes':>10}{'µs/push':>10}")
+    for connections in CONNECTION_COUNTS:
+        for name, runner in [('sleep loops', run_sleep_loops), ('timer wheel', run_timer_wheel)]:
+            cpu, pushes = measure(runner, connections, duration)
+            per_push = cpu / pushes * 1e6 if pushes else 0.0
+            print(f'{connections:>12}{name:>14}{cpu:>10.3f}{pushes:>10}{per_push:>10.2f}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""
+Shared helpers for the backend benchmark scripts.
+"""
+
+import time
+
+COLORS = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6',
+          '#1abc9c', '#e67e22', '#34495e', '#16a085', '#d35400']
+
+def make_device_states(count: int) -> dict:
+    """Build a ``device_states`` map shaped like the one in main.py."""
+    states = {}
+    for i in range(count):
+        device_id = f'{i:08x}'
+        lane = (i % 3) + 1
+        states[device_id] = {
+            'device_id': device_id,
+            'vehicle_type': 'regular_car',
+            'current_lane': lane,
+            'position_x': (i * 150) % 800,
+            'position_y': (lane - 1) * 50 + 25,
+            'speed': 50,
+            'is_emergency_active': False,
+            'color': COLORS[i % len(COLORS)]
+        }
+    return states
+
+def make_roster(count: int) -> dict:
+    """Build a ``roster`` map shaped like the one in main.py."""
+    return {
+        f'{i:08x}': {'name': f'Student {i}', 'color': COLORS[i % len(COLORS)]}
+        for i in range(count)
+    }
+
+def time_per_call(func, repeat: int) -> float:
+    """Run ``func`` ``repeat`` times and return seconds per call."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
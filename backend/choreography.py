@@ -0,0 +1,131 @@
+"""
+Server-side takeover choreography.
+On takeover, clears the emergency vehicle's lane: every vehicle in that lane
+is moved to an adjacent lane and every vehicle gets a longitudinal slot, so
+no two vehicles end up in the same place. Planned in one sorted sweep.
+"""
+
+from typing import Dict, Iterable, Optional
+
+# Cars without an instruction pull over to the right-hand lane (the frontend's
+# fallback), so an emergency whose lane is unknown is given the opposite edge
+UNKNOWN_EMERGENCY_LANE = 1
+
+class TakeoverChoreographer:
+    """Assigns conflict-free target lanes and slots for a takeover."""
+
+    def __init__(self, num_lanes: int = 3, gap: float = 40.0, road_length: float = 800):
+        self.num_lanes = num_lanes
+        self.gap = gap  # minimum spacing between vehicles in a lane
+        self.road_length = road_length
+
+    def escape_lanes(self, emergency_lane: int) -> tuple:
+        """Lanes vehicles leave the emergency lane for, right-hand lane first."""
+        return tuple(lane for lane in (emergency_lane + 1, emergency_lane - 1)
+                     if 1 <= lane <= self.num_lanes)
+
+    def plan(self, emergency_x: Optional[float], emergency_lane: Optional[int],
+             device_ids: Iterable[str], device_states: Dict[str, dict],
+             occupied: Optional[Dict[str, dict]] = None) -> Dict[str, dict]:
+        """Plan each vehicle's manoeuvre.
+
+        Vehicles are swept from the one furthest ahead of the emergency back
+        towards it. Each lane keeps a frontier (the rearmost slot handed out
+        so far); a vehicle takes its own position or ``gap`` behind the
+        frontier, whichever is further back. Vehicles in the emergency lane
+        pick the adjacent lane where they lose the least ground.
+
+        A lane's targets must fit within one road length minus ``gap``, so
+        they never wrap round onto the front of their own lane. A vehicle
+        that no longer fits moves to another lane clear of the emergency with
+        room, or holds its position if there is none. A holding vehicle still
+        reserves its spot.
+
+        ``occupied`` holds instructions already sent to other vehicles (on a
+        refresh); their targets are kept clear and new slots are numbered
+        after theirs.
+
+        Returns device_id -> instruction with target_lane, target_x, slot
+        (0 = front of its lane, None when holding) and how far the vehicle
+        has to drop back.
+        """
+        origin = emergency_x or 0.0
+        length = self.road_length
+        if emergency_lane is None:
+            emergency_lane = UNKNOWN_EMERGENCY_LANE
+        escapes = self.escape_lanes(emergency_lane)
+        clear_lanes = tuple(lane for lane in range(1, self.num_lanes + 1)
+                            if lane != emergency_lane or not escapes)
+
+        # Distance ahead of the emergency on the looping road; the sort is the only O(N log N) step
+        vehicles = sorted(
+            (((state['position_x'] - origin) % length, state['current_lane'], device_id)
+             for device_id, state in ((d, device_states.get(d)) for d in device_ids) if state),
+            reverse=True
+        )
+
+        lanes = self.num_lanes + 2
+        frontier = [float('inf')] * lanes
+        top = [float('-inf')] * lanes  # frontmost target in the lane
+        bottom = [float('inf')] * lanes  # rearmost target in the lane
+        fixed = [[] for _ in range(lanes)]  # targets already handed out, furthest ahead first
+        slots = [0] * lanes
+        for instruction in (occupied or {}).values():
+            lane = instruction['target_lane']
+            ahead = (instruction['target_x'] - origin) % length
+            fixed[lane].append(ahead)
+            top[lane] = max(top[lane], ahead)
+            bottom[lane] = min(bottom[lane], ahead)
+            if instruction['slot'] is not None:
+                slots[lane] = max(slots[lane], instruction['slot'] + 1)
+        for targets in fixed:
+            targets.sort(reverse=True)
+
+        plan = {}
+        for ahead, lane, device_id in vehicles:
+            options = escapes if lane == emergency_lane and escapes else (lane,)
+            target, best = self._best_slot(options, ahead, frontier, top, bottom, fixed)
+            if target is None:
+                target, best = self._best_slot(clear_lanes, ahead, frontier, top, bottom, fixed)
+            if target is None:
+                # No room anywhere; stay put and keep vehicles behind from being slotted on top
+                frontier[lane] = min(frontier[lane], ahead)
+                top[lane] = max(top[lane], ahead)
+                bottom[lane] = min(bottom[lane], ahead)
+                plan[device_id] = {
+                    'action': 'hold_position',
+                    'target_lane': lane,
+                    'target_x': round((origin + ahead) % length, 1),
+                    'slot': None,
+                    'drop_back': 0.0
+                }
+                continue
+
+            frontier[target] = best
+            top[target] = max(top[target], best)
+            bottom[target] = min(bottom[target], best)
+            plan[device_id] = {
+                'action': 'change_lane' if target != lane else 'hold_lane',
+                'target_lane': target,
+                'target_x': round((origin + best) % length, 1),
+                'slot': slots[target],
+                'drop_back': round(ahead - best, 1)
+            }
+            slots[target] += 1
+        return plan
+
+    def _best_slot(self, lanes, ahead: float, frontier: list, top: list, bottom: list,
+                   fixed: list) -> tuple:
+        """(lane, slot position) losing the least ground among lanes with room, or (None, None)."""
+        gap = self.gap
+        length = self.road_length
+        target = best = None
+        for lane in lanes:
+            slot_ahead = min(ahead, frontier[lane] - gap, bottom[lane] + length - gap)
+            # Drop back past any target already handed out that is too close
+            for taken in fixed[lane]:
+                if taken - gap < slot_ahead < taken + gap:
+                    slot_ahead = taken - gap
+            if slot_ahead >= top[lane] - length + gap and (best is None or slot_ahead > best):
+                target, best = lane, slot_ahead
+        return target, best
@@ -0,0 +1,235 @@
+"""
+Message codec for vehicle communication.
+Decodes and encodes JSON messages with a pluggable backend and validates
+each message type against a schema compiled once at startup.
+"""
+
+import json
+import logging
+import math
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+NUMBER = (int, float)
+_MISSING = object()
+
+class CodecError(ValueError):
+    """Raised when an incoming message cannot be decoded or fails validation."""
+
+@dataclass(frozen=True)
+class Field:
+    """Constraints for one field of a message."""
+    types: Tuple[type, ...]
+    required: bool = False
+    max_length: Optional[int] = None  # strings
+    minimum: Optional[float] = None  # numbers
+    maximum: Optional[float] = None  # numbers
+    fields: Optional[Dict[str, 'Field']] = None  # nested objects
+
+@dataclass(frozen=True)
+class MessageSchema:
+    """Size limit and field constraints for one message type."""
+    fields: Dict[str, Field]
+    max_size: int = 1024  # bytes of raw JSON
+
+DEVICE_ID = Field((str,), max_length=64)
+SOURCE = Field((str,), max_length=32)
+EMERGENCY_ID = Field((str,), max_length=64)
+SEQ = Field((int,), minimum=0)
+POSITION = Field((dict,), fields={
+    'x': Field(NUMBER, minimum=-10000, maximum=10000),
+    'y': Field(NUMBER, minimum=-10000, maximum=10000),
+    'speed': Field(NUMBER, minimum=0, maximum=1000),
+})
+
+MESSAGE_SCHEMAS = {
+    'register_user': MessageSchema({
+        'device_id': DEVICE_ID,
+        'name': Field((str,), max_length=64),
+        'color': Field((str,), max_length=32),
+        'role': Field((str,), max_length=16),
+    }, max_size=512),
+    'register_emergency': MessageSchema({
+        'device_id': DEVICE_ID,
+        'source': SOURCE,
+        'rssi': Field(NUMBER, minimum=-200, maximum=50),
+        'snr': Field(NUMBER, minimum=-50, maximum=50),
+        'rsu_id': Field((str,), max_length=32),
+        'emergency_id': EMERGENCY_ID,
+        'seq': SEQ,
+    }, max_size=512),
+    'clear_emergency': MessageSchema({
+        'device_id': DEVICE_ID,
+        'source': SOURCE,
+        'emergency_id': EMERGENCY_ID,
+        'seq': SEQ,
+    }, max_size=512),
+    'emergency_signal': MessageSchema({
+        'device_id': DEVICE_ID,
+    }, max_size=256),
+    'position_update': MessageSchema({
+        'device_id': DEVICE_ID,
+        'position': POSITION,
+    }, max_size=512),
+    'lane_change': MessageSchema({
+        'device_id': DEVICE_ID,
+        'new_lane': Field((int,), required=True, minimum=1, maximum=3),
+        'reason': Field((str,), max_length=32),
+    }, max_size=512),
+    'get_timings': MessageSchema({
+        'device_id': DEVICE_ID,
+        'reset': Field((bool,)),
+    }, max_size=256),
+    'start_profile': MessageSchema({
+        'device_id': DEVICE_ID,
+        'duration': Field(NUMBER, minimum=0.1, maximum=60),
+    }, max_size=256),
+    'device_info': MessageSchema({
+        'device_id': DEVICE_ID,
+        'info': Field((dict,)),
+    }, max_size=2048),
+    # Emergency events relayed between server nodes
+    'relay_event': MessageSchema({
+        'event_id': Field((str,), required=True, max_length=64),
+        'origin': Field((str,), required=True, max_length=64),
+        'origin_time': Field(NUMBER, minimum=0),
+        'sent_at': Field(NUMBER, minimum=0),
+        'hops': Field((int,), required=True, minimum=0, maximum=64),
+        'max_hops': Field((int,), minimum=0, maximum=64),
+        'path': Field((list,), max_length=64),
+        'event': Field((dict,), required=True, fields={
+            'type': Field((str,), required=True, max_length=32),
+            'device_id': Field((str,), required=True, max_length=64),
+            'emergency_id': EMERGENCY_ID,
+            'source': SOURCE,
+            'seq': SEQ,
+            'message': Field((str,), max_length=256),
+        }),
+    }, max_size=2048),
+}
+# LoRa gateways send the short form
+MESSAGE_SCHEMAS['register'] = MESSAGE_SCHEMAS['register_emergency']
+
+def _compile_field(name: str, spec: Field) -> Callable[[dict], Optional[str]]:
+    """Build a closure checking one field of a decoded object."""
+    types = spec.types
+    reject_bool = bool not in types  # bool is a subclass of int
+    check_finite = float in types  # stdlib json accepts NaN and Infinity
+    nested = compile_fields(spec.fields, prefix=f'{name}.') if spec.fields else None
+
+    def check(obj: dict) -> Optional[str]:
+        value = obj.get(name, _MISSING)
+        if value is _MISSING:
+            return f'missing field {name}' if spec.required else None
+        if value is None:
+            return f'{name} is null'
+        if not isinstance(value, types) or (reject_bool and isinstance(value, bool)):
+            return f'{name} has wrong type {type(value).__name__}'
+        if check_finite and isinstance(value, float) and not math.isfinite(value):
+            return f'{name} is not a finite number'
+        if spec.max_length is not None and len(value) > spec.max_length:
+            return f'{name} longer than {spec.max_length}'
+        if spec.minimum is not None and value < spec.minimum:
+            return f'{name} below {spec.minimum}'
+        if spec.maximum is not None and value > spec.maximum:
+            return f'{name} above {spec.maximum}'
+        if nested is not None:
+            return nested(value)
+        return None
+
+    check.__name__ = f'check_{name}'
+    return check
+
+def compile_fields(fields: Dict[str, Field], prefix: str = '') -> Callable[[dict], Optional[str]]:
+    """Compile field constraints into a single validator returning an error or None."""
+    checks = [_compile_field(name, spec) for name, spec in fields.items()]
+
+    def validate(obj: dict) -> Optional[str]:
+        for check in checks:
+            error = check(obj)
+            if error:
+                return prefix + error
+        return None
+    return validate
+
+def byte_size(raw: Union[str, bytes]) -> int:
+    """Size of a raw message in UTF-8 bytes, without copying ASCII text."""
+    if isinstance(raw, (bytes, bytearray)) or raw.isascii():
+        return len(raw)
+    return len(raw.encode('utf-8', 'surrogatepass'))
+
+def _load_backend(name: str):
+    """Return (loads, dumps) for a JSON backend, falling back to stdlib json."""
+    if name == 'orjson':
+        try:
+            import orjson
+            return orjson.loads, lambda obj: orjson.dumps(obj).decode()
+        except ImportError:
+            logger.warning("orjson not installed - falling back to stdlib json codec")
+    elif name != 'json':
+        raise ValueError(f"Unknown codec backend: {name}")
+    return json.loads, json.dumps
+
+class Codec:
+    """Decodes, validates and encodes WebSocket messages."""
+
+    def __init__(self, backend: str = 'json',
+                 schemas: Optional[Dict[str, MessageSchema]] = None,
+                 max_size: int = 4096):
+        self.loads, self.dumps = _load_backend(backend)
+        self.backend = backend if self.dumps is not json.dumps else 'json'
+        self.max_size = max_size
+        schemas = MESSAGE_SCHEMAS if schemas is None else schemas
+        self.validators = {
+            message_type: (schema.max_size, compile_fields(schema.fields))
+            for message_type, schema in schemas.items()
+        }
+        self.rejected = 0
+
+    def encode(self, message: dict) -> str:
+        """Encode a message for sending."""
+        return self.dumps(message)
+
+    def decode(self, raw: Union[str, bytes]) -> Dict[str, Any]:
+        """Decode and validate an incoming message.
+
+        Messages of types without a schema are decoded but not validated, so
+        the dispatcher can decide to ignore them.
+        """
+        # A character is at least one byte, so oversized text is rejected before encoding it
+        size = len(raw) if len(raw) > self.max_size else byte_size(raw)
+        if size > self.max_size:
+            self.rejected += 1
+            raise CodecError(f'message larger than {self.max_size} bytes')
+        try:
+            data = self.loads(raw)
+        except ValueError as e:
+            self.rejected += 1
+            raise CodecError(f'invalid JSON: {e}') from None
+        if not isinstance(data, dict):
+            self.rejected += 1
+            raise CodecError('message is not an object')
+
+        error = self.validate(data, size)
+        if error:
+            self.rejected += 1
+            raise CodecError(error)
+        return data
+
+    def validate(self, data: dict, size: int = 0) -> Optional[str]:
+        """Check a decoded message against its type's schema, returning an error or None.
+
+        ``size`` is the raw message's length in bytes.
+        """
+        message_type = data.get('type')
+        if not isinstance(message_type, str):
+            return 'message has no type'
+
+        validator = self.validators.get(message_type)
+        if validator is None:
+            return None
+        max_size, validate = validator
+        error = 'message too large' if size > max_size else validate(data)
+        return f'{message_type}: {error}' if error else None
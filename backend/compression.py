@@ -0,0 +1,106 @@
+"""
+Per-message-class WebSocket compression policy.
+Small, frequent frames are sent uncompressed while large snapshots are
+deflated, using permessage-deflate's per-message RSV1 flag.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from websockets import frames
+from websockets.extensions.permessage_deflate import (
+    PerMessageDeflate,
+    ServerPerMessageDeflateFactory,
+)
+
+@dataclass(frozen=True)
+class ClassPolicy:
+    """Compression rule for one message class."""
+    compress: bool = True
+    min_size: int = 0  # bytes; smaller payloads are sent uncompressed
+
+# Tiny, high-rate frames gain almost nothing from deflate; snapshots gain most
+DEFAULT_CLASS_POLICIES = {
+    'position_update': ClassPolicy(compress=False),
+    'lane_change': ClassPolicy(compress=False),
+    'vehicle_joined': ClassPolicy(compress=False),
+    'emergency_takeover': ClassPolicy(compress=False),
+    'emergency_cleared': ClassPolicy(compress=False),
+    'system_state': ClassPolicy(min_size=256),
+    'roster_update': ClassPolicy(min_size=256),
+}
+
+class CompressionPolicy:
+    """Decides per message class whether an outgoing frame is deflated."""
+
+    def __init__(self, classes: Optional[Dict[str, ClassPolicy]] = None,
+                 default_min_size: int = 512, context_takeover: bool = True,
+                 window_bits: int = 12, mem_level: int = 5):
+        self.classes = dict(DEFAULT_CLASS_POLICIES if classes is None else classes)
+        self.default = ClassPolicy(min_size=default_min_size)
+        # With context takeover the deflate window persists across messages.
+        # Because small classes bypass the compressor, the window only ever
+        # holds earlier snapshots, so each snapshot compresses against the last.
+        self.context_takeover = context_takeover
+        self.window_bits = window_bits
+        self.mem_level = mem_level
+
+    def should_compress(self, message_class: Optional[str], size: int) -> bool:
+        """Check whether a message of this class and size should be deflated."""
+        policy = self.classes.get(message_class, self.default)
+        return policy.compress and size >= policy.min_size
+
+    def extension_factory(self) -> 'SelectiveDeflateFactory':
+        """Build the server extension factory for ``websockets.serve``."""
+        return SelectiveDeflateFactory(self)
+
+class SelectivePerMessageDeflate(PerMessageDeflate):
+    """permessage-deflate that leaves messages uncompressed when policy says so."""
+
+    def __init__(self, policy: CompressionPolicy, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.policy = policy
+        self.message_class: Optional[str] = None
+        self.encode_cont_data = True
+
+    def encode(self, frame: frames.Frame) -> frames.Frame:
+        """Encode an outgoing frame, skipping compression below policy thresholds."""
+        if frame.opcode in frames.CTRL_OPCODES:
+            return frame
+
+        if frame.opcode is not frames.OP_CONT:
+            self.encode_cont_data = self.policy.should_compress(self.message_class, len(frame.data))
+            self.message_class = None
+
+        if not self.encode_cont_data:
+            return frame
+        return super().encode(frame)
+
+class SelectiveDeflateFactory(ServerPerMessageDeflateFactory):
+    """Negotiates permessage-deflate and hands out policy-aware extensions."""
+
+    def __init__(self, policy: CompressionPolicy):
+        super().__init__(
+            server_no_context_takeover=not policy.context_takeover,
+            server_max_window_bits=policy.window_bits,
+            client_max_window_bits=policy.window_bits,
+            compress_settings={'memLevel': policy.mem_level}
+        )
+        self.policy = policy
+
+    def process_request_params(self, params, accepted_extensions):
+        response_params, extension = super().process_request_params(params, accepted_extensions)
+        return response_params, SelectivePerMessageDeflate(
+            self.policy,
+            extension.remote_no_context_takeover,
+            extension.local_no_context_takeover,
+            extension.remote_max_window_bits,
+            extension.local_max_window_bits,
+            extension.compress_settings
+        )
+
+def tag_message_class(websocket, message_class: str):
+    """Tell a connection's deflate extension which class the next message belongs to."""
+    for extension in getattr(websocket, 'extensions', None) or ():
+        if isinstance(extension, SelectivePerMessageDeflate):
+            extension.message_class = message_class
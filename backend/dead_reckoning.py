@@ -0,0 +1,91 @@
+"""
+Dead reckoning for position traffic.
+Server and clients share a simple prediction: a vehicle keeps moving along
+the road at its last reported speed. Clients only report when their true
+position drifts from that prediction by more than a threshold (or they have
+been silent too long), and the server extrapolates positions for snapshots.
+"""
+
+import time
+from typing import Dict, Iterator, Optional, Tuple
+
+def predict_x(x: float, speed: float, elapsed: float, road_length: float) -> float:
+    """Position after ``elapsed`` seconds at constant speed on the looping road."""
+    return (x + speed * elapsed) % road_length
+
+class Track:
+    """Last report a vehicle's prediction is based on."""
+    __slots__ = ('x', 'speed', 'reported_at')
+
+    def __init__(self, x: float, speed: float, reported_at: float):
+        self.x = x
+        self.speed = speed
+        self.reported_at = reported_at
+
+class DeadReckoning:
+    """Server-side extrapolation of reported vehicle positions."""
+
+    def __init__(self, road_length: float = 800, threshold: float = 5.0, max_silence: float = 5.0):
+        self.road_length = road_length
+        self.threshold = threshold  # clients report once drift exceeds this many units
+        self.max_silence = max_silence  # ...or after this many seconds regardless
+        self.tracks: Dict[str, Track] = {}
+        self.reports = 0
+
+    def settings(self) -> dict:
+        """Parameters clients need to run the same prediction (sent in the welcome)."""
+        return {'threshold': self.threshold, 'max_silence': self.max_silence, 'road_length': self.road_length}
+
+    def report(self, device_id: str, x: float, speed: float, now: float = None):
+        """Reset a vehicle's prediction to a fresh report."""
+        now = time.monotonic() if now is None else now
+        track = self.tracks.get(device_id)
+        if track is None:
+            self.tracks[device_id] = Track(x, speed, now)
+        else:
+            track.x, track.speed, track.reported_at = x, speed, now
+        self.reports += 1
+
+    def predict(self, device_id: str, now: float = None) -> Optional[float]:
+        """Predicted position of a reporting vehicle, None if it never reported."""
+        track = self.tracks.get(device_id)
+        if track is None:
+            return None
+        now = time.monotonic() if now is None else now
+        return predict_x(track.x, track.speed, now - track.reported_at, self.road_length)
+
+    def predict_all(self, now: float = None) -> Iterator[Tuple[str, float]]:
+        """Predicted positions of every reporting vehicle."""
+        now = time.monotonic() if now is None else now
+        length = self.road_length
+        for device_id, track in self.tracks.items():
+            yield device_id, (track.x + track.speed * (now - track.reported_at)) % length
+
+    def forget(self, device_id: str):
+        """Drop a vehicle's track."""
+        self.tracks.pop(device_id, None)
+
+class DeadReckoningSender:
+    """Client-side half: decides when a vehicle's true position needs reporting."""
+
+    def __init__(self, threshold: float = 5.0, max_silence: float = 5.0, road_length: float = 800):
+        self.threshold = threshold
+        self.max_silence = max_silence
+        self.road_length = road_length
+        self.last: Optional[Track] = None
+        self.sent = 0
+        self.skipped = 0
+
+    def should_send(self, x: float, speed: float, now: float) -> bool:
+        """Check the true position against the shared prediction; remember it if sending."""
+        last = self.last
+        if last is not None and now - last.reported_at < self.max_silence:
+            predicted = predict_x(last.x, last.speed, now - last.reported_at, self.road_length)
+            drift = abs(x - predicted)
+            drift = min(drift, self.road_length - drift)  # across the wrap point
+            if drift <= self.threshold:
+                self.skipped += 1
+                return False
+        self.last = Track(x, speed, now)
+        self.sent += 1
+        return True
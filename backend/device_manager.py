@@ -8,7 +8,6 @@ import logging
 import uuid
 import random
 from typing import Dict, List, Optional, Any
-from dataclasses import dataclass, asdict
 from enum import Enum
 
 logger = logging.getLogger(__name__)
@@ -26,24 +25,65 @@ class LanePosition(Enum):
     MIDDLE_LANE = 2
     RIGHT_LANE = 3
 
-@dataclass
 class DeviceState:
-    """Represents the state of a connected device."""
-    device_id: str
-    vehicle_type: VehicleType
-    current_lane: LanePosition
-    position_x: float
-    position_y: float
-    speed: float
-    is_emergency_active: bool = False
-    connection_status: str = "connected"
+    """Represents the state of a connected device.
+
+    Uses __slots__ instead of a dataclass to keep per-vehicle memory small, and
+    caches enum values on assignment so to_dict() does no enum lookups.
+    """
+    __slots__ = ('device_id', '_vehicle_type', '_vehicle_type_value',
+                 '_current_lane', '_current_lane_value', 'position_x', 'position_y',
+                 'speed', 'is_emergency_active', 'connection_status')
+
+    def __init__(self, device_id: str, vehicle_type: VehicleType, current_lane: LanePosition,
+                 position_x: float, position_y: float, speed: float,
+                 is_emergency_active: bool = False, connection_status: str = "connected"):
+        self.device_id = device_id
+        self.vehicle_type = vehicle_type
+        self.current_lane = current_lane
+        self.position_x = position_x
+        self.position_y = position_y
+        self.speed = speed
+        self.is_emergency_active = is_emergency_active
+        self.connection_status = connection_status
+
+    @property
+    def vehicle_type(self) -> VehicleType:
+        return self._vehicle_type
+
+    @vehicle_type.setter
+    def vehicle_type(self, value: VehicleType):
+        self._vehicle_type = value
+        self._vehicle_type_value = value.value
+
+    @property
+    def current_lane(self) -> LanePosition:
+        return self._current_lane
+
+    @current_lane.setter
+    def current_lane(self, value: LanePosition):
+        self._current_lane = value
+        self._current_lane_value = value.value
+
+    def __repr__(self) -> str:
+        return (
+            f"DeviceState(device_id={self.device_id!r}, vehicle_type={self._vehicle_type}, "
+            f"current_lane={self._current_lane}, position_x={self.position_x}, "
+            f"position_y={self.position_y}, speed={self.speed}, "
+            f"is_emergency_active={self.is_emergency_active}, "
+            f"connection_status={self.connection_status!r})"
+        )
 
     def to_dict(self) -> dict:
         """Convert state to dictionary for JSON serialization."""
         return {
-            **asdict(self),
-            'vehicle_type': self.vehicle_type.value,
-            'current_lane': self.current_lane.value,
+            'device_id': self.device_id,
+            'vehicle_type': self._vehicle_type_value,
+            'current_lane': self._current_lane_value,
+            'position_x': self.position_x,
+            'position_y': self.position_y,
+            'speed': self.speed,
+            'is_emergency_active': self.is_emergency_active,
             'connection_status': self.connection_status
         }
 
@@ -89,7 +129,7 @@ class DeviceManager:
         )
 
         self.devices[device_id] = device_state
-        logger.info(f"Registered device: {device_id} as {vehicle_type.value}")
+        logger.info("Registered device: %s as %s", device_id, vehicle_type.value)
 
         return device_id
 
@@ -97,7 +137,7 @@ class DeviceManager:
         """Remove a device from the system."""
         if device_id in self.devices:
             device_state = self.devices[device_id]
-            logger.info(f"Unregistering device: {device_id} ({device_state.vehicle_type.value})")
+            logger.info("Unregistering device: %s (%s)", device_id, device_state.vehicle_type.value)
             del self.devices[device_id]
 
     def get_device_state(self, device_id: str) -> Optional[DeviceState]:
@@ -130,7 +170,7 @@ class DeviceManager:
             # Adjust y position based on new lane
             self.devices[device_id].position_y = new_lane.value * 50
 
-            logger.info(f"Device {device_id} moved from lane {old_lane.value} to {new_lane.value} ({reason})")
+            logger.info("Device %s moved from lane %s to %s (%s)", device_id, old_lane.value, new_lane.value, reason)
 
             # Broadcast lane change if WebSocket handler is available
             if self.websocket_handler:
@@ -149,7 +189,7 @@ class DeviceManager:
         if device_id in self.devices:
             self.devices[device_id].is_emergency_active = True
 
-            logger.info(f"Emergency mode activated for device: {device_id}")
+            logger.info("Emergency mode activated for device: %s", device_id)
 
             # Broadcast emergency signal
             if self.websocket_handler:
@@ -165,7 +205,7 @@ class DeviceManager:
         if device_id in self.devices:
             self.devices[device_id].is_emergency_active = False
 
-            logger.info(f"Emergency mode deactivated for device: {device_id}")
+            logger.info("Emergency mode deactivated for device: %s", device_id)
 
             # Broadcast emergency cleared signal
             if self.websocket_handler:
@@ -0,0 +1,257 @@
+"""
+Idempotent, concurrent emergency events.
+Gives every emergency an ID and a sequence number and absorbs duplicate,
+out-of-order and bouncing trigger/clear requests (LoRa retransmits, repeated
+button presses) before they turn into full broadcasts. Several emergencies
+can be active at once; each vehicle is assigned to the one most relevant to it.
+"""
+
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+@dataclass
+class EmergencyRecord:
+    """Lifecycle of one emergency, keyed by its sender."""
+    emergency_id: str
+    key: str
+    device_id: str
+    source: str
+    active: bool = True
+    seq: int = 0  # sequence number of the last event we broadcast
+    client_seq: Optional[int] = None  # highest sequence number seen from the sender
+    changed_at: float = 0.0  # last accepted trigger or clear
+    broadcast_at: float = 0.0
+    seen_at: float = 0.0  # last request of any kind
+    message: str = ''  # takeover text shown to vehicles
+    position_x: Optional[float] = None  # where the emergency is, None = unknown
+    recipients: Optional[Set[str]] = None  # vehicles in scope, None = all
+
+class EmergencyEventLog:
+    """Decides which emergency requests are new enough to broadcast.
+
+    - A trigger for an emergency that is already active is absorbed, unless
+      ``refresh_interval`` has passed since its last broadcast.
+    - A trigger arriving within ``rearm_delay`` of a clear is absorbed as a
+      straggling retransmit. Senders restart their numbering on each new
+      emergency, so after a clear only an explicit emergency ID can tie a
+      late trigger to the old one.
+    - Requests carrying a sequence number at or below the last one seen for
+      that emergency are absorbed. A sender silent for ``seq_reset_after``
+      seconds may restart its numbering (e.g. after a reboot).
+    - A clear for an emergency that is not active is absorbed.
+    """
+
+    def __init__(self, refresh_interval: float = 5.0, rearm_delay: float = 1.0,
+                 seq_reset_after: float = 30.0, history_size: int = 256):
+        self.refresh_interval = refresh_interval
+        self.rearm_delay = rearm_delay
+        self.seq_reset_after = seq_reset_after
+        self.history_size = history_size
+        self.records: "OrderedDict[str, EmergencyRecord]" = OrderedDict()
+
+        # Stats
+        self.broadcasts = 0
+        self.suppressed: Dict[str, int] = {'duplicate': 0, 'out_of_order': 0, 'rearm': 0, 'stale_clear': 0}
+
+    def _suppress(self, reason: str):
+        self.suppressed[reason] += 1
+        return None
+
+    def _accept_seq(self, record: EmergencyRecord, client_seq: Optional[int], now: float) -> bool:
+        """Check a sender's sequence number against the last one seen."""
+        if client_seq is None:
+            return True
+        last = record.client_seq
+        if last is not None and client_seq <= last and now - record.seen_at < self.seq_reset_after:
+            self._suppress('duplicate' if client_seq == last else 'out_of_order')
+            return False
+        record.client_seq = client_seq
+        return True
+
+    def _broadcast(self, record: EmergencyRecord, now: float) -> EmergencyRecord:
+        record.seq += 1
+        record.broadcast_at = now
+        self.broadcasts += 1
+        return record
+
+    def _prune(self):
+        """Forget the oldest cleared emergencies beyond the history size."""
+        while len(self.records) > self.history_size:
+            for key, record in self.records.items():
+                if not record.active:
+                    del self.records[key]
+                    break
+            else:
+                return
+
+    def trigger(self, key: str, device_id: str, source: str = 'vehicle', emergency_id: str = None,
+                client_seq: int = None, now: float = None) -> Optional[EmergencyRecord]:
+        """Register a trigger request; returns the record if it should be broadcast."""
+        now = time.monotonic() if now is None else now
+        record = self.records.get(key)
+
+        if record is not None and record.active:
+            accepted = self._accept_seq(record, client_seq, now)
+            record.seen_at = now
+            if not accepted:
+                return None
+            if now - record.broadcast_at < self.refresh_interval:
+                return self._suppress('duplicate')
+            return self._broadcast(record, now)
+
+        if record is not None:
+            # Cleared: tell a straggler of the old emergency from a fresh one
+            if emergency_id is not None and emergency_id == record.emergency_id:
+                accepted = self._accept_seq(record, client_seq, now)
+                record.seen_at = now
+                if not accepted:
+                    return None
+            elif emergency_id is None and now - record.changed_at < self.rearm_delay:
+                record.seen_at = now
+                return self._suppress('rearm')
+
+        record = EmergencyRecord(
+            emergency_id=emergency_id or uuid.uuid4().hex[:12],
+            key=key,
+            device_id=device_id,
+            source=source,
+            seq=record.seq if record else 0,
+            client_seq=client_seq,
+            changed_at=now,
+            seen_at=now
+        )
+        self.records[key] = record
+        self.records.move_to_end(key)
+        self._prune()
+        return self._broadcast(record, now)
+
+    def clear(self, key: str, client_seq: int = None, now: float = None) -> Optional[EmergencyRecord]:
+        """Register a clear request; returns the record if it should be broadcast."""
+        now = time.monotonic() if now is None else now
+        record = self.records.get(key)
+        if record is None or not record.active:
+            return self._suppress('stale_clear')
+        accepted = self._accept_seq(record, client_seq, now)
+        record.seen_at = now
+        if not accepted:
+            return None
+        record.active = False
+        record.changed_at = now
+        return self._broadcast(record, now)
+
+    def abort(self, record: EmergencyRecord):
+        """Deactivate a record whose trigger could not be carried out, so a retry is accepted."""
+        record.active = False
+        record.client_seq = None
+        record.changed_at = 0.0
+
+    def get_stats(self) -> dict:
+        """Get broadcast and suppression counters."""
+        return {
+            'active': sum(1 for record in self.records.values() if record.active),
+            'broadcasts': self.broadcasts,
+            'suppressed': dict(self.suppressed),
+            'suppressed_total': sum(self.suppressed.values())
+        }
+
+class EmergencyAssignments:
+    """Tracks active emergencies and which one each vehicle is yielding to.
+
+    A vehicle in the scope of several emergencies follows the nearest one.
+    Only vehicles inside an emergency's scope are touched when it starts or
+    ends, so concurrent incidents on different stretches stay independent.
+    """
+
+    def __init__(self):
+        self.active: Dict[str, EmergencyRecord] = {}  # emergency_id -> record
+        self.vehicle_emergency: Dict[str, str] = {}  # device_id -> emergency_id
+        self.members: Dict[str, Set[str]] = {}  # emergency_id -> assigned device_ids
+        self.emergency_devices: Dict[str, int] = {}  # device_id -> active emergencies it leads
+
+    @staticmethod
+    def _distance(record: EmergencyRecord, position_x: Optional[float]) -> float:
+        if record.position_x is None or position_x is None:
+            return float('inf')
+        return abs(record.position_x - position_x)
+
+    def _assign(self, device_id: str, emergency_id: str):
+        previous = self.vehicle_emergency.get(device_id)
+        if previous is not None:
+            self.members[previous].discard(device_id)
+        self.vehicle_emergency[device_id] = emergency_id
+        self.members[emergency_id].add(device_id)
+
+    def add(self, record: EmergencyRecord, candidates: Iterable[str],
+            positions: Dict[str, dict]) -> Set[str]:
+        """Activate an emergency and return the vehicles that now follow it."""
+        if record.emergency_id not in self.active:
+            self.active[record.emergency_id] = record
+            self.emergency_devices[record.device_id] = self.emergency_devices.get(record.device_id, 0) + 1
+            self.forget_vehicle(record.device_id)  # emergency vehicles never yield
+        members = self.members.setdefault(record.emergency_id, set())
+        assigned = set()
+        for device_id in candidates:
+            if device_id in self.emergency_devices:
+                continue
+            current_id = self.vehicle_emergency.get(device_id)
+            if current_id is None:
+                self._assign(device_id, record.emergency_id)
+                assigned.add(device_id)
+            elif current_id != record.emergency_id:
+                position_x = positions.get(device_id, {}).get('position_x')
+                current = self.active[current_id]
+                if self._distance(record, position_x) < self._distance(current, position_x):
+                    self._assign(device_id, record.emergency_id)
+                    assigned.add(device_id)
+        return assigned | members
+
+    def remove(self, record: EmergencyRecord, positions: Dict[str, dict]
+               ) -> Tuple[Set[str], Dict[str, Set[str]]]:
+        """End an emergency.
+
+        Returns the vehicles released from all emergencies, and the vehicles
+        handed over to another active emergency (grouped by emergency_id).
+        """
+        if self.active.pop(record.emergency_id, None) is not None:
+            remaining = self.emergency_devices.pop(record.device_id) - 1
+            if remaining:
+                self.emergency_devices[record.device_id] = remaining
+        members = self.members.pop(record.emergency_id, set())
+        released = set()
+        handed_over: Dict[str, Set[str]] = {}
+        for device_id in members:
+            del self.vehicle_emergency[device_id]
+            position_x = positions.get(device_id, {}).get('position_x')
+            best = None
+            for other in self.active.values():
+                if other.recipients is not None and device_id not in other.recipients:
+                    continue
+                if best is None or self._distance(other, position_x) < self._distance(best, position_x):
+                    best = other
+            if best is None:
+                released.add(device_id)
+            else:
+                self._assign(device_id, best.emergency_id)
+                handed_over.setdefault(best.emergency_id, set()).add(device_id)
+        return released, handed_over
+
+    def forget_vehicle(self, device_id: str):
+        """Drop a disconnected vehicle's assignment."""
+        emergency_id = self.vehicle_emergency.pop(device_id, None)
+        if emergency_id is not None:
+            self.members[emergency_id].discard(device_id)
+
+    def get_status(self) -> list:
+        """Describe active emergencies and how many vehicles follow each."""
+        return [
+            {
+                'emergency_id': record.emergency_id,
+                'device_id': record.device_id,
+                'source': record.source,
+                'vehicles': len(self.members.get(emergency_id, ()))
+            }
+            for emergency_id, record in self.active.items()
+        ]
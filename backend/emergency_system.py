@@ -23,10 +23,10 @@ class EmergencyResponseSystem:
 
     def __init__(self, device_manager):
         self.device_manager = device_manager
-        self.emergency_state = EmergencyState.NORMAL
-        self.active_emergency_device: Optional[str] = None
+        self.emergency_states: Dict[str, EmergencyState] = {}  # device_id -> state, one per active emergency
+        self.activation_times: Dict[str, float] = {}  # device_id -> time.time() of activation
+        self.clearing_tasks: Dict[str, asyncio.Task] = {}  # device_id -> path clearing coordination
         self.response_timeout = 30  # seconds
-        self.path_clearing_start_time: Optional[float] = None
 
         # Lane priorities for emergency response
         self.lane_priorities = {
@@ -35,43 +35,58 @@ class EmergencyResponseSystem:
             3: 3   # Right lane stays in right lane (3)
         }
 
+    @property
+    def emergency_state(self) -> EmergencyState:
+        """State of the most recent active emergency, NORMAL if none."""
+        if not self.emergency_states:
+            return EmergencyState.NORMAL
+        return next(reversed(self.emergency_states.values()))
+
+    @property
+    def active_emergency_device(self) -> Optional[str]:
+        """Device of the most recent active emergency."""
+        return next(reversed(self.emergency_states), None)
+
     async def activate_emergency_signal(self, device_id: str) -> bool:
         """Activate emergency signal for a device."""
-        if self.emergency_state != EmergencyState.NORMAL:
-            logger.warning(f"Emergency signal rejected - already in state: {self.emergency_state}")
+        if device_id in self.emergency_states:
+            logger.warning("Emergency signal rejected - %s already in state: %s", device_id, self.emergency_states[device_id])
             return False
 
         # Verify the device exists and can be emergency vehicle
         device_state = self.device_manager.get_device_state(device_id)
         if not device_state:
-            logger.error(f"Emergency signal from unknown device: {device_id}")
+            logger.error("Emergency signal from unknown device: %s", device_id)
             return False
 
-        self.emergency_state = EmergencyState.EMERGENCY_ACTIVE
-        self.active_emergency_device = device_id
-        self.path_clearing_start_time = time.time()
+        self.emergency_states[device_id] = EmergencyState.EMERGENCY_ACTIVE
+        self.activation_times[device_id] = time.time()
 
-        logger.info(f"Emergency signal activated by device: {device_id}")
+        logger.info("Emergency signal activated by device: %s (%d active)",
+                    device_id, len(self.emergency_states))
 
         # Broadcast emergency signal to all devices
         await self._broadcast_emergency_signal(device_id)
 
         # Start path clearing coordination
-        asyncio.create_task(self._coordinate_path_clearing())
+        self.clearing_tasks[device_id] = asyncio.create_task(self._coordinate_path_clearing(device_id))
 
         return True
 
     async def deactivate_emergency_signal(self, device_id: str) -> bool:
         """Deactivate emergency signal."""
-        if self.active_emergency_device != device_id:
-            logger.warning(f"Emergency deactivation from non-active device: {device_id}")
+        if device_id not in self.emergency_states:
+            logger.warning("Emergency deactivation from non-active device: %s", device_id)
             return False
 
-        self.emergency_state = EmergencyState.NORMAL
-        self.active_emergency_device = None
-        self.path_clearing_start_time = None
+        del self.emergency_states[device_id]
+        del self.activation_times[device_id]
+        # Stop its coordination so it cannot touch a later emergency from the same device
+        task = self.clearing_tasks.pop(device_id, None)
+        if task:
+            task.cancel()
 
-        logger.info(f"Emergency signal deactivated by device: {device_id}")
+        logger.info("Emergency signal deactivated by device: %s", device_id)
 
         # Broadcast emergency cleared signal
         await self._broadcast_emergency_cleared(device_id)
@@ -87,7 +102,7 @@ class EmergencyResponseSystem:
         emergency_message = {
             'type': 'emergency_signal',
             'emergency_device_id': device_id,
-            'state': self.emergency_state.value,
+            'state': self.emergency_states[device_id].value,
             'message': 'Emergency vehicle approaching - clear path immediately',
             'timestamp': time.time(),
             'target_lanes': self._calculate_target_lanes()
@@ -106,7 +121,7 @@ class EmergencyResponseSystem:
         clear_message = {
             'type': 'emergency_cleared',
             'emergency_device_id': device_id,
-            'state': self.emergency_state.value,
+            'state': EmergencyState.NORMAL.value,
             'message': 'Emergency vehicle passed - resume normal operation',
             'timestamp': time.time()
         }
@@ -122,30 +137,33 @@ class EmergencyResponseSystem:
 
         return targets
 
-    async def _coordinate_path_clearing(self):
-        """Coordinate the path clearing process."""
-        self.emergency_state = EmergencyState.CLEARING_PATH
+    async def _coordinate_path_clearing(self, device_id: str):
+        """Coordinate the path clearing process for one emergency."""
+        self.emergency_states[device_id] = EmergencyState.CLEARING_PATH
 
-        logger.info("Starting path clearing coordination")
+        logger.info("Starting path clearing coordination for %s", device_id)
 
         # Give vehicles time to respond
         await asyncio.sleep(2)
 
         # Check if path is clearing
-        await self._monitor_path_clearing()
+        await self._monitor_path_clearing(device_id)
 
         # Set path cleared state
-        self.emergency_state = EmergencyState.PATH_CLEARED
-        logger.info("Path clearing coordination completed")
+        self.emergency_states[device_id] = EmergencyState.PATH_CLEARED
+        self.clearing_tasks.pop(device_id, None)
+        logger.info("Path clearing coordination completed for %s", device_id)
 
-    async def _monitor_path_clearing(self):
+    async def _monitor_path_clearing(self, device_id: str):
         """Monitor the path clearing progress."""
         max_monitor_time = 10  # seconds
         start_time = time.time()
 
         while (time.time() - start_time) < max_monitor_time:
             # Check if emergency device still exists
-            if not self.device_manager.get_device_state(self.active_emergency_device):
+            if device_id not in self.emergency_states:
+                break
+            if not self.device_manager.get_device_state(device_id):
                 logger.warning("Emergency device disconnected during path clearing")
                 break
 
@@ -166,22 +184,29 @@ class EmergencyResponseSystem:
 
     def get_emergency_status(self) -> Dict:
         """Get current emergency system status."""
+        now = time.time()
+        latest = self.active_emergency_device
         return {
             'state': self.emergency_state.value,
-            'active_emergency_device': self.active_emergency_device,
-            'time_since_activation': (
-                time.time() - self.path_clearing_start_time
-                if self.path_clearing_start_time else None
-            ),
+            'active_emergency_device': latest,
+            'time_since_activation': now - self.activation_times[latest] if latest else None,
+            'emergencies': [
+                {
+                    'device_id': device_id,
+                    'state': state.value,
+                    'time_since_activation': now - self.activation_times[device_id]
+                }
+                for device_id, state in self.emergency_states.items()
+            ],
             'target_lanes': self._calculate_target_lanes()
         }
 
     def handle_vehicle_response(self, device_id: str, response_type: str, data: Dict = None):
         """Handle response from a vehicle to emergency signal."""
-        if self.emergency_state == EmergencyState.NORMAL:
+        if not self.emergency_states:
             return
 
-        logger.info(f"Vehicle {device_id} responded to emergency: {response_type}")
+        logger.info("Vehicle %s responded to emergency: %s", device_id, response_type)
 
         # Process different types of responses
         if response_type == 'lane_change_completed':
@@ -194,28 +219,32 @@ class EmergencyResponseSystem:
         from_lane = data.get('from_lane')
         to_lane = data.get('to_lane')
 
-        logger.info(f"Vehicle {device_id} completed lane change: {from_lane} -> {to_lane}")
+        logger.info("Vehicle %s completed lane change: %s -> %s", device_id, from_lane, to_lane)
 
         # In a real system, track which vehicles have completed their lane changes
 
     def _process_acknowledgment_response(self, device_id: str):
         """Process emergency acknowledgment response."""
-        logger.info(f"Vehicle {device_id} acknowledged emergency signal")
+        logger.info("Vehicle %s acknowledged emergency signal", device_id)
 
         # In a real system, track which vehicles have acknowledged the signal
 
     def is_emergency_active(self) -> bool:
         """Check if emergency mode is currently active."""
-        return self.emergency_state != EmergencyState.NORMAL
+        return bool(self.emergency_states)
 
     def get_emergency_device(self) -> Optional[str]:
-        """Get the device ID of the active emergency vehicle."""
+        """Get the device ID of the most recent active emergency vehicle."""
         return self.active_emergency_device
 
+    def get_emergency_devices(self) -> List[str]:
+        """Get the device IDs of every active emergency vehicle."""
+        return list(self.emergency_states)
+
     def can_activate_emergency(self, device_id: str) -> bool:
         """Check if a device can activate emergency mode."""
-        # Only one emergency vehicle at a time
-        if self.is_emergency_active():
+        # Each emergency vehicle can have one active emergency at a time
+        if device_id in self.emergency_states:
             return False
 
         # Device must exist
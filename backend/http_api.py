@@ -0,0 +1,135 @@
+"""
+Read-only HTTP state API, served on the WebSocket port.
+Instructor tools and dashboards can poll vehicles, roster and emergency
+status with plain GET requests instead of holding a WebSocket open, and
+fetch one vehicle's recent trajectory from ``trajectory/<device_id>``. Each
+snapshot endpoint's body is encoded at most once per ``max_age`` and served from a
+versioned cache with an ETag, so any number of pollers costs one encode
+and unchanged state answers ``304 Not Modified`` with no body.
+"""
+
+import http
+import time
+import zlib
+from typing import Callable, Dict, Optional
+from urllib.parse import parse_qs
+
+class CachedSnapshot:
+    """One endpoint's pre-encoded body and its version."""
+    __slots__ = ('build', 'body', 'etag', 'version', 'built_at')
+
+    def __init__(self, build: Callable[[], str]):
+        self.build = build
+        self.body = b''
+        self.etag = ''
+        self.version = 0  # bumped whenever the encoded body changes
+        self.built_at = float('-inf')
+
+class StateHTTPAPI:
+    """Serves cached JSON snapshots of server state through ``process_request``."""
+
+    def __init__(self, server, max_age: float = 0.5, prefix: str = '/api/'):
+        self.server = server
+        self.max_age = max_age  # seconds a snapshot is reused before re-encoding
+        self.prefix = prefix
+        self.snapshots: Dict[str, CachedSnapshot] = {
+            'vehicles': CachedSnapshot(self._build_vehicles),
+            'roster': CachedSnapshot(lambda: server.codec.encode({'roster': server.roster})),
+            'emergencies': CachedSnapshot(self._build_emergencies),
+        }
+        self.requests = 0
+        self.not_modified = 0
+        self.encodes = 0
+
+    def _build_vehicles(self) -> str:
+        self.server.extrapolate_positions()
+        return self.server.codec.encode({
+            'total_vehicles': len(self.server.device_states),
+            'vehicles': self.server.device_states
+        })
+
+    def _build_emergencies(self) -> str:
+        server = self.server
+        return server.codec.encode({
+            'active': server.emergency_active,
+            'active_emergency_device': server.emergency_device,
+            'emergencies': server.emergencies.get_status()
+        })
+
+    def _trajectory(self, device_id: str, query: str) -> Optional[bytes]:
+        """Encode a vehicle's last ``seconds`` (default 10) of samples, or None if it has none."""
+        try:
+            seconds = float(parse_qs(query).get('seconds', ['10'])[0])
+        except ValueError:
+            seconds = 10.0
+        now = time.monotonic()
+        trajectories = self.server.trajectories
+        columns = trajectories.window(device_id, now - seconds)
+        if columns is None:
+            return None
+        t, x, y, speed, lane = columns
+        return self.server.codec.encode({
+            'device_id': device_id,
+            'samples': len(t),
+            'mean_speed': trajectories.mean_speed(device_id, now - seconds),
+            'age': [round(now - sample, 3) for sample in t],  # seconds before the response
+            'x': list(x),
+            'y': list(y),
+            'speed': list(speed),
+            'lane': list(lane)
+        }).encode()
+
+    def snapshot(self, name: str) -> Optional[CachedSnapshot]:
+        """Get an endpoint's snapshot, re-encoding it if it is older than ``max_age``."""
+        snapshot = self.snapshots.get(name)
+        if snapshot is None:
+            return None
+        now = time.monotonic()
+        if now - snapshot.built_at >= self.max_age:
+            body = snapshot.build().encode()
+            self.encodes += 1
+            if body != snapshot.body:
+                snapshot.version += 1
+                snapshot.body = body
+                snapshot.etag = f'"{name}-{snapshot.version}-{zlib.crc32(body):08x}"'
+            snapshot.built_at = now
+        return snapshot
+
+    async def process_request(self, path: str, request_headers):
+        """websockets hook: answer /api/ GETs over HTTP, let everything else upgrade."""
+        if not path.startswith(self.prefix):
+            return None
+        self.requests += 1
+        name, _, query = path[len(self.prefix):].partition('?')
+        name = name.strip('/')
+        headers = [
+            ('Content-Type', 'application/json'),
+            ('Cache-Control', 'no-cache'),
+            ('Access-Control-Allow-Origin', '*'),
+        ]
+        if name.startswith('trajectory/'):
+            body = self._trajectory(name[len('trajectory/'):], query)
+            if body is not None:
+                return http.HTTPStatus.OK, headers, body
+            body = self.server.codec.encode({'error': 'no trajectory for this vehicle'})
+            return http.HTTPStatus.NOT_FOUND, headers, body.encode()
+
+        snapshot = self.snapshot(name)
+        if snapshot is None:
+            endpoints = list(self.snapshots) + ['trajectory/<device_id>']
+            body = self.server.codec.encode({'error': 'unknown endpoint', 'endpoints': endpoints})
+            return http.HTTPStatus.NOT_FOUND, headers, body.encode()
+
+        headers.append(('ETag', snapshot.etag))
+        if snapshot.etag in (tag.strip() for tag in request_headers.get('If-None-Match', '').split(',')):
+            self.not_modified += 1
+            return http.HTTPStatus.NOT_MODIFIED, headers, b''
+        return http.HTTPStatus.OK, headers, snapshot.body
+
+    def get_stats(self) -> dict:
+        return {
+            'requests': self.requests,
+            'not_modified': self.not_modified,
+            'encodes': self.encodes,
+            'versions': {name: snapshot.version for name, snapshot in self.snapshots.items()}
+        }
@@ -0,0 +1,103 @@
+"""
+Join storm batching.
+When a whole class joins at once, announcing every join and re-sending the
+whole roster to everyone on every registration costs O(N^2) messages and
+O(N^3) bytes. Joins and roster changes are instead collected for a short
+window and flushed as one vehicle_joined and one incremental roster delta.
+Connections that have never had a roster get the full one once instead.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class JoinBatcher:
+    """Coalesces vehicle_joined and roster_update broadcasts."""
+
+    def __init__(self, server, window: float = 0.1):
+        self.server = server
+        self.window = window  # seconds to gather joins; 0 = announce each one immediately
+        self.joined_ids = []
+        self.changes: Dict[str, dict] = {}  # device_id -> roster entry changed this window
+        self.version = 0  # roster version, bumped per flushed delta
+        self.synced = set()  # device_ids holding a full roster that deltas apply to
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.flushes = 0
+
+    async def joined(self, device_id: str):
+        """A vehicle registered."""
+        if not self.window:
+            await self.server.broadcast_message({
+                'type': 'vehicle_joined',
+                'device_id': device_id,
+                'total_vehicles': len(self.server.device_states)
+            }, exclude_device=device_id)
+            return
+        self.joined_ids.append(device_id)
+        self._schedule()
+
+    async def roster_changed(self, device_id: str):
+        """A student registered or changed name/color."""
+        if not self.window:
+            self.version += 1
+            await self.server.broadcast_message(self.full_roster())
+            return
+        self.changes[device_id] = self.server.roster[device_id]
+        self._schedule()
+
+    def full_roster(self) -> dict:
+        return {'type': 'roster_update', 'version': self.version, 'roster': self.server.roster}
+
+    def send_full_roster(self, device_id: str):
+        """Give one connection the whole roster so later deltas apply."""
+        self.server.send_to_device(device_id, 'roster_update', self.server.codec.encode(self.full_roster()))
+        self.synced.add(device_id)
+
+    def forget(self, device_id: str):
+        self.synced.discard(device_id)
+
+    def _schedule(self):
+        if self.flush_handle is None:
+            self.flush_handle = asyncio.get_running_loop().call_later(
+                self.window, lambda: asyncio.ensure_future(self.flush())
+            )
+
+    async def flush(self):
+        """Send what was gathered during the window."""
+        self.flush_handle = None
+        joined_ids, self.joined_ids = self.joined_ids, []
+        changes, self.changes = self.changes, {}
+        server = self.server
+        self.flushes += 1
+
+        if joined_ids:
+            joined = [device_id for device_id in joined_ids if device_id in server.device_states]
+            if joined:
+                await server.broadcast_message({
+                    'type': 'vehicle_joined',
+                    'device_id': joined[-1],  # single-join clients read this
+                    'device_ids': joined,
+                    'total_vehicles': len(server.device_states)
+                })
+
+        if changes:
+            self.version += 1
+            # Newcomers have no roster to apply a delta to: one full copy each.
+            # Synced devices that are detached still get the delta via session replay.
+            others = set(self.synced)
+            newcomers = set(server.outbound) - others
+            if newcomers:
+                full = server.codec.encode(self.full_roster())
+                for device_id in newcomers:
+                    server.send_to_device(device_id, 'roster_update', full)
+                self.synced |= newcomers
+            if others:
+                await server.broadcast_message({
+                    'type': 'roster_update',
+                    'version': self.version,
+                    'changes': changes
+                }, recipients=others)
+        if len(joined_ids) > 1 or len(changes) > 1:
+            logger.info("👥 Batched %d joins and %d roster changes", len(joined_ids), len(changes))
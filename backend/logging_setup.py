@@ -0,0 +1,88 @@
+"""
+Non-blocking, sampled logging.
+Log records are handed to a queue and formatted and written by a background
+thread, so a slow terminal or log file never stalls the event loop.
+Repeated messages (keyed by their unformatted template) pass freely up to a
+burst per period, then only one in ``sample_every`` gets through, and the
+next record that passes notes how many were dropped.
+"""
+
+import atexit
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+class SamplingFilter(logging.Filter):
+    """Rate-limits and samples repetitive records per message template."""
+
+    def __init__(self, burst: int = 20, period: float = 10.0, sample_every: int = 100, max_keys: int = 2048):
+        super().__init__()
+        self.burst = burst  # records per template let through each period
+        self.period = period
+        self.sample_every = sample_every  # then one in this many
+        self.max_keys = max_keys
+        self.windows: Dict[tuple, list] = {}  # (logger, template) -> [window_start, count, suppressed]
+        self.suppressed_total = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.CRITICAL:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        window = self.windows.get(key)
+        if window is None:
+            if len(self.windows) >= self.max_keys:
+                self.windows.clear()  # f-string messages make unbounded keys; start over
+            window = self.windows[key] = [now, 0, 0]
+        elif now - window[0] >= self.period:
+            window[0] = now
+            window[1] = 0
+
+        window[1] += 1
+        count = window[1]
+        if count > self.burst and (count - self.burst) % self.sample_every:
+            window[2] += 1
+            self.suppressed_total += 1
+            return False
+        if window[2]:
+            record.msg = f'{record.msg} [+{window[2]} similar suppressed]'
+            window[2] = 0
+        return True
+
+    def get_stats(self) -> dict:
+        return {'suppressed': self.suppressed_total, 'templates': len(self.windows)}
+
+class LazyQueueHandler(QueueHandler):
+    """Enqueues records as-is; formatting happens on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock handler formats here, on the caller's thread. Same process, so no pickling needed.
+        return record
+
+_listener: Optional[QueueListener] = None
+_sampler: Optional[SamplingFilter] = None
+
+def configure_logging(level: int = logging.INFO, fmt: str = LOG_FORMAT) -> SamplingFilter:
+    """Route the root logger through a sampled queue to a background writer thread."""
+    global _listener, _sampler
+    if _sampler is not None:
+        return _sampler
+
+    output = logging.StreamHandler()
+    output.setFormatter(logging.Formatter(fmt))
+    records = queue.SimpleQueue()
+    _sampler = SamplingFilter()
+    handler = LazyQueueHandler(records)
+    handler.addFilter(_sampler)
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(handler)
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)  # flush what is queued on exit
+    return _sampler
@@ -0,0 +1,98 @@
+"""
+Event loop lag watchdog.
+A task on the loop wakes every ``interval`` and records how late it was
+scheduled. A helper thread watches that heartbeat: if the loop stops
+beating for longer than ``threshold`` it logs the stack the loop thread is
+stuck in, so blocking serial reads or oversized encodes show up by name.
+"""
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+class LoopWatchdog:
+    """Measures event loop scheduling lag and reports stalls."""
+
+    def __init__(self, interval: float = 0.1, threshold: float = 0.25, history: int = 600):
+        self.interval = interval  # seconds between heartbeats
+        self.threshold = threshold  # lag that counts as a stall
+        self.recent = deque(maxlen=history)  # recent lag samples, seconds
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.total_lag = 0.0
+        self.samples = 0
+        self.stalls = 0
+        self.heartbeat = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+        self.thread: Optional[threading.Thread] = None
+        self.loop_thread_id: Optional[int] = None
+        self.running = False
+
+    def start(self):
+        """Start the heartbeat task and the stall monitor (call from the loop)."""
+        if self.running:
+            return
+        self.running = True
+        self.loop_thread_id = threading.get_ident()
+        self.heartbeat = time.monotonic()
+        self.task = asyncio.get_running_loop().create_task(self._beat())
+        self.thread = threading.Thread(target=self._monitor, name='loop-watchdog', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stop measuring."""
+        self.running = False
+        if self.task:
+            self.task.cancel()
+
+    async def _beat(self):
+        while self.running:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self.record(max(0.0, now - expected))
+            self.heartbeat = now
+
+    def record(self, lag: float):
+        """Add one lag sample."""
+        self.last_lag = lag
+        self.total_lag += lag
+        self.samples += 1
+        self.recent.append(lag)
+        if lag > self.max_lag:
+            self.max_lag = lag
+
+    def _monitor(self):
+        """Log the loop thread's stack once per stall."""
+        reported = None
+        while self.running:
+            time.sleep(self.interval / 2)
+            beat = self.heartbeat
+            blocked = time.monotonic() - beat - self.interval
+            if blocked < self.threshold or reported == beat:
+                continue
+            reported = beat
+            self.stalls += 1
+            frame = sys._current_frames().get(self.loop_thread_id)
+            stack = ''.join(traceback.format_stack(frame)) if frame is not None else '  (no frame)\n'
+            logger.warning("Event loop blocked for %.0fms, currently in:\n%s", blocked * 1000, stack)
+
+    def to_dict(self) -> dict:
+        """Lag figures in milliseconds."""
+        ordered = sorted(self.recent)
+        p99 = ordered[int(len(ordered) * 0.99)] if ordered else 0.0
+        return {
+            'last_ms': round(self.last_lag * 1000, 2),
+            'avg_ms': round(self.total_lag / self.samples * 1000, 2) if self.samples else 0.0,
+            'p99_ms': round(p99 * 1000, 2),
+            'max_ms': round(self.max_lag * 1000, 2),
+            'samples': self.samples,
+            'stalls': self.stalls
+        }
@@ -6,33 +6,111 @@ Supports Arduino emergency button integration for classroom demos.
 """
 
 import asyncio
-import json
 import logging
+import math
+import threading
+import time
 import uuid
+from urllib.parse import parse_qs
 import websockets
 from websockets import WebSocketServerProtocol
-from arduino_interface import ArduinoInterface
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+from codec import Codec, CodecError
+from compression import CompressionPolicy
+from dead_reckoning import DeadReckoning
+from logging_setup import configure_logging
+from join_batcher import JoinBatcher
+from loop_watchdog import LoopWatchdog
+from http_api import StateHTTPAPI
+from emergency_events import EmergencyAssignments, EmergencyEventLog
+from choreography import TakeoverChoreographer
+from path_clearing import PathClearingScheduler
+from profiling import HandlerTimings, SamplingProfiler
+from outbound_queue import OutboundQueue, OutboundStats
+from rate_limiter import AdmissionController
+from relay import RelayNode
+from serial_watcher import SerialWatcher
+from rsu_coverage import CoverageMap
+from session_store import SessionStore
+from slot_allocator import SlotAllocator
+from timer_wheel import TimerWheel
+from trajectory import TrajectoryStore
+
+# Configure logging: queued to a writer thread, repetitive lines sampled
+log_sampler = configure_logging(logging.INFO)
 logger = logging.getLogger(__name__)
 
 class SimpleVehicleServer:
     """Simple WebSocket server for vehicle communication simulation."""
 
-    def __init__(self, host: str = '0.0.0.0', port: int = 8765):
+    def __init__(self, host: str = '0.0.0.0', port: int = 8765, codec_backend: str = 'json',
+                 node_id: str = None, relay_peers: list = None, serial_port: str = None,
+                 rsu_ids: list = None, lora_rsu_id: str = None):
         self.host = host
         self.port = port
+        self.serial_port = serial_port  # None = auto-detect the LoRa receiver
+        self.codec = Codec(backend=codec_backend)
+        # Corridor demos link several servers; emergencies are relayed between them
+        self.relay = RelayNode(self, node_id, relay_peers) if node_id else None
         self.connections = {}  # device_id -> websocket
+        self.outbound = {}  # device_id -> OutboundQueue
+        self.outbound_stats = OutboundStats()
+        self.compression = CompressionPolicy()
         self.device_states = {}  # device_id -> state info
         self.roster = {}  # device_id -> {name, color}
-        self.emergency_active = False
-        self.emergency_device = None
+        self.admins = set()  # device_ids registered with role=admin
+        self.join_batcher = JoinBatcher(self, window=0.1)  # coalesces join storms
+        self.trajectories = TrajectoryStore(capacity=600)  # up to ~30s of (t, x, y, speed, lane) at 20 Hz
+        self.emergency_events = EmergencyEventLog()  # absorbs repeated triggers/clears
+        self.emergencies = EmergencyAssignments()  # concurrent emergencies and their vehicles
+        self.coverage = CoverageMap(road_length=800, segment_length=200, rsu_ids=rsu_ids or None)
+        self.dead_reckoning = DeadReckoning(road_length=self.coverage.road_length)
+        # One slot per car length (40 units, the choreography gap): 60 on an 800-unit road
+        self.slots = SlotAllocator(road_length=self.coverage.road_length, num_lanes=3, spacing=40)
+        self.path_clearing = PathClearingScheduler(road_length=self.coverage.road_length)
+        self.clearing_waves = {}  # emergency_id -> pending wave timer handles
+        self.takeover_scheduled = {}  # emergency_id -> device_ids given a wave
+        self.takeover_notified = {}  # emergency_id -> device_ids sent the takeover
+        self.choreography = TakeoverChoreographer(road_length=self.coverage.road_length)
+        self.takeover_plans = {}  # emergency_id -> {device_id: instruction}
+        if lora_rsu_id is not None and lora_rsu_id not in self.coverage.rsu_segments:
+            raise ValueError(f"Unknown LoRa RSU {lora_rsu_id!r}, expected one of {sorted(self.coverage.rsu_segments)}")
+        self.lora_rsu_id = lora_rsu_id  # RSU the serial LoRa receiver belongs to, None = all segments
         self.session_id = "classroom_demo_2024"  # Single shared session for everyone
         self.arduino_connected = False
+        self.arduino = None  # attached ArduinoInterface, managed by the serial watcher
+        self.serial_watcher = None
+        self.started_at = None  # perf_counter when start_server began
+        self.startup_timings = {}  # startup phase -> ms since started_at
+        self.sessions = SessionStore(replay_limit=64, grace_period=30.0)
+        self.admission = AdmissionController()
+        self.timings = HandlerTimings()  # per message type handler and broadcast times
+        self.profiler = SamplingProfiler()
+        self.loop_watchdog = LoopWatchdog(interval=0.1, threshold=0.25)
+        self.http_api = StateHTTPAPI(self, max_age=0.5)  # one encode per state push interval
+
+        # Message type -> handler, looked up once per message
+        self.message_handlers = {
+            'register_user': self._handle_register_user,
+            'register_emergency': self._handle_register_emergency,
+            'register': self._handle_register_emergency,
+            'clear_emergency': self._handle_clear_emergency,
+            'position_update': self._handle_position_update,
+            'lane_change': self._handle_lane_change,
+            'get_timings': self._handle_get_timings,
+            'start_profile': self._handle_start_profile,
+        }
+        # Roles and admin commands always act as the sending connection, never a quoted device_id
+        self.connection_bound = {'register_user', 'get_timings', 'start_profile'}
+
+        # One timer wheel drives state pushes, idle checks and heartbeats
+        self.state_interval = 0.5  # 2x per second
+        self.ping_interval = 20
+        self.ping_timeout = 10
+        self.last_seen = {}  # device_id -> monotonic time of last frame or pong
+        self.timers = TimerWheel(tick_interval=0.1)
+        self.timers.register_job('state_push', self.state_interval, self.push_state_batch)
+        self.timers.register_job('heartbeat', self.ping_interval, self.heartbeat_batch)
+        self.timers.register_job('idle_check', self.ping_timeout, self.idle_check_batch)
 
     def generate_device_id(self):
         """Generate a unique device ID."""
@@ -45,8 +123,14 @@ class SimpleVehicleServer:
 
         # Auto-assign vehicle position to avoid overlaps in shared view
         num_vehicles = len(self.device_states)
-        lane = (num_vehicles % 3) + 1  # Distribute across 3 lanes
-        position_x = (num_vehicles * 150) % 800  # Spread horizontally
+        place = self.slots.allocate(device_id)
+        if place:
+            lane, position_x = place
+        else:
+            # Every slot taken: share a spot rather than refuse the student
+            lane = (num_vehicles % 3) + 1
+            position_x = (num_vehicles * 150) % self.coverage.road_length
+            logger.warning("Road full (%d slots), vehicle %s overlaps another", self.slots.capacity, device_id)
 
         # Initialize device state
         self.device_states[device_id] = {
@@ -59,18 +143,27 @@ class SimpleVehicleServer:
             'is_emergency_active': device_type == 'emergency_vehicle',
             'color': self.generate_vehicle_color(num_vehicles)
         }
+        self.coverage.place(device_id, position_x)
 
-        logger.info(f"Device registered: {device_id} | Total vehicles: {len(self.device_states)}")
+        logger.info("Device registered: %s | Total vehicles: %d", device_id, len(self.device_states))
         
-        # Broadcast to all that a new vehicle joined
-        await self.broadcast_message({
-            'type': 'vehicle_joined',
-            'device_id': device_id,
-            'total_vehicles': len(self.device_states)
-        }, exclude_device=device_id)
+        # Announce the new vehicle (batched with others joining at the same time)
+        await self.join_batcher.joined(device_id)
         
         return device_id
     
+    @property
+    def emergency_active(self) -> bool:
+        """Whether any emergency is active."""
+        return bool(self.emergencies.active)
+
+    @property
+    def emergency_device(self):
+        """Device of the most recently started active emergency."""
+        if not self.emergencies.active:
+            return None
+        return next(reversed(self.emergencies.active.values())).device_id
+
     def generate_vehicle_color(self, index):
         """Generate a unique color for each vehicle."""
         colors = ['#3498db', '#e74c3c', '#2ecc71', '#f39c12', '#9b59b6', 
@@ -83,213 +176,626 @@ class SimpleVehicleServer:
             del self.connections[device_id]
         if device_id in self.device_states:
             del self.device_states[device_id]
-
-        logger.info(f"Device unregistered: {device_id}")
-
-    async def broadcast_message(self, message: dict, exclude_device: str = None):
-        """Broadcast message to all connected devices."""
-        disconnected = []
-        # Create a copy to avoid dictionary changed size during iteration
-        connections_copy = list(self.connections.items())
-        for device_id, websocket in connections_copy:
-            if device_id != exclude_device:
-                try:
-                    await websocket.send(json.dumps(message))
-                except websockets.exceptions.ConnectionClosed:
-                    disconnected.append(device_id)
-
-        # Clean up disconnected devices
-        for device_id in disconnected:
+        self.sessions.discard(device_id)
+        self.detach_outbound(device_id)
+        self.timers.remove(device_id)
+        self.last_seen.pop(device_id, None)
+        self.admission.forget(device_id)
+        self.coverage.remove(device_id)
+        self.emergencies.forget_vehicle(device_id)
+        self.trajectories.forget(device_id)
+        self.dead_reckoning.forget(device_id)
+        self.slots.release(device_id)
+        self.admins.discard(device_id)
+        self.join_batcher.forget(device_id)
+
+        logger.info("Device unregistered: %s", device_id)
+
+    async def detach_device(self, device_id: str, websocket: WebSocketServerProtocol = None):
+        """Drop a device's connection but keep its vehicle for the resume grace period."""
+        if websocket is not None and self.connections.get(device_id) is not websocket:
+            return  # Already resumed on a newer connection
+        if self.sessions.get(device_id) is None:
+            await self.unregister_device(device_id)
+            return
+
+        self.connections.pop(device_id, None)
+        self.detach_outbound(device_id)
+        self.timers.remove(device_id)
+        self.last_seen.pop(device_id, None)
+        self.sessions.detach(device_id)  # admission buckets stay, so reconnecting does not refill them
+        asyncio.get_running_loop().call_later(
+            self.sessions.grace_period,
+            lambda: asyncio.ensure_future(self.expire_session(device_id))
+        )
+        logger.info("Device detached: %s | Resumable for %.0fs", device_id, self.sessions.grace_period)
+
+    async def expire_session(self, device_id: str):
+        """Unregister a detached device whose grace period ran out."""
+        if self.sessions.is_expired(device_id):
             await self.unregister_device(device_id)
 
+    async def resume_device(self, websocket: WebSocketServerProtocol, token: str):
+        """Re-attach a reconnecting client to its previous vehicle."""
+        resumed = self.sessions.resume(token)
+        if resumed is None:
+            return None
+
+        session, missed_events, overflowed = resumed
+        stale = self.connections.get(session.device_id)
+        self.connections[session.device_id] = websocket
+        if stale is not None and stale is not websocket:
+            # Reconnected before the old socket was noticed dropping: retire it
+            self.detach_outbound(session.device_id)
+            asyncio.create_task(stale.close(1000, 'resumed on a new connection'))
+            logger.info("Device %s resumed while still attached, closing its old connection", session.device_id)
+        logger.info("Device resumed: %s | Replaying %d events", session.device_id, len(missed_events))
+        return session.device_id, missed_events, overflowed
+
+    def attach_outbound(self, device_id: str, websocket: WebSocketServerProtocol):
+        """Start the priority writer for a device's connection."""
+        self.detach_outbound(device_id)
+        queue = OutboundQueue(
+            websocket,
+            self.outbound_stats,
+            on_closed=lambda: self.detach_device(device_id, websocket),
+            on_resync=lambda: self.join_batcher.send_full_roster(device_id)
+        )
+        self.outbound[device_id] = queue
+        queue.start()
+
+    def detach_outbound(self, device_id: str):
+        """Stop a device's priority writer."""
+        queue = self.outbound.pop(device_id, None)
+        if queue:
+            queue.close()
+
+    def send_to_device(self, device_id: str, message_type: str, message_str: str, key=None):
+        """Queue an encoded message for a single device."""
+        queue = self.outbound.get(device_id)
+        if queue:
+            queue.put(message_type, message_str, key)
+
+    async def broadcast_message(self, message: dict, exclude_device: str = None, recipients: set = None):
+        """Broadcast message to all connected devices, or only to ``recipients`` if given."""
+        started = time.perf_counter()
+        message_str = self.codec.encode(message)
+        message_type = message.get('type')
+        self.sessions.record(message_type, message_str, exclude_device, recipients)
+
+        # Newer position and lane frames for the same vehicle replace queued ones
+        key = None
+        if message_type in ('position_update', 'lane_change'):
+            key = (message_type, message.get('device_id'))
+
+        if recipients is None:
+            # Create a copy to avoid dictionary changed size during iteration
+            targets = list(self.outbound.items())
+        else:
+            targets = [(device_id, self.outbound.get(device_id)) for device_id in recipients]
+        for device_id, queue in targets:
+            if queue is not None and device_id != exclude_device:
+                queue.put(message_type, message_str, key)
+        self.timings.record(f'broadcast:{message_type}', time.perf_counter() - started)
+
+    def extrapolate_positions(self):
+        """Move vehicles that report positions along their dead-reckoned track."""
+        for device_id, x in self.dead_reckoning.predict_all():
+            state = self.device_states.get(device_id)
+            if state:
+                state['position_x'] = round(x, 1)
+                self.coverage.place(device_id, x)
+
+    def encode_system_state(self) -> str:
+        """Encode the current system state message."""
+        self.extrapolate_positions()
+        state_msg = {
+            'type': 'system_state',
+            'devices': self.device_states,
+            'emergency_status': {
+                'active': self.emergency_active,
+                'active_emergency_device': self.emergency_device,
+                'emergencies': self.emergencies.get_status()
+            }
+        }
+        return self.codec.encode(state_msg)
+
     async def send_state_update(self, device_id: str):
         """Send current system state to a specific device."""
         if device_id in self.connections:
-            state_msg = {
-                'type': 'system_state',
-                'devices': self.device_states,
-                'emergency_status': {
-                    'active': self.emergency_active,
-                    'active_emergency_device': self.emergency_device
-                }
-            }
-            try:
-                await self.connections[device_id].send(json.dumps(state_msg))
-            except:
-                pass
-
-    async def handle_message(self, websocket: WebSocketServerProtocol, message: str):
-        """Handle incoming message."""
+            self.send_to_device(device_id, 'system_state', self.encode_system_state(), key='system_state')
+
+    def push_state_batch(self, device_ids: list):
+        """Timer job: push one shared system state snapshot to every due device."""
+        state_str = self.encode_system_state()
+        for device_id in device_ids:
+            self.send_to_device(device_id, 'system_state', state_str, key='system_state')
+
+    def heartbeat_batch(self, device_ids: list):
+        """Timer job: ping every due device in one task."""
+        websockets_to_ping = [
+            (device_id, self.connections[device_id])
+            for device_id in device_ids if device_id in self.connections
+        ]
+        if websockets_to_ping:
+            asyncio.create_task(self._send_pings(websockets_to_ping))
+
+    async def _send_pings(self, websockets_to_ping: list):
+        # Concurrently: each ping waits for its socket to drain, and one slow
+        # client must not hold up the heartbeat of every socket after it
+        await asyncio.gather(*(self._ping(device_id, websocket) for device_id, websocket in websockets_to_ping))
+
+    async def _ping(self, device_id: str, websocket: WebSocketServerProtocol):
+        try:
+            pong_waiter = await asyncio.wait_for(websocket.ping(), self.ping_timeout)
+        except (websockets.exceptions.ConnectionClosed, asyncio.TimeoutError):
+            return
+        pong_waiter.add_done_callback(lambda waiter: self._on_pong(device_id, waiter))
+
+    def _on_pong(self, device_id: str, pong_waiter: asyncio.Future):
+        if not pong_waiter.cancelled() and pong_waiter.exception() is None:
+            self.mark_seen(device_id)
+
+    def idle_check_batch(self, device_ids: list):
+        """Timer job: close connections that have not been heard from in time."""
+        deadline = time.monotonic() - (self.ping_interval + self.ping_timeout)
+        for device_id in device_ids:
+            websocket = self.connections.get(device_id)
+            if websocket and self.last_seen.get(device_id, 0) < deadline:
+                logger.info("Closing idle connection: %s", device_id)
+                self.timers.remove(device_id)
+                asyncio.create_task(websocket.close(1011, 'keepalive ping timeout'))
+
+    def mark_seen(self, device_id: str):
+        """Record that a device's connection is alive."""
+        if device_id in self.connections:
+            self.last_seen[device_id] = time.monotonic()
+
+    def count_recipients(self, recipients: set = None) -> int:
+        """Count connected vehicles in a broadcast scope (None = all)."""
+        if recipients is None:
+            return len(self.connections)
+        return sum(1 for device_id in recipients if device_id in self.connections)
+
+    def log_emergency_queue_wait(self):
+        """Log how long emergency frames waited behind other traffic."""
+        wait = self.outbound_stats.to_dict()['emergency_queue_wait_ms']
+        logger.info("   ⏱️  Emergency frame queue wait: avg %sms, max %sms over %d frames",
+                    wait['avg'], wait['max'], wait['count'])
+
+    def log_suppressed_emergencies(self):
+        """Log how many repeated emergency requests were absorbed."""
+        stats = self.emergency_events.get_stats()
+        if stats['suppressed_total']:
+            logger.info("   🔁 Absorbed %d repeated emergency events (%d broadcast): %s",
+                        stats['suppressed_total'], stats['broadcasts'], stats['suppressed'])
+
+    async def handle_message(self, websocket: WebSocketServerProtocol, message: str, device_id: str = None,
+                             charged_type: str = None):
+        """Handle incoming message.
+
+        ``charged_type`` is the type admission control charged the raw frame
+        to; a message that decodes to another type is dropped.
+        """
         try:
-            data = json.loads(message)
-            device_id = data.get('device_id')
-            message_type = data.get('type')
+            data = self.codec.decode(message)
+        except CodecError as e:
+            logger.warning("Rejected message from %s: %.120s", device_id, e)
+            return
+        if charged_type is not None and not self.admission.confirm(device_id, charged_type, data['type']):
+            return
 
-            # Find device_id if not provided
-            if not device_id:
+        try:
+            connection_id = device_id
+            if not connection_id:
                 for did, ws in self.connections.items():
                     if ws == websocket:
-                        device_id = did
+                        connection_id = did
                         break
 
+            # Prefer the device_id in the message, else the connection's own
+            if data['type'] in self.connection_bound:
+                device_id = connection_id
+            else:
+                device_id = data.get('device_id') or connection_id
+
             if not device_id or device_id not in self.connections:
                 return
 
-            if message_type == 'register_user':
-                # Student registers with name/color
-                name = data.get('name', 'Student')[:32]
-                color = data.get('color') or self.generate_vehicle_color(len(self.roster))
-                role = data.get('role', 'student')
-                self.roster[device_id] = { 'name': name, 'color': color }
-                # Update device state color too
-                if device_id in self.device_states:
-                    self.device_states[device_id]['color'] = color
-                    if role == 'admin':
-                        self.device_states[device_id]['vehicle_type'] = 'emergency_vehicle'
-                        self.device_states[device_id]['is_emergency_active'] = True
-                await self.broadcast_message({
-                    'type': 'roster_update',
-                    'roster': self.roster
-                })
-                return
+            handler = self.message_handlers.get(data['type'])
+            if handler:
+                started = time.perf_counter()
+                await handler(device_id, data)
+                self.timings.record(f"handle:{data['type']}", time.perf_counter() - started)
 
-            if message_type == 'register_emergency' or message_type == 'register':
-                # Handle emergency from either web client or LoRa gateway
-                source = data.get('source', 'vehicle')
-                rssi = data.get('rssi', 0)
-                snr = data.get('snr', 0)
-                
-                if source == 'cv2x_lora':
-                    logger.info(f"📡 C-V2X LoRa emergency received via gateway | RSSI: {rssi} dBm, SNR: {snr} dB")
-                
-                await self.trigger_emergency(device_id, source)
-
-            elif message_type == 'clear_emergency':
-                source = data.get('source', 'vehicle')
-                await self.clear_emergency(device_id, source)
-
-            elif message_type == 'position_update':
-                # Update device position
-                if device_id in self.device_states:
-                    position = data.get('position', {})
-                    self.device_states[device_id].update({
-                        'position_x': position.get('x', self.device_states[device_id]['position_x']),
-                        'position_y': position.get('y', self.device_states[device_id]['position_y']),
-                        'speed': position.get('speed', self.device_states[device_id]['speed'])
-                    })
-
-                    # Broadcast position update
-                    pos_msg = {
-                        'type': 'position_update',
-                        'device_id': device_id,
-                        'position': self.device_states[device_id]
-                    }
-                    await self.broadcast_message(pos_msg, exclude_device=device_id)
-
-            elif message_type == 'lane_change':
-                # Handle lane change
-                new_lane = data.get('new_lane')
-                if new_lane and device_id in self.device_states:
-                    old_lane = self.device_states[device_id]['current_lane']
-                    self.device_states[device_id]['current_lane'] = new_lane
-
-                    # Broadcast lane change
-                    lane_msg = {
-                        'type': 'lane_change',
-                        'device_id': device_id,
-                        'old_lane': old_lane,
-                        'new_lane': new_lane,
-                        'reason': data.get('reason', 'manual')
-                    }
-                    await self.broadcast_message(lane_msg, exclude_device=device_id)
-
-        except json.JSONDecodeError:
-            logger.warning(f"Invalid JSON received: {message}")
         except Exception as e:
-            logger.error(f"Error handling message: {e}")
-    
-    async def trigger_emergency(self, device_id, source='vehicle'):
-        """Trigger emergency signal from a specific device - WITH TAKEOVER."""
-        self.emergency_active = True
-        self.emergency_device = device_id
+            logger.error("Error handling message: %.200s", e)
+
+    async def _handle_register_user(self, device_id: str, data: dict):
+        """Student registers with name/color."""
+        name = data.get('name', 'Student')[:32]
+        color = data.get('color') or self.generate_vehicle_color(len(self.roster))
+        role = data.get('role', 'student')
+        self.roster[device_id] = { 'name': name, 'color': color }
+        # Update device state color too
+        if device_id in self.device_states:
+            self.device_states[device_id]['color'] = color
+            if role == 'admin':
+                self.admins.add(device_id)
+                self.device_states[device_id]['vehicle_type'] = 'emergency_vehicle'
+                self.device_states[device_id]['is_emergency_active'] = True
+        await self.join_batcher.roster_changed(device_id)
+
+    async def _handle_get_timings(self, device_id: str, data: dict):
+        """Admin: send per-handler timings, optionally resetting them."""
+        if device_id not in self.admins:
+            return
+        self.send_to_device(device_id, 'handler_timings', self.codec.encode({
+            'type': 'handler_timings',
+            'timings': self.timings.to_dict(),
+            'loop_lag': self.loop_watchdog.to_dict(),
+            'startup_ms': self.startup_timings,
+            'lora_receiver': self.serial_watcher.get_status() if self.serial_watcher else None,
+            'logging': log_sampler.get_stats(),
+            'admission': self.admission.get_stats(),
+            'http_api': self.http_api.get_stats(),
+            'slots': self.slots.get_stats(),
+            'trajectories': self.trajectories.get_stats(),
+            'outbound': self.outbound_stats.to_dict()
+        }))
+        if data.get('reset'):
+            self.timings.reset()
+
+    async def _handle_start_profile(self, device_id: str, data: dict):
+        """Admin: sample the event loop for ``duration`` seconds and report the profile."""
+        if device_id not in self.admins:
+            return
+        loop = asyncio.get_running_loop()
+
+        def on_done(result):
+            message_str = self.codec.encode({'type': 'profile_result', **result})
+            loop.call_soon_threadsafe(self.send_to_device, device_id, 'profile_result', message_str)
+
+        started = self.profiler.start(data.get('duration', 10), threading.get_ident(), on_done)
+        self.send_to_device(device_id, 'profile_started', self.codec.encode({
+            'type': 'profile_started',
+            'started': started,
+            'message': 'Profiling' if started else 'A profile is already running'
+        }))
+        if started:
+            logger.info("🔬 Profiling requested by admin %s", device_id)
+
+    async def _handle_register_emergency(self, device_id: str, data: dict):
+        """Handle emergency from either web client or LoRa gateway."""
+        source = data.get('source', 'vehicle')
+        rssi = data.get('rssi', 0)
+        snr = data.get('snr', 0)
 
-        # Broadcast emergency TAKEOVER to ALL devices
-        message_text = '🚨 EMERGENCY VEHICLE APPROACHING - INITIATING TAKEOVER MODE'
         if source == 'cv2x_lora':
-            message_text = '📡 C-V2X EMERGENCY BROADCAST RECEIVED - INITIATING TAKEOVER MODE'
-        
-        emergency_msg = {
+            logger.info("📡 C-V2X LoRa emergency received via gateway | RSSI: %s dBm, SNR: %s dB", rssi, snr)
+
+        await self.trigger_emergency(device_id, source, data.get('rsu_id'),
+                                     emergency_id=data.get('emergency_id'), seq=data.get('seq'))
+
+    async def _handle_clear_emergency(self, device_id: str, data: dict):
+        """Handle emergency clear request."""
+        source = data.get('source', 'vehicle')
+        await self.clear_emergency(device_id, source,
+                                   emergency_id=data.get('emergency_id'), seq=data.get('seq'))
+
+    async def _handle_position_update(self, device_id: str, data: dict):
+        """Update device position and relay it."""
+        if device_id in self.device_states:
+            position = data.get('position') or {}
+            self.device_states[device_id].update({
+                'position_x': position.get('x', self.device_states[device_id]['position_x']),
+                'position_y': position.get('y', self.device_states[device_id]['position_y']),
+                'speed': position.get('speed', self.device_states[device_id]['speed'])
+            })
+            now = time.monotonic()
+            state = self.device_states[device_id]
+            self.coverage.place(device_id, state['position_x'])
+            self.trajectories.record_state(device_id, state, now)
+            self.dead_reckoning.report(device_id, state['position_x'], state['speed'], now)
+
+            # Broadcast position update to this and neighbouring road segments
+            pos_msg = {
+                'type': 'position_update',
+                'device_id': device_id,
+                'position': self.device_states[device_id]
+            }
+            await self.broadcast_message(
+                pos_msg, exclude_device=device_id,
+                recipients=self.coverage.recipients_near(device_id)
+            )
+
+    async def _handle_lane_change(self, device_id: str, data: dict):
+        """Handle lane change and relay it."""
+        new_lane = data.get('new_lane')
+        if new_lane and device_id in self.device_states:
+            old_lane = self.device_states[device_id]['current_lane']
+            self.device_states[device_id]['current_lane'] = new_lane
+            self.trajectories.record_state(device_id, self.device_states[device_id], time.monotonic())
+
+            # Broadcast lane change
+            lane_msg = {
+                'type': 'lane_change',
+                'device_id': device_id,
+                'old_lane': old_lane,
+                'new_lane': new_lane,
+                'reason': data.get('reason', 'manual')
+            }
+            await self.broadcast_message(
+                lane_msg, exclude_device=device_id,
+                recipients=self.coverage.recipients_near(device_id)
+            )
+
+    def emergency_scope(self, device_id: str = None, source: str = 'vehicle', rsu_id: str = None):
+        """Resolve which vehicles an emergency should reach.
+
+        Gateway reports are scoped to the reporting RSU's zone, vehicle reports
+        to the emergency vehicle's segment and its neighbours. None means all.
+        """
+        if rsu_id:
+            return self.coverage.recipients_for_rsu(rsu_id)
+        if source == 'cv2x_lora':
+            return None
+        return self.coverage.recipients_near(device_id)
+
+    def emergency_position(self, device_id: str = None, rsu_id: str = None):
+        """Locate an emergency: the vehicle itself, else the middle of its RSU's zone."""
+        state = self.device_states.get(device_id)
+        if state:
+            return state['position_x']
+        segment_ids = self.coverage.rsu_segments.get(rsu_id) if rsu_id else None
+        if segment_ids:
+            segments = [self.coverage.segments[i] for i in segment_ids]
+            return (segments[0].start_x + segments[-1].end_x) / 2
+        return None
+
+    def takeover_message(self, record, **extra) -> dict:
+        """Build the takeover message for one emergency."""
+        return {
             'type': 'emergency_takeover',
-            'device_id': device_id,
-            'message': message_text,
-            'source': source,
-            'takeover': True  # Signal to clients: server takes control
+            'device_id': record.device_id,
+            'emergency_id': record.emergency_id,
+            'seq': record.seq,
+            'message': record.message,
+            'source': record.source,
+            'takeover': True,  # Signal to clients: server takes control
+            **extra
+        }
+
+    async def activate_emergency(self, record, rsu_id: str = None, publish: bool = True) -> int:
+        """Scope an accepted emergency, assign vehicles to it and send the takeover.
+
+        A refresh of an active emergency keeps the waves already scheduled and
+        only schedules vehicles that have come into scope since.
+        Returns the number of vehicles following this emergency.
+        """
+        self.extrapolate_positions()
+        record.recipients = self.emergency_scope(record.device_id, record.source, rsu_id)
+        record.position_x = self.emergency_position(record.device_id, rsu_id)
+        candidates = record.recipients if record.recipients is not None else list(self.connections)
+        # A vehicle yielding to another emergency stops yielding once it leads its own
+        previous_id = self.emergencies.vehicle_emergency.get(record.device_id)
+        followers = self.emergencies.add(record, candidates, self.device_states)
+        if previous_id is not None and previous_id != record.emergency_id:
+            await self.release_leader(record.device_id, previous_id)
+        scheduled = self.takeover_scheduled.setdefault(record.emergency_id, set())
+        newcomers = followers - scheduled - self.takeover_notified.get(record.emergency_id, set())
+
+        if newcomers:
+            # Slot newcomers around the instructions vehicles already scheduled keep
+            self.choreograph(record, newcomers)
+
+            # Send each newcomer its own TAKEOVER in waves ordered by ETA
+            state = self.device_states.get(record.device_id)
+            emergency_speed = max(state['speed'] if state else 0, self.path_clearing.emergency_speed)
+            waves = self.path_clearing.plan(record.position_x, newcomers, self.device_states, emergency_speed)
+            scheduled |= newcomers
+            loop = asyncio.get_running_loop()
+            handles = []
+            for wave in waves:
+                if wave.release_at <= 0:
+                    await self.release_clearing_wave(record.emergency_id, wave)
+                else:
+                    handles.append(loop.call_later(
+                        wave.release_at,
+                        lambda wave=wave: asyncio.ensure_future(self.release_clearing_wave(record.emergency_id, wave))
+                    ))
+            if handles:
+                self.clearing_waves.setdefault(record.emergency_id, []).extend(handles)
+                logger.info("   🌊 Path clearing in %d waves over %.1fs", len(waves), waves[-1].release_at)
+
+        if publish and self.relay:
+            await self.relay.publish(self.takeover_message(record))
+        return len(followers)
+
+    def choreograph(self, record, device_ids):
+        """Add lane and slot instructions for vehicles to an emergency's takeover plan.
+
+        Targets already handed out to its other followers stay reserved.
+        """
+        plan = self.takeover_plans.setdefault(record.emergency_id, {})
+        members = self.emergencies.members.get(record.emergency_id, ())
+        occupied = {device_id: instruction for device_id, instruction in plan.items() if device_id in members}
+        state = self.device_states.get(record.device_id)
+        started = time.perf_counter()
+        plan.update(self.choreography.plan(
+            record.position_x, state['current_lane'] if state else None, device_ids, self.device_states, occupied
+        ))
+        logger.info("   🧭 Choreographed %d vehicles in %.1fms",
+                    len(device_ids), (time.perf_counter() - started) * 1000)
+
+    async def start_emergency(self, record, rsu_id: str = None, publish: bool = True) -> int:
+        """Activate an accepted trigger, undoing it if activation fails part way."""
+        is_new = record.emergency_id not in self.emergencies.active
+        try:
+            return await self.activate_emergency(record, rsu_id, publish)
+        except Exception:
+            if is_new:
+                # Release whoever was already told and let the next trigger start afresh
+                await self.release_emergency(record, publish=False)
+                self.emergency_events.abort(record)
+            raise
+
+    async def release_clearing_wave(self, emergency_id: str, wave):
+        """Send the takeover to one wave's vehicles that still follow this emergency."""
+        record = self.emergencies.active.get(emergency_id)
+        if record is None:
+            return
+        members = self.emergencies.members.get(emergency_id, ())
+        recipients = [device_id for device_id in wave.device_ids if device_id in members]
+        # With the emergency's position unknown there is no ETA; JSON has no Infinity
+        eta = round(wave.max_eta, 1) if math.isfinite(wave.max_eta) else None
+        self.send_takeover(record, recipients, wave=wave.index, eta=eta)
+
+    def send_takeover(self, record, device_ids, **extra):
+        """Unicast the takeover to each vehicle with only its own instruction."""
+        started = time.perf_counter()
+        plan = self.takeover_plans.get(record.emergency_id, {})
+        self.takeover_notified.setdefault(record.emergency_id, set()).update(device_ids)
+        for device_id in device_ids:
+            message = self.takeover_message(record, instruction=plan.get(device_id), **extra)
+            message_str = self.codec.encode(message)
+            self.sessions.record_for(device_id, 'emergency_takeover', message_str)  # replayed if the vehicle resumes
+            self.send_to_device(device_id, 'emergency_takeover', message_str)
+        self.timings.record('broadcast:emergency_takeover', time.perf_counter() - started)
+
+    def cancel_clearing_waves(self, emergency_id: str):
+        """Drop the not-yet-released waves of an emergency."""
+        for handle in self.clearing_waves.pop(emergency_id, ()):
+            handle.cancel()
+
+    def cleared_message(self, record) -> dict:
+        """Build the message returning control to vehicles an emergency took over."""
+        return {
+            'type': 'emergency_cleared',
+            'device_id': record.device_id,
+            'emergency_id': record.emergency_id,
+            'seq': record.seq,
+            'source': record.source,
+            'takeover': False  # Signal: students regain control
         }
-        await self.broadcast_message(emergency_msg)
+
+    async def release_leader(self, device_id: str, emergency_id: str):
+        """Release a vehicle from an emergency it was yielding to now that it leads its own."""
+        self.takeover_scheduled.get(emergency_id, set()).discard(device_id)
+        self.takeover_plans.get(emergency_id, {}).pop(device_id, None)
+        notified = self.takeover_notified.get(emergency_id, set())
+        record = self.emergencies.active.get(emergency_id)
+        if device_id in notified and record is not None:
+            notified.discard(device_id)
+            await self.broadcast_message(self.cleared_message(record), recipients={device_id})
+
+    async def release_emergency(self, record, publish: bool = True) -> int:
+        """End an emergency; hand its vehicles to the next nearest one or release them.
+
+        Returns the number of vehicles that regained control.
+        """
+        self.cancel_clearing_waves(record.emergency_id)
+        self.takeover_plans.pop(record.emergency_id, None)
+        self.takeover_scheduled.pop(record.emergency_id, None)
+        notified = self.takeover_notified.pop(record.emergency_id, set())
+        released, handed_over = self.emergencies.remove(record, self.device_states)
+        for emergency_id, device_ids in handed_over.items():
+            # Vehicles that only followed the released emergency have no slot in this plan yet
+            other = self.emergencies.active[emergency_id]
+            unplanned = [d for d in device_ids if d not in self.takeover_plans.get(emergency_id, {})]
+            if unplanned:
+                self.choreograph(other, unplanned)
+            self.send_takeover(other, device_ids, reassigned=True)
+
+        # Broadcast emergency cleared to the vehicles that were taken over and are now under none
+        released &= notified
+        clear_msg = self.cleared_message(record)
+        await self.broadcast_message(clear_msg, recipients=released)
+        if publish and self.relay:
+            await self.relay.publish(clear_msg)
+        if handed_over:
+            logger.info("   🔀 %d vehicles handed over to %d other active emergencies",
+                        sum(map(len, handed_over.values())), len(handed_over))
+        return len(released)
+
+    async def apply_relayed_event(self, event: dict, origin: str = None):
+        """Apply an emergency event relayed from another server node."""
+        source = event.get('source', 'vehicle')
+        if event.get('type') == 'emergency_takeover':
+            logger.info("🔗 Emergency relayed from node %s", origin)
+            await self.trigger_emergency(event.get('device_id'), source, publish=False,
+                                         emergency_id=event.get('emergency_id'), seq=event.get('seq'))
+        elif event.get('type') == 'emergency_cleared':
+            logger.info("🔗 Emergency clear relayed from node %s", origin)
+            await self.clear_emergency(event.get('device_id'), source, publish=False,
+                                       emergency_id=event.get('emergency_id'), seq=event.get('seq'))
+
+    async def trigger_emergency(self, device_id, source='vehicle', rsu_id=None, publish=True,
+                                emergency_id=None, seq=None):
+        """Trigger emergency signal from a specific device - WITH TAKEOVER."""
+        record = self.emergency_events.trigger(emergency_id or device_id, device_id, source, emergency_id, seq)
+        if record is None:
+            logger.debug("Repeated emergency trigger from %s absorbed", device_id)
+            return
+
+        record.message = '🚨 EMERGENCY VEHICLE APPROACHING - INITIATING TAKEOVER MODE'
+        if source == 'cv2x_lora':
+            record.message = '📡 C-V2X EMERGENCY BROADCAST RECEIVED - INITIATING TAKEOVER MODE'
+        followers = await self.start_emergency(record, rsu_id, publish)
         
         if source == 'cv2x_lora':
-            logger.info(f"🚨 C-V2X Emergency triggered via LoRa: {device_id}")
+            logger.info("🚨 C-V2X Emergency triggered via LoRa: %s", device_id)
         else:
-            logger.info(f"🚨 Emergency TAKEOVER activated by: {device_id}")
-        logger.info(f"   🎮 All {len(self.connections)} vehicles under emergency control")
+            logger.info("🚨 Emergency TAKEOVER activated by: %s", device_id)
+        logger.info("   🎮 %d vehicles under emergency control (%d active emergencies)",
+                    followers, len(self.emergencies.active))
     
-    async def clear_emergency(self, device_id, source='vehicle'):
+    async def clear_emergency(self, device_id, source='vehicle', publish=True, emergency_id=None, seq=None):
         """Clear emergency signal from a specific device - RETURN CONTROL."""
-        self.emergency_active = False
-        self.emergency_device = None
+        record = self.emergency_events.clear(emergency_id or device_id, seq)
+        if record is None:
+            logger.debug("Repeated emergency clear from %s absorbed", device_id)
+            return
 
-        # Broadcast emergency cleared to ALL devices
-        clear_msg = {
-            'type': 'emergency_cleared',
-            'device_id': device_id,
-            'source': source,
-            'takeover': False  # Signal: students regain control
-        }
-        await self.broadcast_message(clear_msg)
+        released = await self.release_emergency(record, publish)
         
         if source == 'cv2x_lora':
-            logger.info(f"🟢 C-V2X Emergency cleared via LoRa: {device_id}")
+            logger.info("🟢 C-V2X Emergency cleared via LoRa: %s", device_id)
         else:
-            logger.info(f"🟢 Emergency cleared by: {device_id}")
-        logger.info(f"   🎮 Control returned to {len(self.connections)} students")
+            logger.info("🟢 Emergency cleared by: %s", device_id)
+        logger.info("   🎮 Control returned to %d students", released)
+        self.log_emergency_queue_wait()
+        self.log_suppressed_emergencies()
     
-    async def trigger_lora_emergency(self):
-        """Trigger emergency from LoRa receiver - TAKEOVER MODE."""
-        if not self.emergency_active:
-            self.emergency_active = True
-            self.emergency_device = "LORA_EMERGENCY"
-
-            # TAKEOVER: Broadcast emergency takeover to ALL vehicles
-            emergency_msg = {
-                'type': 'emergency_takeover',
-                'device_id': 'CV2X_EMERGENCY',
-                'message': '🚨 C-V2X EMERGENCY DETECTED - INITIATING TAKEOVER MODE',
-                'source': 'cv2x_lora',
-                'takeover': True  # Signal to clients: server takes control
-            }
-            await self.broadcast_message(emergency_msg)
-            logger.info(f"🎮 EMERGENCY TAKEOVER MODE ACTIVATED")
-            logger.info(f"   All {len(self.connections)} vehicles under emergency control")
+    async def trigger_lora_emergency(self) -> bool:
+        """Trigger emergency from LoRa receiver - TAKEOVER MODE.
+
+        Returns False if the detection was absorbed (e.g. a straggler just
+        after a clear), so the receiver keeps listening for retransmits.
+        """
+        record = self.emergency_events.trigger('LORA_EMERGENCY', 'CV2X_EMERGENCY', 'cv2x_lora')
+        if not record:
+            return False
+        # TAKEOVER: Broadcast emergency takeover to every vehicle in the receiver's zone
+        record.message = '🚨 C-V2X EMERGENCY DETECTED - INITIATING TAKEOVER MODE'
+        followers = await self.start_emergency(record, self.lora_rsu_id)
+        logger.info("🎮 EMERGENCY TAKEOVER MODE ACTIVATED")
+        logger.info("   %d vehicles under emergency control", followers)
+        return True
     
     async def clear_lora_emergency(self):
         """Clear emergency from LoRa - RETURN CONTROL."""
-        if self.emergency_active:
-            self.emergency_active = False
-            self.emergency_device = None
-
-            clear_msg = {
-                'type': 'emergency_cleared',
-                'device_id': 'CV2X_EMERGENCY',
-                'source': 'cv2x_lora',
-                'takeover': False  # Signal: students regain control
-            }
-            await self.broadcast_message(clear_msg)
-            logger.info(f"🟢 EMERGENCY CLEARED - CONTROL RETURNED TO STUDENTS\n")
+        record = self.emergency_events.clear('LORA_EMERGENCY')
+        if record:
+            await self.release_emergency(record)
+            logger.info("🟢 EMERGENCY CLEARED - CONTROL RETURNED TO STUDENTS")
+            self.log_emergency_queue_wait()
+            self.log_suppressed_emergencies()
     
     # Keep old Arduino methods for backward compatibility
     async def trigger_arduino_emergency(self):
         """Legacy method - calls LoRa emergency."""
-        await self.trigger_lora_emergency()
+        return await self.trigger_lora_emergency()
     
     async def clear_arduino_emergency(self):
         """Legacy method - calls LoRa clear."""
@@ -298,102 +804,169 @@ class SimpleVehicleServer:
     async def connection_handler(self, websocket):
         """Handle new WebSocket connection."""
         device_id = None
+        connect_started = time.perf_counter()
+        if 'first_accept' not in self.startup_timings and self.started_at is not None:
+            self.mark_startup('first_accept')
 
         try:
             # Register device
             device_type = None
+            resume_token = None
             # Check the path from websocket.request if available
+            path = None
             if hasattr(websocket, 'request') and websocket.request:
                 path = websocket.request.path
-                if '?' in path:
-                    query = path.split('?')[1]
-                    if 'type=emergency' in query:
-                        device_type = 'emergency_vehicle'
-
-            device_id = await self.register_device(websocket, device_type)
+            elif hasattr(websocket, 'path'):
+                path = websocket.path  # Legacy websockets protocol
+            if path and '?' in path:
+                query = path.split('?')[1]
+                params = parse_qs(query)
+                if 'type=emergency' in query:
+                    device_type = 'emergency_vehicle'
+                resume_token = params.get('resume', [None])[0]
+
+                # Peer server nodes link in for emergency relaying, not as vehicles
+                if self.relay and 'relay' in params:
+                    await self.relay.handle_peer(websocket, params['relay'][0])
+                    return
+
+            resumed = None
+            if resume_token:
+                resumed = await self.resume_device(websocket, resume_token)
+
+            if resumed:
+                device_id, missed_events, overflowed = resumed
+            else:
+                device_id = await self.register_device(websocket, device_type)
+                self.sessions.create(device_id)
+            self.attach_outbound(device_id, websocket)
 
             # Send welcome message
             welcome_msg = {
                 'type': 'welcome',
                 'device_id': device_id,
                 'vehicle_type': self.device_states[device_id]['vehicle_type'],
+                'resume_token': self.sessions.get(device_id).token,
+                'resumed': bool(resumed),
+                'dead_reckoning': self.dead_reckoning.settings(),
+                'road_full': device_id not in self.slots.owners,  # placed on top of another vehicle
                 'message': f'Device {device_id} connected successfully'
             }
-            await websocket.send(json.dumps(welcome_msg))
-
-            # Send current system state
-            state_msg = {
-                'type': 'system_state',
-                'devices': self.device_states,
-                'emergency_status': {
-                    'active': self.emergency_active,
-                    'active_emergency_device': self.emergency_device
-                }
-            }
-            await websocket.send(json.dumps(state_msg))
-
-            # Start periodic state updates
-            async def send_periodic_updates():
-                while device_id in self.connections:
-                    try:
-                        await asyncio.sleep(0.5)  # 2x per second
-                        await self.send_state_update(device_id)
-                    except:
-                        break
-
-            # Run both message handler and periodic updates
-            update_task = asyncio.create_task(send_periodic_updates())
-            
-            try:
-                # Handle incoming messages
-                async for message in websocket:
-                    await self.handle_message(websocket, message)
-            finally:
-                update_task.cancel()
+            self.send_to_device(device_id, 'welcome', self.codec.encode(welcome_msg))
+
+            if resumed and not overflowed:
+                # Replay only what was missed, each frame at its original priority
+                for message_type, event in missed_events:
+                    self.send_to_device(device_id, message_type, event)
+            else:
+                # Send current system state
+                await self.send_state_update(device_id)
+                if resumed:
+                    self.join_batcher.send_full_roster(device_id)  # missed deltas were lost
+
+            # Periodic state updates and keepalives run on the shared timer wheel
+            self.mark_seen(device_id)
+            self.timers.add(device_id)
+            self.timers.start()
+            self.timings.record('connect', time.perf_counter() - connect_started)
+
+            # Handle incoming messages
+            async for message in websocket:
+                self.mark_seen(device_id)
+                # Drop over-budget messages before paying for JSON parsing
+                charged_type = self.admission.admit(device_id, message)
+                if charged_type is None:
+                    continue
+                await self.handle_message(websocket, message, device_id, charged_type)
 
         except websockets.exceptions.ConnectionClosed:
-            logger.info(f"Connection closed for device: {device_id}")
+            logger.info("Connection closed for device: %s", device_id)
         except Exception as e:
-            logger.error(f"Connection error: {e}")
+            logger.error("Connection error: %.200s", e)
         finally:
             if device_id:
-                await self.unregister_device(device_id)
+                await self.detach_device(device_id, websocket)
+
+    def mark_startup(self, phase: str):
+        """Record when a startup phase finished, relative to start_server."""
+        elapsed = round((time.perf_counter() - self.started_at) * 1000, 2)
+        self.startup_timings[phase] = elapsed
+        logger.info("⏱️  Startup: %s after %sms", phase, elapsed)
+
+    async def probe_hardware(self):
+        """Watch for the LoRa receiver without holding up the listener."""
+        self.serial_watcher = SerialWatcher(self, port=self.serial_port)
+        self.serial_watcher.start()
+        await self.serial_watcher.first_probe.wait()
+        self.mark_startup('hardware_probe')
+
+        if not self.arduino:
+            logger.info("⚠️  Arduino not connected - plug it in any time, it will be picked up")
 
     async def start_server(self):
-        """Start the WebSocket server and Arduino interface."""
-        logger.info(f"🚀 Starting Emergency Vehicle Server on {self.host}:{self.port}")
-        logger.info(f"📡 Session ID: {self.session_id}")
-        logger.info(f"🌐 Public URL: ws://{self.host}:{self.port}")
-        
-        # Try to connect to Arduino
-        arduino = ArduinoInterface(self)
-        arduino_connected = await arduino.connect()
-        
-        if arduino_connected:
-            # Start Arduino reading loop in background
-            asyncio.create_task(arduino.read_loop())
-            logger.info("✅ Arduino emergency button is ACTIVE")
-        else:
-            logger.info("⚠️  Arduino not connected - button will not be available")
+        """Start the WebSocket server, then probe for the Arduino in the background."""
+        self.started_at = time.perf_counter()
+        logger.info("🚀 Starting Emergency Vehicle Server on %s:%s", self.host, self.port)
+        logger.info("📡 Session ID: %s", self.session_id)
+        logger.info("📦 Message codec: %s", self.codec.backend)
+        logger.info("🌐 Public URL: ws://%s:%s", self.host, self.port)
+        self.loop_watchdog.start()
 
         async with websockets.serve(
             self.connection_handler,
             self.host,
             self.port,
-            ping_interval=20,
-            ping_timeout=10
+            compression=None,
+            extensions=[self.compression.extension_factory()],
+            ping_interval=None,  # Heartbeats run on the timer wheel
+            process_request=self.http_api.process_request  # GET /api/... is answered over plain HTTP
         ):
+            self.mark_startup('listening')
+            # Serial scans and the board's reset delay take seconds; clients can join meanwhile
+            asyncio.create_task(self.probe_hardware())
+            if self.relay:
+                self.relay.start()
+                logger.info("🔗 Relay node %s linking to %d peer(s)", self.relay.node_id, len(self.relay.peers))
             logger.info("✅ Server started successfully - Ready for classroom demo!")
             logger.info("👥 Waiting for students to join...")
             await asyncio.Future()  # Run forever
 
-    def run(self):
-        """Run the server."""
+    def run(self, use_uvloop: bool = False):
+        """Run the server, optionally on uvloop instead of the stdlib event loop."""
+        if use_uvloop:
+            try:
+                import uvloop
+                asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+                logger.info("⚡ Using uvloop event loop")
+            except ImportError:
+                logger.warning("uvloop not installed, using the stdlib asyncio event loop")
         try:
             asyncio.run(self.start_server())
         except KeyboardInterrupt:
             logger.info("\n🛑 Server stopped by user")
 
 if __name__ == '__main__':
-    server = SimpleVehicleServer()
-    server.run()
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Emergency Vehicle Server')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--node-id', help='Enable emergency relaying under this node ID')
+    parser.add_argument('--peer', action='append', default=[],
+                        help='ws:// URL of a peer node to relay to (repeatable)')
+    parser.add_argument('--serial-port', help='LoRa receiver serial port, e.g. a lora_simulator.py pty')
+    parser.add_argument('--uvloop', action='store_true', help='Run on uvloop if it is installed')
+    parser.add_argument('--codec', choices=['json', 'orjson'], default='json',
+                        help='JSON backend for messages; orjson falls back to json if not installed')
+    parser.add_argument('--rsu', action='append', default=[],
+                        help='RSU ID, assigned to road segments in turn (repeatable; default RSU-1..RSU-4)')
+    parser.add_argument('--lora-rsu', help='RSU the LoRa receiver belongs to; its emergencies are scoped '
+                                           'to that zone and placed in it (default: whole road, no position)')
+    args = parser.parse_args()
+
+    try:
+        server = SimpleVehicleServer(port=args.port, codec_backend=args.codec,
+                                     node_id=args.node_id, relay_peers=args.peer,
+                                     serial_port=args.serial_port, rsu_ids=args.rsu, lora_rsu_id=args.lora_rsu)
+    except ValueError as e:
+        parser.error(str(e))
+    server.run(use_uvloop=args.uvloop)
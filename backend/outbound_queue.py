@@ -0,0 +1,172 @@
+"""
+Priority-aware outbound scheduling for WebSocket connections.
+Each connection gets its own writer task so emergency frames are sent ahead
+of queued position and roster chatter, and stale position and lane frames
+are superseded instead of piling up. Control and bulk lanes are bounded so
+a stalled client cannot grow its queue without limit; a client that loses
+a roster delta that way is resynced with the full roster once it catches up.
+"""
+
+import asyncio
+import time
+from collections import deque
+from enum import IntEnum
+from typing import Awaitable, Callable, Dict, Optional
+
+import websockets
+from compression import tag_message_class
+
+class MessagePriority(IntEnum):
+    """Send priority classes, lowest value goes first."""
+    EMERGENCY = 0
+    CONTROL = 1
+    BULK = 2
+
+# Message types not listed here are sent as CONTROL
+MESSAGE_PRIORITIES = {
+    'emergency_takeover': MessagePriority.EMERGENCY,
+    'emergency_cleared': MessagePriority.EMERGENCY,
+    'emergency_signal': MessagePriority.EMERGENCY,
+    'position_update': MessagePriority.BULK,
+    'system_state': MessagePriority.BULK,
+}
+
+class OutboundStats:
+    """Counters shared by every connection's outbound queue."""
+
+    def __init__(self):
+        self.sent = {priority: 0 for priority in MessagePriority}
+        self.superseded = 0
+        self.dropped = {priority: 0 for priority in MessagePriority}
+        self.resyncs = 0
+        self.emergency_wait_count = 0
+        self.emergency_wait_total = 0.0
+        self.emergency_wait_max = 0.0
+
+    def record_emergency_wait(self, waited: float):
+        self.emergency_wait_count += 1
+        self.emergency_wait_total += waited
+        if waited > self.emergency_wait_max:
+            self.emergency_wait_max = waited
+
+    def to_dict(self) -> dict:
+        """Convert stats to dictionary for logging or JSON serialization."""
+        avg_wait = (
+            self.emergency_wait_total / self.emergency_wait_count
+            if self.emergency_wait_count else 0.0
+        )
+        return {
+            'sent': {priority.name.lower(): count for priority, count in self.sent.items()},
+            'superseded': self.superseded,
+            'dropped': {priority.name.lower(): count for priority, count in self.dropped.items()},
+            'resyncs': self.resyncs,
+            'emergency_queue_wait_ms': {
+                'count': self.emergency_wait_count,
+                'avg': round(avg_wait * 1000, 3),
+                'max': round(self.emergency_wait_max * 1000, 3)
+            }
+        }
+
+class _Frame:
+    """A queued, already-encoded message."""
+    __slots__ = ('message_type', 'message', 'key', 'enqueued_at')
+
+    def __init__(self, message_type: str, message: str, key, enqueued_at: float):
+        self.message_type = message_type
+        self.message = message
+        self.key = key
+        self.enqueued_at = enqueued_at
+
+class OutboundQueue:
+    """Per-connection priority queue drained by a single writer task."""
+
+    def __init__(self, websocket, stats: OutboundStats,
+                 on_closed: Optional[Callable[[], Awaitable[None]]] = None,
+                 on_resync: Optional[Callable[[], None]] = None,
+                 control_limit: int = 1024, bulk_limit: int = 256):
+        self.websocket = websocket
+        self.stats = stats
+        self.on_closed = on_closed
+        self.on_resync = on_resync  # re-sends the full roster after a delta was dropped
+        self.resync_pending = False
+        # A full lane drops its oldest frame; emergency frames are never dropped
+        self.limits = {MessagePriority.CONTROL: control_limit, MessagePriority.BULK: bulk_limit}
+        self.queues = {priority: deque() for priority in MessagePriority}
+        self.pending: Dict[object, _Frame] = {}  # supersede key -> queued frame
+        self.wakeup = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the writer task."""
+        self.task = asyncio.create_task(self.run())
+
+    def close(self):
+        """Stop the writer task, discarding anything still queued."""
+        if self.task and self.task is not asyncio.current_task():
+            self.task.cancel()
+        self.task = None
+
+    def put(self, message_type: str, message: str, key=None):
+        """Queue an encoded message.
+
+        Frames with the same non-None key replace one another while queued,
+        so only the freshest position or state snapshot is ever sent.
+        """
+        if key is not None:
+            frame = self.pending.get(key)
+            if frame is not None:
+                frame.message = message
+                self.stats.superseded += 1
+                return
+
+        priority = MESSAGE_PRIORITIES.get(message_type, MessagePriority.CONTROL)
+        frame = _Frame(message_type, message, key, time.perf_counter())
+        queue = self.queues[priority]
+        limit = self.limits.get(priority)
+        if limit is not None and len(queue) >= limit:
+            dropped = queue.popleft()
+            if dropped.key is not None:
+                self.pending.pop(dropped.key, None)
+            if dropped.message_type == 'roster_update':
+                self.resync_pending = True  # later deltas no longer apply
+            self.stats.dropped[priority] += 1
+        queue.append(frame)
+        if key is not None:
+            self.pending[key] = frame
+        self.wakeup.set()
+
+    def _pop(self):
+        """Take the next frame in priority order."""
+        for priority, queue in self.queues.items():
+            if queue:
+                frame = queue.popleft()
+                if frame.key is not None:
+                    self.pending.pop(frame.key, None)
+                return priority, frame
+        return None, None
+
+    async def run(self):
+        """Drain queued frames to the socket, highest priority first."""
+        try:
+            while True:
+                priority, frame = self._pop()
+                if frame is None and self.resync_pending:
+                    # Caught up: queue the full roster behind everything already sent
+                    self.resync_pending = False
+                    if self.on_resync:
+                        self.stats.resyncs += 1
+                        self.on_resync()
+                    continue
+                if frame is None:
+                    self.wakeup.clear()
+                    await self.wakeup.wait()
+                    continue
+
+                if priority == MessagePriority.EMERGENCY:
+                    self.stats.record_emergency_wait(time.perf_counter() - frame.enqueued_at)
+                tag_message_class(self.websocket, frame.message_type)
+                await self.websocket.send(frame.message)
+                self.stats.sent[priority] += 1
+        except websockets.exceptions.ConnectionClosed:
+            if self.on_closed:
+                await self.on_closed()
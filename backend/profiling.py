@@ -0,0 +1,136 @@
+"""
+Runtime instrumentation for the server.
+HandlerTimings keeps count, total and max time per handler with two
+perf_counter calls per measurement. SamplingProfiler is switched on for a
+few seconds on a running server: a background thread samples the event
+loop thread's stack and writes collapsed stacks, the input format of
+flamegraph.pl and speedscope.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class HandlerTimings:
+    """Count, total and max time per named handler."""
+
+    def __init__(self):
+        self.timings: Dict[str, list] = {}  # name -> [count, total_s, max_s]
+
+    def record(self, name: str, seconds: float):
+        """Add one measurement."""
+        entry = self.timings.get(name)
+        if entry is None:
+            self.timings[name] = [1, seconds, seconds]
+            return
+        entry[0] += 1
+        entry[1] += seconds
+        if seconds > entry[2]:
+            entry[2] = seconds
+
+    def reset(self):
+        """Forget all measurements."""
+        self.timings.clear()
+
+    def to_dict(self) -> dict:
+        """Timings in milliseconds, slowest total first."""
+        rows = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            name: {
+                'count': count,
+                'total_ms': round(total * 1000, 3),
+                'avg_us': round(total / count * 1e6, 1),
+                'max_ms': round(peak * 1000, 3)
+            }
+            for name, (count, total, peak) in rows
+        }
+
+class SamplingProfiler:
+    """Samples one thread's Python stack from a background thread."""
+
+    def __init__(self, interval: float = 0.005, output_dir: str = 'profiles', max_duration: float = 60.0):
+        self.interval = interval  # seconds between samples
+        self.output_dir = output_dir
+        self.max_duration = max_duration
+        self.thread: Optional[threading.Thread] = None
+        self.last_result: Optional[dict] = None
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self, duration: float, target_thread_id: int = None, on_done=None) -> bool:
+        """Sample ``target_thread_id`` (default: the caller's thread) for ``duration`` seconds.
+
+        ``on_done(result)`` is called from the sampler thread once the
+        profile has been written. Returns False if a profile is already running.
+        """
+        if self.running:
+            return False
+        duration = max(0.1, min(float(duration), self.max_duration))
+        target = target_thread_id or threading.get_ident()
+        self.thread = threading.Thread(target=self._run, args=(duration, target, on_done),
+                                       name='sampling-profiler', daemon=True)
+        self.thread.start()
+        logger.info("Sampling profiler started for %.1fs", duration)
+        return True
+
+    def _run(self, duration: float, target: int, on_done):
+        stacks = Counter()
+        samples = 0
+        started = time.perf_counter()
+        deadline = started + duration
+        frame = None
+        while time.perf_counter() < deadline:
+            frame = sys._current_frames().get(target)
+            if frame is not None:
+                stacks[self._collapse(frame)] += 1
+                samples += 1
+            time.sleep(self.interval)
+        del frame
+
+        path = self._write(stacks)
+        self.last_result = {
+            'path': path,
+            'samples': samples,
+            'duration_s': round(time.perf_counter() - started, 2),
+            'top': [{'frame': leaf, 'samples': count}
+                    for leaf, count in self._leaf_counts(stacks).most_common(10)]
+        }
+        logger.info("Sampling profiler wrote %d samples to %s", samples, path)
+        if on_done:
+            on_done(self.last_result)
+
+    @staticmethod
+    def _collapse(frame) -> str:
+        """Render a stack as root;...;leaf with one function:line per frame."""
+        parts = []
+        while frame is not None:
+            code = frame.f_code
+            parts.append(f'{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})')
+            frame = frame.f_back
+        parts.reverse()
+        return ';'.join(parts)
+
+    @staticmethod
+    def _leaf_counts(stacks: Counter) -> Counter:
+        """Samples per innermost frame."""
+        leaves = Counter()
+        for stack, count in stacks.items():
+            leaves[stack.rsplit(';', 1)[-1]] += count
+        return leaves
+
+    def _write(self, stacks: Counter) -> str:
+        """Write collapsed stacks, one 'stack count' line each."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, time.strftime('profile-%Y%m%d-%H%M%S.folded'))
+        with open(path, 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f'{stack} {count}\n')
+        return path
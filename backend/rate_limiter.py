@@ -0,0 +1,174 @@
+"""
+Per-device token-bucket admission control for incoming messages.
+Checks run on the raw frame before JSON parsing, so a flooding client is
+throttled without paying for decoding or broadcasting its messages. The
+sniffed type is confirmed against the decoded one afterwards, so a client
+cannot pick its own budget by how it writes the frame.
+"""
+
+import logging
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Union
+
+from codec import MESSAGE_SCHEMAS
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class BucketConfig:
+    """Refill rate (tokens per second) and burst size of a token bucket."""
+    rate: float
+    burst: float
+
+# Per-type budgets, applied on top of the per-device budget
+DEFAULT_TYPE_LIMITS = {
+    'position_update': BucketConfig(rate=20, burst=40),
+    'lane_change': BucketConfig(rate=2, burst=6),
+    'register_user': BucketConfig(rate=0.5, burst=3),
+}
+
+# Emergency traffic skips the per-device budget and only uses its own.
+# Clears get a separate bucket so a retransmitted trigger stream cannot
+# drain the budget for the one clear that ends it.
+EMERGENCY_BUCKETS = {
+    'register_emergency': 'emergency',
+    'register': 'emergency',
+    'clear_emergency': 'emergency_clear',
+}
+
+# Clients send "type" as the first key; frames that do not are dropped
+SNIFF_LENGTH = 256
+_TYPE_PATTERN = re.compile(r'\s*\{\s*"type"\s*:\s*"([A-Za-z_]{1,40})"')
+_TYPE_PATTERN_BYTES = re.compile(rb'\s*\{\s*"type"\s*:\s*"([A-Za-z_]{1,40})"')
+
+class TokenBucket:
+    """Classic token bucket refilled lazily on each take."""
+    __slots__ = ('rate', 'burst', 'tokens', 'updated_at')
+
+    def __init__(self, config: BucketConfig, now: float):
+        self.rate = config.rate
+        self.burst = config.burst
+        self.tokens = config.burst
+        self.updated_at = now
+
+    def take(self, now: float) -> bool:
+        """Take one token if available."""
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+def sniff_message_type(raw: Union[str, bytes]) -> Optional[str]:
+    """Find a message's top-level type without parsing the whole JSON document.
+
+    Only a "type" key opening the object is recognised; anything else
+    returns None.
+    """
+    if isinstance(raw, bytes):
+        match = _TYPE_PATTERN_BYTES.match(raw, 0, SNIFF_LENGTH)
+        return match.group(1).decode() if match else None
+    match = _TYPE_PATTERN.match(raw, 0, SNIFF_LENGTH)
+    return match.group(1) if match else None
+
+class AdmissionController:
+    """Drops messages that exceed a device's per-device or per-type budget."""
+
+    def __init__(self, device_limit: BucketConfig = BucketConfig(rate=30, burst=60),
+                 type_limits: Optional[Dict[str, BucketConfig]] = None,
+                 emergency_limit: Optional[BucketConfig] = BucketConfig(rate=2, burst=10),
+                 report_interval: float = 10.0):
+        self.device_limit = device_limit
+        self.type_limits = dict(DEFAULT_TYPE_LIMITS if type_limits is None else type_limits)
+        self.emergency_limit = emergency_limit  # None exempts emergency traffic entirely
+        # Drops are counted per type only for types we know; clients pick the rest
+        self.known_types = (frozenset(MESSAGE_SCHEMAS) | frozenset(self.type_limits) |
+                            frozenset(EMERGENCY_BUCKETS) | {'unknown', 'type_mismatch'})
+        self.report_interval = report_interval
+        self.buckets: Dict[str, Dict[str, TokenBucket]] = {}  # device_id -> bucket name -> bucket
+        self.dropped_by_type: Dict[str, int] = {}
+        self.dropped_by_device: Dict[str, int] = {}
+        self.last_report: Dict[str, float] = {}
+        self.admitted = 0
+
+    def _take(self, device_buckets: Dict[str, TokenBucket], name: str,
+              config: BucketConfig, now: float) -> bool:
+        bucket = device_buckets.get(name)
+        if bucket is None:
+            bucket = device_buckets[name] = TokenBucket(config, now)
+        return bucket.take(now)
+
+    def admit(self, device_id: str, raw: Union[str, bytes]) -> Optional[str]:
+        """Check whether a raw incoming message is within the device's budget.
+
+        Returns the sniffed message type the frame was charged to, or None if
+        it is dropped. Frames whose type cannot be sniffed count as over budget.
+        """
+        message_type = sniff_message_type(raw)
+        now = time.monotonic()
+        if message_type is None:
+            self._record_drop(device_id, 'unknown', now)
+            return None
+        device_buckets = self.buckets.setdefault(device_id, {})
+
+        emergency_bucket = EMERGENCY_BUCKETS.get(message_type)
+        if emergency_bucket is not None:
+            allowed = (
+                self.emergency_limit is None or
+                self._take(device_buckets, emergency_bucket, self.emergency_limit, now)
+            )
+        else:
+            # Check the narrower per-type budget first so a flood of one type
+            # does not also drain the device budget for everything else
+            type_limit = self.type_limits.get(message_type)
+            allowed = type_limit is None or self._take(device_buckets, message_type, type_limit, now)
+            if allowed:
+                allowed = self._take(device_buckets, 'device', self.device_limit, now)
+
+        if allowed:
+            self.admitted += 1
+            return message_type
+        self._record_drop(device_id, message_type, now)
+        return None
+
+    def confirm(self, device_id: str, charged_type: str, decoded_type: object) -> bool:
+        """Check that a decoded message has the type its frame was charged to.
+
+        A mismatch means the sniffed type was a decoy, so the message is dropped.
+        """
+        if decoded_type == charged_type:
+            return True
+        self.admitted -= 1
+        self._record_drop(device_id, 'type_mismatch', time.monotonic())
+        return False
+
+    def _record_drop(self, device_id: str, message_type: str, now: float):
+        counted_as = message_type if message_type in self.known_types else 'other'
+        self.dropped_by_type[counted_as] = self.dropped_by_type.get(counted_as, 0) + 1
+        self.dropped_by_device[device_id] = self.dropped_by_device.get(device_id, 0) + 1
+
+        # Report each throttled device at most once per interval
+        if now - self.last_report.get(device_id, 0.0) >= self.report_interval:
+            self.last_report[device_id] = now
+            logger.warning(
+                "Rate limit exceeded by %s (%s) | %d messages dropped so far",
+                device_id, message_type, self.dropped_by_device[device_id]
+            )
+
+    def forget(self, device_id: str):
+        """Drop all buckets and per-device counters for a device."""
+        self.buckets.pop(device_id, None)
+        self.dropped_by_device.pop(device_id, None)
+        self.last_report.pop(device_id, None)
+
+    def get_stats(self) -> dict:
+        """Get admission counters."""
+        return {
+            'admitted': self.admitted,
+            'dropped': sum(self.dropped_by_type.values()),
+            'dropped_by_type': dict(self.dropped_by_type),
+            'dropped_by_device': dict(self.dropped_by_device)
+        }
@@ -0,0 +1,190 @@
+"""
+Emergency event relay between server nodes.
+Links several SimpleVehicleServer instances into a tree or mesh so an
+emergency raised on one Roadside Unit node propagates to the others.
+Events are deduplicated by ID and bounded by a hop limit, and each hop's
+latency is measured.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Callable, Dict, List, Optional
+
+import websockets
+
+from codec import CodecError
+
+logger = logging.getLogger(__name__)
+
+RELAYED_TYPES = frozenset({'emergency_takeover', 'emergency_cleared'})
+
+class RelayNode:
+    """Relays emergency events to and from peer server nodes."""
+
+    def __init__(self, server, node_id: str, peers: Optional[List[str]] = None,
+                 max_hops: int = 8, dedupe_size: int = 4096, reconnect_delay: float = 1.0):
+        self.server = server
+        self.node_id = node_id
+        self.peers = list(peers or [])  # ws:// URLs this node dials
+        self.max_hops = max_hops
+        self.dedupe_size = dedupe_size
+        self.reconnect_delay = reconnect_delay
+        self.links: Dict[str, object] = {}  # peer node_id -> websocket (dialled or accepted)
+        self.seen: "OrderedDict[str, None]" = OrderedDict()
+        self.tasks: List[asyncio.Task] = []
+        self.on_event: Optional[Callable[[dict], None]] = None  # called for each new event
+
+        # Stats
+        self.published = 0
+        self.received = 0
+        self.duplicates = 0
+        self.expired = 0
+        self.hop_latencies: deque = deque(maxlen=1024)  # seconds
+        self.end_to_end_latencies: deque = deque(maxlen=1024)  # seconds
+
+    def start(self):
+        """Start dialling every configured peer."""
+        for url in self.peers:
+            self.tasks.append(asyncio.create_task(self._dial(url)))
+
+    def stop(self):
+        """Stop dialling peers."""
+        for task in self.tasks:
+            task.cancel()
+        self.tasks.clear()
+
+    def _mark_seen(self, event_id: str) -> bool:
+        """Remember an event ID, returning False if it was already seen."""
+        if event_id in self.seen:
+            return False
+        self.seen[event_id] = None
+        if len(self.seen) > self.dedupe_size:
+            self.seen.popitem(last=False)
+        return True
+
+    async def publish(self, event: dict):
+        """Send a locally raised event to every linked peer."""
+        if event.get('type') not in RELAYED_TYPES:
+            return
+        now = time.time()
+        envelope = {
+            'type': 'relay_event',
+            'event_id': uuid.uuid4().hex,
+            'origin': self.node_id,
+            'origin_time': now,
+            'sent_at': now,
+            'hops': 0,
+            'max_hops': self.max_hops,
+            'path': [self.node_id],
+            'event': event
+        }
+        self._mark_seen(envelope['event_id'])
+        self.published += 1
+        await self._forward(envelope, exclude_peer=None)
+
+    async def receive(self, envelope: dict, from_peer: str = None):
+        """Handle an event relayed by a peer: dedupe, apply locally, forward."""
+        if envelope['event'].get('type') not in RELAYED_TYPES:
+            return
+        event_id = envelope.get('event_id')
+        if not event_id or not self._mark_seen(event_id):
+            self.duplicates += 1
+            return
+
+        now = time.time()
+        self.received += 1
+        self.hop_latencies.append(now - envelope.get('sent_at', now))
+        self.end_to_end_latencies.append(now - envelope.get('origin_time', now))
+        hops = envelope.get('hops', 0) + 1
+
+        await self.server.apply_relayed_event(envelope['event'], envelope.get('origin'))
+        if self.on_event:
+            self.on_event(envelope)
+
+        if hops >= min(envelope.get('max_hops', self.max_hops), self.max_hops):
+            self.expired += 1
+            return
+        forwarded = dict(envelope, hops=hops, sent_at=now, path=envelope.get('path', []) + [self.node_id])
+        await self._forward(forwarded, exclude_peer=from_peer)
+
+    async def _forward(self, envelope: dict, exclude_peer: str = None):
+        message = self.server.codec.encode(envelope)
+        for peer_id, websocket in list(self.links.items()):
+            if peer_id == exclude_peer or peer_id in envelope['path']:
+                continue
+            try:
+                await websocket.send(message)
+            except websockets.exceptions.ConnectionClosed:
+                self.links.pop(peer_id, None)
+
+    async def _read_link(self, websocket, peer_id: str):
+        async for message in websocket:
+            try:
+                envelope = self.server.codec.decode(message)
+            except CodecError as e:
+                logger.warning("Invalid relay message from %s: %.120s", peer_id, e)
+                continue
+            if envelope['type'] != 'relay_event':
+                continue
+            # One bad event must not take the link down with it
+            try:
+                await self.receive(envelope, from_peer=peer_id)
+            except Exception as e:
+                logger.error("Error applying relayed event from %s: %.200s", peer_id, e)
+
+    async def handle_peer(self, websocket, peer_id: str):
+        """Serve an incoming link from a peer node (called by the connection handler)."""
+        await websocket.send(self.server.codec.encode({'type': 'relay_hello', 'node_id': self.node_id}))
+        self.links[peer_id] = websocket
+        logger.info("🔗 Relay peer connected: %s", peer_id)
+        try:
+            await self._read_link(websocket, peer_id)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        finally:
+            if self.links.get(peer_id) is websocket:
+                del self.links[peer_id]
+            logger.info("🔗 Relay peer disconnected: %s", peer_id)
+
+    async def _dial(self, url: str):
+        """Keep a link to a peer open, reconnecting after failures."""
+        separator = '&' if '?' in url else '?'
+        while True:
+            try:
+                async with websockets.connect(f'{url}{separator}relay={self.node_id}') as websocket:
+                    hello = self.server.codec.loads(await websocket.recv())
+                    peer_id = hello.get('node_id', url) if isinstance(hello, dict) else url
+                    self.links[peer_id] = websocket
+                    logger.info("🔗 Relay link up: %s -> %s", self.node_id, peer_id)
+                    try:
+                        await self._read_link(websocket, peer_id)
+                    finally:
+                        if self.links.get(peer_id) is websocket:
+                            del self.links[peer_id]
+            except (OSError, ValueError, websockets.exceptions.WebSocketException) as e:
+                logger.debug("Relay link to %s failed: %s", url, e)
+            await asyncio.sleep(self.reconnect_delay)
+
+    def get_stats(self) -> dict:
+        """Get relay counters and latency summaries in milliseconds."""
+        def summary(samples):
+            if not samples:
+                return {'count': 0, 'avg': 0.0, 'max': 0.0}
+            return {
+                'count': len(samples),
+                'avg': round(sum(samples) / len(samples) * 1000, 3),
+                'max': round(max(samples) * 1000, 3)
+            }
+        return {
+            'node_id': self.node_id,
+            'links': sorted(self.links),
+            'published': self.published,
+            'received': self.received,
+            'duplicates': self.duplicates,
+            'expired': self.expired,
+            'hop_latency_ms': summary(self.hop_latencies),
+            'end_to_end_latency_ms': summary(self.end_to_end_latencies)
+        }
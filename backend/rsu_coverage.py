@@ -0,0 +1,119 @@
+"""
+Roadside Unit coverage zones for segment-scoped broadcasting.
+Splits the highway into fixed-length road segments, each served by an
+RSU/gateway, and tracks which vehicles are in which segment so emergency
+and position traffic only reaches vehicles in affected or adjacent segments.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set
+
+@dataclass(frozen=True)
+class RoadSegment:
+    """A stretch of highway served by one Roadside Unit."""
+    segment_id: int
+    start_x: float
+    end_x: float
+    rsu_id: str
+
+class CoverageMap:
+    """Maps vehicles to road segments and resolves broadcast scopes."""
+
+    def __init__(self, road_length: float = 800, segment_length: float = 200,
+                 rsu_ids: Optional[List[str]] = None, adjacent_segments: int = 1):
+        self.road_length = road_length
+        self.segment_length = segment_length
+        self.adjacent_segments = adjacent_segments
+
+        count = max(1, int(-(-road_length // segment_length)))  # ceil
+        if rsu_ids is None:
+            rsu_ids = [f'RSU-{i + 1}' for i in range(count)]
+        self.segments = [
+            RoadSegment(
+                segment_id=i,
+                start_x=i * segment_length,
+                end_x=min(road_length, (i + 1) * segment_length),
+                rsu_id=rsu_ids[i % len(rsu_ids)]
+            )
+            for i in range(count)
+        ]
+        self.rsu_segments: Dict[str, List[int]] = {}
+        for segment in self.segments:
+            self.rsu_segments.setdefault(segment.rsu_id, []).append(segment.segment_id)
+
+        self.members: List[Set[str]] = [set() for _ in self.segments]  # segment -> device_ids
+        self.device_segment: Dict[str, int] = {}  # device_id -> segment
+
+    def segment_for(self, position_x: float) -> int:
+        """Get the segment covering an x position, clamped to the road."""
+        index = int(position_x // self.segment_length)
+        return min(max(index, 0), len(self.segments) - 1)
+
+    def place(self, device_id: str, position_x: float) -> int:
+        """Place or move a vehicle and return its segment."""
+        segment_id = self.segment_for(position_x)
+        previous = self.device_segment.get(device_id)
+        if previous != segment_id:
+            if previous is not None:
+                self.members[previous].discard(device_id)
+            self.members[segment_id].add(device_id)
+            self.device_segment[device_id] = segment_id
+        return segment_id
+
+    def remove(self, device_id: str):
+        """Forget a vehicle."""
+        segment_id = self.device_segment.pop(device_id, None)
+        if segment_id is not None:
+            self.members[segment_id].discard(device_id)
+
+    def scope_segments(self, segment_ids: List[int], hops: Optional[int] = None) -> Set[int]:
+        """Expand segments to include neighbours within ``hops``.
+
+        The road loops, so the last segment neighbours the first.
+        """
+        hops = self.adjacent_segments if hops is None else hops
+        count = len(self.segments)
+        scope = set()
+        for segment_id in segment_ids:
+            scope.update((segment_id + offset) % count for offset in range(-hops, hops + 1))
+        return scope
+
+    def recipients_for_segments(self, segment_ids: Set[int]) -> Set[str]:
+        """Get every vehicle inside the given segments."""
+        recipients = set()
+        for segment_id in segment_ids:
+            recipients |= self.members[segment_id]
+        return recipients
+
+    def recipients_near(self, device_id: str, hops: Optional[int] = None) -> Optional[Set[str]]:
+        """Get vehicles in a device's segment and its neighbours.
+
+        Returns None if the device has no known position, meaning "everyone".
+        """
+        segment_id = self.device_segment.get(device_id)
+        if segment_id is None:
+            return None
+        return self.recipients_for_segments(self.scope_segments([segment_id], hops))
+
+    def recipients_for_rsu(self, rsu_id: str, hops: Optional[int] = None) -> Optional[Set[str]]:
+        """Get vehicles covered by an RSU and its neighbouring segments.
+
+        Returns None for an unknown RSU, meaning "everyone".
+        """
+        segment_ids = self.rsu_segments.get(rsu_id)
+        if not segment_ids:
+            return None
+        return self.recipients_for_segments(self.scope_segments(segment_ids, hops))
+
+    def get_zones(self) -> List[dict]:
+        """Describe each segment and its occupancy."""
+        return [
+            {
+                'segment_id': segment.segment_id,
+                'rsu_id': segment.rsu_id,
+                'start_x': segment.start_x,
+                'end_x': segment.end_x,
+                'vehicles': len(self.members[segment.segment_id])
+            }
+            for segment in self.segments
+        ]
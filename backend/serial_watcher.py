@@ -0,0 +1,116 @@
+"""
+Hot-plug watcher for the LoRa receiver.
+Polls for serial ports every second (off the event loop) and attaches an
+ArduinoInterface when a receiver appears, detaches it when its port goes
+away or its read loop fails, and reports how long the gateway was gone, so
+a receiver can be plugged in late or swapped mid-demo.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from typing import Optional
+
+from arduino_interface import ArduinoInterface
+
+logger = logging.getLogger(__name__)
+
+class SerialWatcher:
+    """Attaches and detaches the LoRa receiver as its serial port comes and goes."""
+
+    def __init__(self, server, port: str = None, interval: float = 1.0):
+        self.server = server
+        self.port = port  # fixed port to watch, None = auto-detect
+        self.interval = interval
+        self.interface: Optional[ArduinoInterface] = None
+        self.read_task: Optional[asyncio.Task] = None
+        self.task: Optional[asyncio.Task] = None
+        self.first_probe = asyncio.Event()
+        self.detached_at: Optional[float] = None
+        self.attaches = 0
+        self.detaches = 0
+        self.last_reconnect: Optional[float] = None  # seconds the last swap took
+
+    def start(self):
+        """Start watching in the background."""
+        if self.task is None:
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        """Stop watching and release the receiver."""
+        if self.task:
+            self.task.cancel()
+            self.task = None
+        self.detach('watcher stopped')
+
+    def available_ports(self) -> list:
+        """Candidate receiver ports right now (blocking; run in a thread)."""
+        if self.port:
+            return [self.port] if os.path.exists(self.port) else []
+        return ArduinoInterface.list_receiver_ports()
+
+    async def run(self):
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error("Serial watcher error: %s", e)
+            self.first_probe.set()
+            await asyncio.sleep(self.interval)
+
+    async def poll(self):
+        """Check once for a receiver appearing or disappearing."""
+        ports = await asyncio.to_thread(self.available_ports)
+        interface = self.interface
+        if interface is not None:
+            if interface.port not in ports:
+                self.detach('port removed')
+            elif self.read_task is not None and self.read_task.done():
+                self.detach('read loop stopped')
+            else:
+                return
+        if ports:
+            await self.attach(ports[0])
+
+    async def attach(self, port: str):
+        interface = ArduinoInterface(self.server)
+        if not await interface.connect(port):
+            return
+        # A receiver swapped in mid-emergency must still act on the clear that ends it
+        lora = self.server.emergency_events.records.get('LORA_EMERGENCY')
+        interface.emergency_active = bool(lora and lora.active)
+        self.interface = interface
+        self.server.arduino = interface
+        self.read_task = asyncio.create_task(interface.read_loop())
+        self.attaches += 1
+        if self.detached_at is not None:
+            self.last_reconnect = time.monotonic() - self.detached_at
+            self.detached_at = None
+            logger.info("🔌 LoRa receiver back on %s after %.1fs", port, self.last_reconnect)
+        logger.info("✅ Arduino emergency button is ACTIVE")
+
+    def detach(self, reason: str):
+        interface = self.interface
+        if interface is None:
+            return
+        self.interface = None
+        self.server.arduino = None
+        self.server.arduino_connected = False
+        interface.stop()
+        if self.read_task:
+            self.read_task.cancel()
+            self.read_task = None
+        self.detaches += 1
+        self.detached_at = time.monotonic()
+        logger.warning("🔌 LoRa receiver on %s detached (%s) - waiting for it to return", interface.port, reason)
+
+    def get_status(self) -> dict:
+        """Attachment state and swap timings."""
+        return {
+            'attached': self.interface is not None,
+            'port': self.interface.port if self.interface else None,
+            'attaches': self.attaches,
+            'detaches': self.detaches,
+            'last_reconnect_s': round(self.last_reconnect, 2) if self.last_reconnect is not None else None
+        }
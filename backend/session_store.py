@@ -0,0 +1,120 @@
+"""
+Session resumption for reconnecting devices.
+Issues resume tokens and keeps a bounded ring of missed events per
+detached session so a client that drops briefly can pick up where it left off.
+"""
+
+import secrets
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+@dataclass
+class Session:
+    """Resumable session for a single device."""
+    device_id: str
+    token: str
+    missed: Deque[Tuple[str, str]] = field(default_factory=deque)  # (message_type, encoded)
+    overflowed: bool = False
+    detached_at: Optional[float] = None
+
+    @property
+    def is_detached(self) -> bool:
+        return self.detached_at is not None
+
+class SessionStore:
+    """Tracks resume tokens and replays missed events on reconnect."""
+
+    def __init__(self, replay_limit: int = 64, grace_period: float = 30.0):
+        self.replay_limit = replay_limit
+        self.grace_period = grace_period
+        self.sessions: Dict[str, Session] = {}  # device_id -> session
+        self.tokens: Dict[str, str] = {}  # token -> device_id
+        self.detached: Dict[str, Session] = {}  # device_id -> session
+
+    def create(self, device_id: str) -> str:
+        """Create a session for a newly registered device and return its token."""
+        token = secrets.token_urlsafe(16)
+        self.sessions[device_id] = Session(
+            device_id=device_id,
+            token=token,
+            missed=deque(maxlen=self.replay_limit)
+        )
+        self.tokens[token] = device_id
+        return token
+
+    def get(self, device_id: str) -> Optional[Session]:
+        """Get the session for a device."""
+        return self.sessions.get(device_id)
+
+    def detach(self, device_id: str):
+        """Mark a session as disconnected and start recording missed events."""
+        session = self.sessions.get(device_id)
+        if session and not session.is_detached:
+            session.detached_at = time.monotonic()
+            session.missed.clear()
+            session.overflowed = False
+            self.detached[device_id] = session
+
+    def resume(self, token: str) -> Optional[Tuple[Session, List[Tuple[str, str]], bool]]:
+        """Re-attach a session by token.
+
+        Returns the session, the missed events in order as (message_type,
+        encoded message) pairs, and whether the ring
+        overflowed (in which case the caller should send a full state dump).
+        A session that is still attached (the old connection dropped without
+        the server noticing yet) can be taken over too; nothing was recorded
+        for it, so it is reported as overflowed.
+        """
+        device_id = self.tokens.get(token)
+        session = self.sessions.get(device_id) if device_id else None
+        if not session:
+            return None
+        if not session.is_detached:
+            return session, [], True
+        if self.is_expired(device_id):
+            return None
+
+        events = list(session.missed)
+        overflowed = session.overflowed
+        session.missed.clear()
+        session.overflowed = False
+        session.detached_at = None
+        del self.detached[device_id]
+        return session, events, overflowed
+
+    def record(self, message_type: str, message: str, exclude_device: str = None,
+               recipients: Set[str] = None):
+        """Record an encoded broadcast for every detached session it was meant for."""
+        for device_id, session in self.detached.items():
+            if device_id == exclude_device:
+                continue
+            if recipients is not None and device_id not in recipients:
+                continue
+            self._append(session, message_type, message)
+
+    def record_for(self, device_id: str, message_type: str, message: str):
+        """Record an encoded unicast if its device is detached."""
+        session = self.detached.get(device_id)
+        if session:
+            self._append(session, message_type, message)
+
+    def _append(self, session: Session, message_type: str, message: str):
+        if len(session.missed) == self.replay_limit:
+            session.overflowed = True
+        session.missed.append((message_type, message))
+
+    def is_expired(self, device_id: str) -> bool:
+        """Check whether a detached session has outlived its grace period."""
+        session = self.sessions.get(device_id)
+        if not session or not session.is_detached:
+            return False
+        return time.monotonic() - session.detached_at >= self.grace_period
+
+    def discard(self, device_id: str):
+        """Forget a session entirely."""
+        session = self.sessions.pop(device_id, None)
+        if session:
+            self.tokens.pop(session.token, None)
+        self.detached.pop(device_id, None)
@@ -0,0 +1,72 @@
+"""
+Initial vehicle placement.
+The road is divided into a lane x position grid sized by its length, and
+a free list hands out grid slots in O(1). The list is ordered so the first
+arrivals spread evenly over the whole road, and a departed vehicle's slot
+goes back on the list to be handed to the next arrival. Slots are never
+closer than ``spacing``, so set it to at least one vehicle length; when
+every slot is taken the road is full and allocate says so.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+def spread_order(count: int) -> List[int]:
+    """0..count-1 in bit-reversed order, so any prefix is spread evenly."""
+    bits = max(1, (count - 1).bit_length())
+    order = []
+    for i in range(1 << bits):
+        reversed_i = int(format(i, f'0{bits}b')[::-1], 2)
+        if reversed_i < count:
+            order.append(reversed_i)
+    return order
+
+class SlotAllocator:
+    """Free-list allocator over a lane x position grid."""
+
+    def __init__(self, road_length: float = 800, num_lanes: int = 3, spacing: float = 50):
+        self.road_length = road_length
+        self.num_lanes = num_lanes
+        self.spacing = spacing  # distance between neighbouring slots in a lane
+        self.positions = max(1, int(road_length // spacing))
+        # Slot s sits in lane s % num_lanes + 1 at position s // num_lanes.
+        # Arrivals rotate through the lanes, each lane starting a different
+        # stretch of road, so the first few cars are spread like the old layout.
+        order = spread_order(self.positions)
+        offset = self.positions // num_lanes
+        arrivals = [
+            (order[j] + lane * offset) % self.positions * num_lanes + lane
+            for j in range(self.positions)
+            for lane in range(num_lanes)
+        ]
+        self.free: List[int] = arrivals[::-1]  # stack; the next slot to hand out is at the end
+        self.owners: Dict[str, int] = {}  # device_id -> slot
+        self.overflows = 0  # allocations refused because the road was full
+
+    @property
+    def capacity(self) -> int:
+        return self.positions * self.num_lanes
+
+    def slot_place(self, slot: int) -> Tuple[int, float]:
+        """(lane, position_x) of a slot."""
+        return slot % self.num_lanes + 1, (slot // self.num_lanes) * self.spacing
+
+    def allocate(self, device_id: str) -> Optional[Tuple[int, float]]:
+        """Give a vehicle a free slot, or None if the road is full."""
+        slot = self.owners.get(device_id)
+        if slot is None:
+            if not self.free:
+                self.overflows += 1
+                return None
+            slot = self.free.pop()
+            self.owners[device_id] = slot
+        return self.slot_place(slot)
+
+    def release(self, device_id: str):
+        """Return a departed vehicle's slot to the free list."""
+        slot = self.owners.pop(device_id, None)
+        if slot is not None:
+            self.free.append(slot)
+
+    def get_stats(self) -> dict:
+        return {'capacity': self.capacity, 'in_use': len(self.owners), 'free': len(self.free),
+                'spacing': self.spacing, 'full': not self.free, 'overflows': self.overflows}
@@ -0,0 +1,60 @@
+"""Tests for takeover lane and slot planning."""
+
+import asyncio
+
+from choreography import TakeoverChoreographer
+
+GAP = 40.0
+
+def state(x: float, lane: int) -> dict:
+    return {'position_x': x, 'current_lane': lane, 'speed': 50}
+
+def test_planned_slots_keep_clear_of_occupied_targets():
+    choreographer = TakeoverChoreographer(gap=GAP)
+    occupied = {'a': {'action': 'hold_lane', 'target_lane': 1, 'target_x': 100.0, 'slot': 0, 'drop_back': 0.0}}
+    plan = choreographer.plan(0.0, 2, ['b'], {'b': state(110.0, 1)}, occupied)
+    assert plan['b']['target_lane'] == 1
+    assert plan['b']['target_x'] == 60.0
+    assert plan['b']['slot'] == 1
+
+def test_holding_vehicle_reserves_its_spot():
+    choreographer = TakeoverChoreographer(gap=GAP)
+    occupied = {'a': {'action': 'hold_position', 'target_lane': 1, 'target_x': 100.0, 'slot': None, 'drop_back': 0.0}}
+    plan = choreographer.plan(0.0, 2, ['b'], {'b': state(110.0, 1)}, occupied)
+    assert plan['b']['target_x'] == 60.0
+    assert plan['b']['slot'] == 0
+
+def test_refresh_slots_newcomers_around_scheduled_vehicles():
+    from main import SimpleVehicleServer
+
+    async def run():
+        server = SimpleVehicleServer()
+
+        def move(device_id, x, lane):
+            server.device_states[device_id].update(position_x=x, current_lane=lane)
+            server.coverage.place(device_id, x)
+
+        amb, first = await server.register_device(object()), await server.register_device(object())
+        move(amb, 0.0, 2)
+        move(first, 100.0, 1)
+        await server.trigger_emergency(amb)
+        emergency_id, record = next(iter(server.emergencies.active.items()))
+        assert server.takeover_scheduled[emergency_id] == {first}
+
+        newcomer = await server.register_device(object())
+        move(newcomer, 110.0, 1)
+        await server.activate_emergency(record)
+        return server.takeover_plans[emergency_id], first, newcomer
+
+    plan, first, newcomer = asyncio.run(run())
+    assert plan[first]['target_x'] == 100.0  # the instruction it was already sent
+    assert plan[newcomer]['target_lane'] == plan[first]['target_lane']
+    assert abs(plan[newcomer]['target_x'] - plan[first]['target_x']) >= GAP
+
+def test_unknown_emergency_lane_keeps_the_right_hand_fallback_lane():
+    choreographer = TakeoverChoreographer(gap=GAP)
+    states = {f'v{lane}': state(100.0 * lane, lane) for lane in (1, 2, 3)}
+    plan = choreographer.plan(None, None, states, states)
+    assert plan['v1']['action'] == 'change_lane'  # the lane cleared for the emergency
+    assert {instruction['target_lane'] for instruction in plan.values()} == {2, 3}
+    assert (plan['v3']['action'], plan['v3']['target_lane']) == ('hold_lane', 3)
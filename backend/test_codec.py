@@ -0,0 +1,95 @@
+"""Tests for message decoding, schema validation and dispatch."""
+
+import asyncio
+import json
+
+import pytest
+
+from codec import Codec, CodecError, Field, MessageSchema, byte_size
+
+@pytest.fixture
+def codec() -> Codec:
+    return Codec()
+
+def position(x=10.0, y=25.0, speed=50.0) -> dict:
+    return {'type': 'position_update', 'device_id': 'a1', 'position': {'x': x, 'y': y, 'speed': speed}}
+
+def test_valid_message_decodes(codec):
+    data = codec.decode(json.dumps(position()))
+    assert data['position']['x'] == 10.0
+    assert codec.rejected == 0
+
+@pytest.mark.parametrize('raw, error', [
+    ('{"type": "lane_change", "device_id": "a1"}', 'missing field new_lane'),
+    ('{"type": "lane_change", "new_lane": null}', 'new_lane is null'),
+    ('{"type": "lane_change", "new_lane": "2"}', 'new_lane has wrong type str'),
+    ('{"type": "lane_change", "new_lane": true}', 'new_lane has wrong type bool'),
+    ('{"type": "lane_change", "new_lane": 4}', 'new_lane above 3'),
+    ('{"type": "lane_change", "new_lane": 0}', 'new_lane below 1'),
+    ('{"type": "position_update", "position": {"x": NaN}}', 'position.x is not a finite number'),
+    ('{"type": "position_update", "position": {"speed": -1}}', 'position.speed below 0'),
+    ('{"type": "position_update", "position": [1, 2]}', 'position has wrong type list'),
+    ('{"type": "register_user", "name": "' + 'n' * 65 + '"}', 'name longer than 64'),
+    ('{"type": "relay_event", "origin": "n1", "hops": 0, "event": {}}', 'missing field event_id'),
+    ('{"type": "relay_event", "event_id": "e", "origin": "n1", "hops": "1", "event": {}}', 'hops has wrong type str'),
+    ('{"type": "relay_event", "event_id": "e", "origin": "n1", "hops": 0, "event": []}', 'event has wrong type list'),
+    ('{"type": "relay_event", "event_id": "e", "origin": "n1", "hops": 0, "event": {"type": "x"}}',
+     'event.missing field device_id'),
+])
+def test_schema_violations_are_rejected(codec, raw, error):
+    with pytest.raises(CodecError, match=error):
+        codec.decode(raw)
+    assert codec.rejected == 1
+
+@pytest.mark.parametrize('raw', ['not json', '[1, 2]', '{"device_id": "a1"}', '{"type": 3}'])
+def test_malformed_messages_are_rejected(codec, raw):
+    with pytest.raises(CodecError):
+        codec.decode(raw)
+
+def test_unknown_types_decode_without_validation(codec):
+    data = codec.decode('{"type": "future_feature", "anything": null}')
+    assert data['type'] == 'future_feature'
+
+def test_gateway_short_form_uses_emergency_schema(codec):
+    assert codec.decode('{"type": "register", "rssi": -80}')['rssi'] == -80
+    with pytest.raises(CodecError, match='^register: rssi below -200'):
+        codec.decode('{"type": "register", "rssi": -500}')
+
+def test_max_size_counts_bytes_not_characters():
+    codec = Codec(schemas={'note': MessageSchema({'text': Field((str,))}, max_size=64)}, max_size=128)
+    ascii_text = json.dumps({'type': 'note', 'text': 'a' * 30}, ensure_ascii=False)
+    wide_text = json.dumps({'type': 'note', 'text': '🚑' * 30}, ensure_ascii=False)
+    assert len(wide_text) == len(ascii_text) < 64
+    assert byte_size(wide_text) == byte_size(wide_text.encode()) > 128
+
+    assert codec.decode(ascii_text)['text'] == 'a' * 30
+    with pytest.raises(CodecError, match='larger than 128 bytes'):
+        codec.decode(wide_text)
+    with pytest.raises(CodecError, match='larger than 128 bytes'):
+        codec.decode(wide_text.encode())
+
+def test_schema_max_size_counts_bytes():
+    codec = Codec(schemas={'note': MessageSchema({'text': Field((str,))}, max_size=64)}, max_size=128)
+    text = json.dumps({'type': 'note', 'text': 'é' * 20}, ensure_ascii=False)
+    assert len(text) <= 64 < byte_size(text) <= 128
+    with pytest.raises(CodecError, match='note: message too large'):
+        codec.decode(text)
+
+def test_invalid_messages_never_reach_handlers():
+    from main import SimpleVehicleServer
+
+    async def run():
+        server = SimpleVehicleServer()
+        server.connections['a1'] = object()
+        handled = []
+
+        async def handler(device_id, data):
+            handled.append((device_id, data['new_lane']))
+        server.message_handlers['lane_change'] = handler
+
+        await server.handle_message(None, '{"type": "lane_change", "new_lane": 9}', 'a1')
+        await server.handle_message(None, '{"type": "lane_change", "new_lane": 2}', 'a1')
+        await server.handle_message(None, '{"type": "no_such_handler"}', 'a1')
+        return handled
+
+    assert asyncio.run(run()) == [('a1', 2)]
@@ -0,0 +1,145 @@
+"""Tests for emergency request de-duplication."""
+
+from emergency_events import EmergencyEventLog
+
+def make_log() -> EmergencyEventLog:
+    return EmergencyEventLog(refresh_interval=5.0, rearm_delay=1.0, seq_reset_after=30.0)
+
+def test_repeated_trigger_is_a_duplicate():
+    log = make_log()
+    first = log.trigger('amb', 'amb', now=0.0)
+    assert first is not None and first.seq == 1
+    assert log.trigger('amb', 'amb', now=1.0) is None
+    assert log.suppressed['duplicate'] == 1
+    assert log.broadcasts == 1
+
+def test_repeated_sequence_number_is_a_duplicate():
+    log = make_log()
+    log.trigger('amb', 'amb', client_seq=3, now=0.0)
+    assert log.trigger('amb', 'amb', client_seq=3, now=10.0) is None
+    assert log.suppressed['duplicate'] == 1
+
+def test_older_sequence_number_is_out_of_order():
+    log = make_log()
+    log.trigger('amb', 'amb', client_seq=5, now=0.0)
+    assert log.trigger('amb', 'amb', client_seq=4, now=10.0) is None
+    assert log.clear('amb', client_seq=2, now=11.0) is None
+    assert log.suppressed['out_of_order'] == 2
+    assert log.records['amb'].active
+
+def test_trigger_right_after_clear_is_a_rearm():
+    log = make_log()
+    log.trigger('amb', 'amb', now=0.0)
+    log.clear('amb', now=2.0)
+    assert log.trigger('amb', 'amb', now=2.5) is None
+    assert log.suppressed['rearm'] == 1
+
+    fresh = log.trigger('amb', 'amb', now=3.5)
+    assert fresh is not None and fresh.active
+
+def test_clear_without_active_emergency_is_stale():
+    log = make_log()
+    assert log.clear('amb', now=0.0) is None
+    log.trigger('amb', 'amb', now=1.0)
+    assert log.clear('amb', now=2.0) is not None
+    assert log.clear('amb', now=3.0) is None
+    assert log.suppressed['stale_clear'] == 2
+
+def test_trigger_refreshes_after_interval():
+    log = make_log()
+    log.trigger('amb', 'amb', now=0.0)
+    assert log.trigger('amb', 'amb', now=4.9) is None
+    refreshed = log.trigger('amb', 'amb', now=5.0)
+    assert refreshed is not None and refreshed.seq == 2
+    assert refreshed.broadcast_at == 5.0
+
+def test_sender_may_restart_numbering_after_silence():
+    log = make_log()
+    log.trigger('amb', 'amb', client_seq=40, now=0.0)
+    assert log.clear('amb', client_seq=1, now=29.0) is None
+    record = log.clear('amb', client_seq=1, now=60.0)
+    assert record is not None and not record.active
+    assert record.client_seq == 1
+
+def test_aborted_trigger_can_be_retried_at_once():
+    log = make_log()
+    record = log.trigger('amb', 'amb', client_seq=7, now=100.0)
+    log.abort(record)
+    assert not record.active
+    retried = log.trigger('amb', 'amb', client_seq=7, now=100.1)
+    assert retried is not None and retried.active
+    assert log.suppressed == {'duplicate': 0, 'out_of_order': 0, 'rearm': 0, 'stale_clear': 0}
+
+def test_broadcast_sequence_keeps_increasing_across_emergencies():
+    log = make_log()
+    seqs = [
+        log.trigger('amb', 'amb', now=0.0).seq,
+        log.trigger('amb', 'amb', now=6.0).seq,
+        log.clear('amb', now=7.0).seq,
+        log.trigger('amb', 'amb', now=9.0).seq,
+        log.clear('amb', now=10.0).seq,
+    ]
+    assert seqs == [1, 2, 3, 4, 5]
+
+def test_straggler_of_old_emergency_is_told_apart_by_id():
+    log = make_log()
+    old = log.trigger('amb', 'amb', emergency_id='E1', client_seq=4, now=0.0)
+    log.clear('amb', client_seq=5, now=2.0)
+    assert log.trigger('amb', 'amb', emergency_id='E1', client_seq=4, now=10.0) is None
+    assert log.suppressed['out_of_order'] == 1
+    new = log.trigger('amb', 'amb', emergency_id='E2', client_seq=1, now=10.1)
+    assert new is not None and new.emergency_id != old.emergency_id
+
+def test_stats_and_history_pruning():
+    log = EmergencyEventLog(history_size=2)
+    for i in range(4):
+        log.trigger(f'v{i}', f'v{i}', now=float(i))
+        log.clear(f'v{i}', now=i + 0.5)
+    log.trigger('live', 'live', now=10.0)
+    assert len(log.records) == 2
+    assert 'live' in log.records
+    stats = log.get_stats()
+    assert stats['active'] == 1
+    assert stats['broadcasts'] == 9
+    assert stats['suppressed_total'] == 0
+
+def test_vehicle_leading_its_own_emergency_is_released_from_the_other():
+    import asyncio
+    import json
+    from main import SimpleVehicleServer
+
+    class RecordingQueue:
+        def __init__(self):
+            self.frames = []
+
+        def put(self, message_type, message, key=None):
+            self.frames.append((message_type, json.loads(message).get('emergency_id')))
+
+    async def run():
+        server = SimpleVehicleServer()
+        a, b = await server.register_device(object()), await server.register_device(object())
+        queue = server.outbound[b] = RecordingQueue()
+        for device_id, x in ((a, 0.0), (b, 20.0)):  # b is reached at once, so told in the first wave
+            server.device_states[device_id]['position_x'] = x
+            server.coverage.place(device_id, x)
+        await server.trigger_emergency(a)
+        first_id = server.emergencies.vehicle_emergency[b]
+        await server.trigger_emergency(b)
+        return queue.frames, first_id, server.takeover_notified.get(first_id)
+
+    frames, first_id, notified = asyncio.run(run())
+    assert ('emergency_takeover', first_id) in frames
+    assert frames[-1] == ('emergency_cleared', first_id)
+    assert not notified
+
+def test_lora_emergency_is_placed_in_its_receivers_zone():
+    import asyncio
+    from main import SimpleVehicleServer
+
+    async def run():
+        server = SimpleVehicleServer(rsu_ids=['A', 'B', 'C', 'D'], lora_rsu_id='C')
+        await server.trigger_lora_emergency()
+        return next(iter(server.emergencies.active.values()))
+
+    record = asyncio.run(run())
+    assert record.position_x == 500.0  # middle of segment 2, served by C
@@ -0,0 +1,38 @@
+"""Tests for per-connection outbound priority queues."""
+
+import asyncio
+
+from outbound_queue import OutboundQueue, OutboundStats
+
+class FakeWebSocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(message)
+
+def test_dropped_roster_delta_triggers_a_full_resync():
+    async def run():
+        websocket = FakeWebSocket()
+        stats = OutboundStats()
+        queue = OutboundQueue(websocket, stats, control_limit=2,
+                              on_resync=lambda: queue.put('roster_update', 'full'))
+        for version in range(3):
+            queue.put('roster_update', f'delta-{version}')
+        queue.put('emergency_takeover', 'takeover')
+        queue.start()
+        await asyncio.sleep(0.01)
+        queue.close()
+        return websocket.sent, stats
+
+    sent, stats = asyncio.run(run())
+    assert sent == ['takeover', 'delta-1', 'delta-2', 'full']
+    assert stats.dropped[1] == 1 and stats.resyncs == 1
+
+def test_emergency_frames_are_never_dropped():
+    queue = OutboundQueue(FakeWebSocket(), OutboundStats(), control_limit=1, bulk_limit=1)
+    for i in range(5):
+        queue.put('emergency_takeover', str(i))
+        queue.put('lane_change', str(i))
+    assert len(queue.queues[0]) == 5
+    assert len(queue.queues[1]) == 1
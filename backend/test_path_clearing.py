@@ -0,0 +1,37 @@
+"""Tests for ETA-ordered path clearing waves."""
+
+import asyncio
+import json
+import math
+
+from path_clearing import PathClearingScheduler
+
+def test_waves_follow_eta_order():
+    scheduler = PathClearingScheduler(road_length=800, wave_width=1.0, lead_time=0.0)
+    states = {'near': {'position_x': 80.0, 'speed': 0}, 'far': {'position_x': 400.0, 'speed': 0}}
+    waves = scheduler.plan(0.0, ['far', 'near'], states, emergency_speed=80.0)
+    assert [wave.device_ids for wave in waves] == [['near'], ['far']]
+    assert [wave.release_at for wave in waves] == [1.0, 5.0]
+
+def test_unknown_position_is_one_immediate_wave():
+    scheduler = PathClearingScheduler()
+    states = {'a': {'position_x': 10.0}, 'b': {'position_x': 500.0}}
+    waves = scheduler.plan(None, ['a', 'b'], states)
+    assert len(waves) == 1 and waves[0].release_at == 0.0
+    assert math.isinf(waves[0].max_eta)
+
+def test_takeover_without_a_position_has_null_eta():
+    from main import SimpleVehicleServer
+
+    async def run():
+        server = SimpleVehicleServer()
+        vehicle = await server.register_device(object())
+        sent = []
+        server.send_to_device = lambda device_id, message_type, message, key=None: sent.append(message)
+        await server.start_emergency(server.emergency_events.trigger('LORA', 'CV2X', 'cv2x_lora'))
+        return sent
+
+    sent = asyncio.run(run())
+    assert len(sent) == 1
+    assert 'Infinity' not in sent[0]
+    assert json.loads(sent[0])['eta'] is None
@@ -0,0 +1,41 @@
+"""Tests for per-device admission control."""
+
+import json
+
+from rate_limiter import AdmissionController, BucketConfig, sniff_message_type
+
+def lane_change(**extra) -> str:
+    return json.dumps({'type': 'lane_change', 'device_id': 'a1', 'new_lane': 2, **extra})
+
+def test_sniffs_only_a_leading_top_level_type():
+    assert sniff_message_type(lane_change()) == 'lane_change'
+    assert sniff_message_type(lane_change().encode()) == 'lane_change'
+    assert sniff_message_type('  {\n "type" : "ping"}') == 'ping'
+    assert sniff_message_type('{"note": {"type": "register_emergency"}, "type": "lane_change"}') is None
+    assert sniff_message_type('{"pad": "' + 'x' * 300 + '", "type": "lane_change"}') is None
+
+def test_unsniffable_frames_are_over_budget():
+    admission = AdmissionController()
+    padded = '{"pad": "' + 'x' * 300 + '", "type": "lane_change", "new_lane": 2}'
+    assert not any(admission.admit('a1', padded) for _ in range(50))
+    assert admission.get_stats()['dropped_by_type'] == {'unknown': 50}
+
+def test_lane_changes_are_limited_per_type():
+    admission = AdmissionController()
+    admitted = [admission.admit('a1', lane_change()) for _ in range(50)]
+    assert admitted.count('lane_change') == 6
+
+def test_decoded_type_must_match_the_charged_one():
+    admission = AdmissionController()
+    charged = admission.admit('a1', '{"type": "register_emergency", "note": {"type": "x"}}')
+    assert charged == 'register_emergency'
+    assert not admission.confirm('a1', charged, 'lane_change')
+    assert admission.confirm('a1', 'lane_change', 'lane_change')
+    assert admission.get_stats()['dropped_by_type'] == {'type_mismatch': 1}
+
+def test_drops_of_unknown_types_share_one_counter():
+    admission = AdmissionController(device_limit=BucketConfig(rate=0, burst=0))
+    for i in range(100):
+        admission.admit('a1', json.dumps({'type': 'made_up_' + 'x' * (i % 30 + 1)}))
+    admission.admit('a1', lane_change())
+    assert admission.get_stats()['dropped_by_type'] == {'other': 100, 'lane_change': 1}
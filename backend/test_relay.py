@@ -0,0 +1,33 @@
+"""Tests for relaying emergency events between server nodes."""
+
+import asyncio
+import json
+
+def envelope(event_id: str, event: dict) -> str:
+    return json.dumps({'type': 'relay_event', 'event_id': event_id, 'origin': 'n2', 'hops': 0, 'event': event})
+
+def test_bad_relayed_events_do_not_stop_the_link():
+    from main import SimpleVehicleServer
+
+    async def run():
+        server = SimpleVehicleServer(node_id='n1')
+        applied = []
+
+        async def apply_relayed_event(event, origin=None):
+            if event['device_id'] == 'boom':
+                raise KeyError('emergency_id')
+            applied.append(event['device_id'])
+        server.apply_relayed_event = apply_relayed_event
+
+        async def link():
+            for message in [
+                'not json',
+                envelope('e1', {'type': 'emergency_takeover'}),
+                envelope('e2', {'type': 'emergency_takeover', 'device_id': 'boom'}),
+                envelope('e3', {'type': 'emergency_takeover', 'device_id': 'amb'}),
+            ]:
+                yield message
+        await server.relay._read_link(link(), 'n2')
+        return applied
+
+    assert asyncio.run(run()) == ['amb']
@@ -0,0 +1,66 @@
+"""Tests for the per-vehicle trajectory rings."""
+
+import pytest
+
+from trajectory import INITIAL_SLOTS, TrajectoryRing, TrajectoryStore
+
+def fill(ring: TrajectoryRing, count: int, start: int = 0):
+    for i in range(start, start + count):
+        ring.append(float(i), i * 10.0, 25.0, float(i % 7), i % 3 + 1)
+
+def test_ring_starts_small_and_grows_to_capacity():
+    ring = TrajectoryRing(capacity=100)
+    assert len(ring.t) == INITIAL_SLOTS
+    fill(ring, 40)
+    assert len(ring.t) == 64
+    assert list(ring.window()[0]) == [float(i) for i in range(40)]
+    fill(ring, 200, start=40)
+    assert len(ring.t) == 100
+    assert ring.size == 100
+
+def test_ring_wraps_and_keeps_newest_samples():
+    ring = TrajectoryRing(capacity=32)
+    fill(ring, 75)
+    t, x, y, speed, lane = ring.window()
+    assert list(t) == [float(i) for i in range(43, 75)]
+    assert list(x) == [i * 10.0 for i in range(43, 75)]
+    assert list(lane) == [i % 3 + 1 for i in range(43, 75)]
+    assert ring.head != 0  # the oldest sample is mid-array, so reads cross the end
+
+def test_window_bounds_are_inclusive_across_the_wrap():
+    ring = TrajectoryRing(capacity=32)
+    fill(ring, 75)
+    assert list(ring.window(60.0, 70.0)[0]) == [float(i) for i in range(60, 71)]
+    assert list(ring.window(0.0, 44.0)[0]) == [43.0, 44.0]
+    assert list(ring.window(100.0)[0]) == []
+
+def test_latest():
+    ring = TrajectoryRing(capacity=32)
+    fill(ring, 75)
+    assert list(ring.latest(3)[0]) == [72.0, 73.0, 74.0]
+    assert len(ring.latest(100)[0]) == 32
+    assert list(TrajectoryRing(8).latest(3)[0]) == []
+
+def test_store_queries_and_forget():
+    store = TrajectoryStore(capacity=600)
+    assert store.window('a1') is None
+    assert store.mean_speed('a1', 0.0) is None
+    for i in range(10):
+        store.record('a1', float(i), 0.0, 25.0, 40.0 + i, 1)
+    assert list(store.window('a1', 5.0)[0]) == [5.0, 6.0, 7.0, 8.0, 9.0]
+    assert store.mean_speed('a1', 5.0) == pytest.approx(47.0)
+    assert store.mean_speed('a1', 20.0) is None
+    assert store.get_stats()['samples'] == 10
+
+    store.forget('a1')
+    assert store.window('a1') is None
+    assert store.memory_bytes() == 0
+
+def test_store_memory_tracks_reports_not_capacity():
+    store = TrajectoryStore(capacity=600)
+    store.record_state('a1', {'position_x': 10.0, 'position_y': 25.0, 'speed': 50, 'current_lane': 2}, 1.0)
+    small = store.memory_bytes()
+    assert small == TrajectoryRing(INITIAL_SLOTS).memory_bytes()
+    for i in range(600):
+        store.record('a1', 2.0 + i, 0.0, 25.0, 50.0, 2)
+    assert store.memory_bytes() == 600 * (8 + 8 + 8 + 4 + 1)  # t, x, y, speed, lane
@@ -0,0 +1,118 @@
+"""
+Hashed timer wheel for per-connection periodic work.
+A single task ticks the wheel and hands every job that is due in a tick to
+its handler as one batch, instead of each connection keeping its own timers.
+"""
+
+import asyncio
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+class TimerWheel:
+    """Drives periodic jobs for many keys from one ticking task."""
+
+    def __init__(self, tick_interval: float = 0.1, wheel_size: int = 256):
+        self.tick_interval = tick_interval
+        self.wheel_size = wheel_size
+        self.slots: List[Dict[Tuple[str, str], list]] = [{} for _ in range(wheel_size)]
+        self.jobs: Dict[str, Tuple[int, Callable[[List[str]], None]]] = {}  # name -> (ticks, handler)
+        self.entries: Dict[Tuple[str, str], list] = {}  # (key, job) -> [slot, rounds]
+        self.current_tick = 0
+        self.task: Optional[asyncio.Task] = None
+
+        # Stats
+        self.ticks = 0
+        self.batches = 0
+        self.jobs_run = 0
+        self.max_lag = 0.0
+
+    def register_job(self, name: str, interval: float, handler: Callable[[List[str]], None]):
+        """Register a periodic job; ``handler`` receives the list of due keys."""
+        ticks = max(1, round(interval / self.tick_interval))
+        self.jobs[name] = (ticks, handler)
+
+    def add(self, key: str, jobs: Iterable[str] = None):
+        """Start running jobs (all registered jobs by default) for a key."""
+        for name in (jobs if jobs is not None else self.jobs):
+            self.remove(key, [name])
+            self._schedule((key, name), self.jobs[name][0])
+
+    def remove(self, key: str, jobs: Iterable[str] = None):
+        """Stop running jobs (all registered jobs by default) for a key."""
+        for name in (jobs if jobs is not None else self.jobs):
+            entry = self.entries.pop((key, name), None)
+            if entry is not None:
+                del self.slots[entry[0]][(key, name)]
+
+    def _schedule(self, entry_key: Tuple[str, str], ticks: int):
+        slot = (self.current_tick + ticks) % self.wheel_size
+        rounds = (ticks - 1) // self.wheel_size
+        entry = [slot, rounds]
+        self.entries[entry_key] = entry
+        self.slots[slot][entry_key] = entry
+
+    def advance(self, ticks: int = 1):
+        """Advance the wheel by ``ticks`` and run the batches that are due.
+
+        Each job runs once with every key due during those ticks, so ticks
+        missed while the loop was busy merge into one batch per job.
+        """
+        due: Dict[str, Dict[str, None]] = {}  # job -> due keys, in order and without repeats
+        for _ in range(ticks):
+            self.current_tick += 1
+            self.ticks += 1
+            slot = self.slots[self.current_tick % self.wheel_size]
+            for entry_key, entry in list(slot.items()):
+                if entry[1] > 0:
+                    entry[1] -= 1
+                    continue
+                del slot[entry_key]
+                key, name = entry_key
+                due.setdefault(name, {})[key] = None
+                self._schedule(entry_key, self.jobs[name][0])
+
+        for name, keys in due.items():
+            self.batches += 1
+            self.jobs_run += len(keys)
+            try:
+                self.jobs[name][1](list(keys))
+            except Exception as e:
+                logger.error("Timer job %s failed: %s", name, e)
+
+    def start(self):
+        """Start the ticking task if it is not already running."""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run())
+
+    def stop(self):
+        """Stop the ticking task."""
+        if self.task:
+            self.task.cancel()
+            self.task = None
+
+    async def run(self):
+        """Tick forever, catching up on ticks missed while the loop was busy."""
+        loop = asyncio.get_running_loop()
+        next_tick = loop.time() + self.tick_interval
+        while True:
+            await asyncio.sleep(max(0.0, next_tick - loop.time()))
+            now = loop.time()
+            self.max_lag = max(self.max_lag, now - next_tick)
+            missed = 0
+            while next_tick <= now:
+                missed += 1
+                next_tick += self.tick_interval
+            if missed:
+                self.advance(missed)
+
+    def get_stats(self) -> dict:
+        """Get timer wheel counters."""
+        return {
+            'ticks': self.ticks,
+            'batches': self.batches,
+            'jobs_run': self.jobs_run,
+            'scheduled': len(self.entries),
+            'max_lag_ms': round(self.max_lag * 1000, 3)
+        }
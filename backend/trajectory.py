@@ -0,0 +1,148 @@
+"""
+Per-vehicle trajectory history.
+Keeps the last N samples of (t, x, y, speed, lane) for each vehicle in
+bounded ring buffers backed by typed arrays, so memory stays bounded however
+long a session runs and windowed queries slice contiguous numeric storage
+instead of walking lists of dicts. Rings start small and grow to their
+capacity, so vehicles that rarely report cost little.
+"""
+
+from array import array
+from typing import Dict, Optional, Tuple
+
+# (t, x, y, speed, lane) columns returned by window queries
+Columns = Tuple[array, array, array, array, array]
+
+INITIAL_SLOTS = 16
+
+class TrajectoryRing:
+    """Bounded ring of trajectory samples for one vehicle."""
+    __slots__ = ('capacity', 't', 'x', 'y', 'speed', 'lane', 'head', 'size')
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        slots = min(capacity, INITIAL_SLOTS)
+        self.t = array('d', [0.0]) * slots
+        self.x = array('d', [0.0]) * slots
+        self.y = array('d', [0.0]) * slots
+        self.speed = array('f', [0.0]) * slots
+        self.lane = array('b', [0]) * slots
+        self.head = 0  # next slot to write
+        self.size = 0
+
+    def _grow(self):
+        """Double the arrays, up to capacity; only called before the ring first wraps."""
+        extra = min(len(self.t), self.capacity - len(self.t))
+        for column in (self.t, self.x, self.y, self.speed, self.lane):
+            column.extend(column[:1] * extra)
+        self.head = self.size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, t: float, x: float, y: float, speed: float, lane: int):
+        """Record a sample, overwriting the oldest once full."""
+        if self.size == len(self.t) < self.capacity:
+            self._grow()
+        i = self.head
+        self.t[i] = t
+        self.x[i] = x
+        self.y[i] = y
+        self.speed[i] = speed
+        self.lane[i] = lane
+        self.head = (i + 1) % len(self.t)
+        if self.size < self.capacity:
+            self.size += 1
+
+    def _physical(self, logical: int) -> int:
+        """Map 0 = oldest .. size-1 = newest to a slot in the arrays."""
+        return (self.head - self.size + logical) % len(self.t)
+
+    def _lower_bound(self, t: float) -> int:
+        """Logical index of the first sample at or after ``t`` (samples are time-ordered)."""
+        lo, hi = 0, self.size
+        times = self.t
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if times[self._physical(mid)] < t:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _slice(self, column: array, start: int, stop: int) -> array:
+        """Copy logical samples [start, stop) of one column, in order."""
+        if start >= stop:
+            return column[:0]
+        first = self._physical(start)
+        last = self._physical(stop - 1) + 1
+        if first < last:
+            return column[first:last]
+        return column[first:] + column[:last]  # window wraps around the end
+
+    def window(self, start_t: float = float('-inf'), end_t: float = float('inf')) -> Columns:
+        """Get samples with start_t <= t <= end_t as (t, x, y, speed, lane) arrays."""
+        start = self._lower_bound(start_t)
+        stop = self._lower_bound(end_t) if end_t != float('inf') else self.size
+        while stop < self.size and self.t[self._physical(stop)] == end_t:
+            stop += 1
+        return tuple(self._slice(column, start, stop)
+                     for column in (self.t, self.x, self.y, self.speed, self.lane))
+
+    def latest(self, count: int) -> Columns:
+        """Get the newest ``count`` samples."""
+        start = max(0, self.size - count)
+        return tuple(self._slice(column, start, self.size)
+                     for column in (self.t, self.x, self.y, self.speed, self.lane))
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the sample arrays."""
+        return sum(column.itemsize * len(column)
+                   for column in (self.t, self.x, self.y, self.speed, self.lane))
+
+class TrajectoryStore:
+    """Trajectory rings for every vehicle."""
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.rings: Dict[str, TrajectoryRing] = {}
+
+    def record(self, device_id: str, t: float, x: float, y: float, speed: float, lane: int):
+        """Append a sample to a vehicle's trajectory."""
+        ring = self.rings.get(device_id)
+        if ring is None:
+            ring = self.rings[device_id] = TrajectoryRing(self.capacity)
+        ring.append(t, x, y, speed, lane)
+
+    def record_state(self, device_id: str, state: dict, t: float):
+        """Append a sample from a ``device_states`` entry."""
+        self.record(device_id, t, state['position_x'], state['position_y'],
+                    state['speed'], state['current_lane'])
+
+    def window(self, device_id: str, start_t: float = float('-inf'),
+               end_t: float = float('inf')) -> Optional[Columns]:
+        """Get a vehicle's samples within a time window, or None if unknown."""
+        ring = self.rings.get(device_id)
+        return ring.window(start_t, end_t) if ring else None
+
+    def mean_speed(self, device_id: str, start_t: float, end_t: float = float('inf')) -> Optional[float]:
+        """Average reported speed over a time window (for smoothing and analysis)."""
+        columns = self.window(device_id, start_t, end_t)
+        if not columns or not columns[3]:
+            return None
+        return sum(columns[3]) / len(columns[3])
+
+    def forget(self, device_id: str):
+        """Drop a vehicle's history."""
+        self.rings.pop(device_id, None)
+
+    def memory_bytes(self) -> int:
+        """Bytes held by every vehicle's sample arrays."""
+        return sum(ring.memory_bytes() for ring in self.rings.values())
+
+    def get_stats(self) -> dict:
+        return {
+            'vehicles': len(self.rings),
+            'samples': sum(ring.size for ring in self.rings.values()),
+            'memory_bytes': self.memory_bytes()
+        }
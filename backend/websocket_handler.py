@@ -2,11 +2,11 @@
 WebSocket connection handler for vehicle communication system.
 """
 
-import json
 import logging
 import asyncio
-from typing import Dict, Set
+from typing import Dict, Set, Union
 from websockets import WebSocketServerProtocol
+from codec import Codec, CodecError
 
 logger = logging.getLogger(__name__)
 
@@ -17,11 +17,20 @@ class WebSocketHandler:
         self.server = server_instance
         self.device_connections: Dict[str, WebSocketServerProtocol] = {}
         self.emergency_devices: Set[str] = set()
+        self.codec = getattr(server_instance, 'codec', None) or Codec()
+
+        # Message type -> handler, looked up once per message
+        self.message_handlers = {
+            'emergency_signal': self._handle_emergency_signal,
+            'position_update': self._handle_position_update,
+            'lane_change': self._handle_lane_change,
+            'device_info': self._handle_device_info,
+        }
 
     async def register_connection(self, device_id: str, websocket: WebSocketServerProtocol):
         """Register a new device connection."""
         self.device_connections[device_id] = websocket
-        logger.info(f"Device connection registered: {device_id}")
+        logger.info("Device connection registered: %s", device_id)
 
     async def unregister_connection(self, device_id: str):
         """Unregister a device connection."""
@@ -29,11 +38,11 @@ class WebSocketHandler:
             del self.device_connections[device_id]
         if device_id in self.emergency_devices:
             self.emergency_devices.discard(device_id)
-        logger.info(f"Device connection unregistered: {device_id}")
+        logger.info("Device connection unregistered: %s", device_id)
 
     async def broadcast_to_all(self, message: dict, exclude_device: str = None):
         """Broadcast message to all connected devices."""
-        message_str = json.dumps(message)
+        message_str = self.codec.encode(message)
 
         disconnected_devices = []
         for device_id, websocket in self.device_connections.items():
@@ -41,7 +50,7 @@ class WebSocketHandler:
                 try:
                     await websocket.send(message_str)
                 except Exception as e:
-                    logger.warning(f"Failed to send to {device_id}: {e}")
+                    logger.warning("Failed to send to %s: %s", device_id, e)
                     disconnected_devices.append(device_id)
 
         # Clean up disconnected devices
@@ -53,25 +62,34 @@ class WebSocketHandler:
         if device_id in self.device_connections:
             try:
                 websocket = self.device_connections[device_id]
-                await websocket.send(json.dumps(message))
+                await websocket.send(self.codec.encode(message))
             except Exception as e:
-                logger.warning(f"Failed to send to {device_id}: {e}")
+                logger.warning("Failed to send to %s: %s", device_id, e)
                 await self.unregister_connection(device_id)
 
+    async def handle_raw_message(self, device_id: str, raw: Union[str, bytes]):
+        """Decode, validate and process a raw incoming frame."""
+        try:
+            message_data = self.codec.decode(raw)
+        except CodecError as e:
+            logger.warning("Rejected message from %s: %.120s", device_id, e)
+            return
+        await self._dispatch(device_id, message_data)
+
     async def handle_incoming_message(self, device_id: str, message_data: dict):
         """Process incoming message from device."""
-        message_type = message_data.get('type')
-
-        if message_type == 'emergency_signal':
-            await self._handle_emergency_signal(device_id)
-        elif message_type == 'position_update':
-            await self._handle_position_update(device_id, message_data)
-        elif message_type == 'lane_change':
-            await self._handle_lane_change(device_id, message_data)
-        elif message_type == 'device_info':
-            await self._handle_device_info(device_id, message_data)
-
-    async def _handle_emergency_signal(self, device_id: str):
+        error = self.codec.validate(message_data)
+        if error:
+            logger.warning("Rejected message from %s: %.120s", device_id, error)
+            return
+        await self._dispatch(device_id, message_data)
+
+    async def _dispatch(self, device_id: str, message_data: dict):
+        handler = self.message_handlers.get(message_data['type'])
+        if handler:
+            await handler(device_id, message_data)
+
+    async def _handle_emergency_signal(self, device_id: str, message_data: dict = None):
         """Handle emergency signal activation."""
         self.emergency_devices.add(device_id)
 
@@ -82,7 +100,7 @@ class WebSocketHandler:
         }
 
         await self.broadcast_to_all(emergency_message, exclude_device=device_id)
-        logger.info(f"Emergency signal activated by device: {device_id}")
+        logger.info("Emergency signal activated by device: %s", device_id)
 
     async def _handle_position_update(self, device_id: str, message_data: dict):
         """Handle position update from device."""
@@ -114,7 +132,7 @@ class WebSocketHandler:
         }
 
         await self.broadcast_to_all(lane_change_message, exclude_device=device_id)
-        logger.info(f"Device {device_id} changed to lane {new_lane} ({reason})")
+        logger.info("Device %s changed to lane %s (%s)", device_id, new_lane, reason)
 
     async def _handle_device_info(self, device_id: str, message_data: dict):
         """Handle device information update."""
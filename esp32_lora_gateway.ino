@@ -260,6 +260,12 @@ void handleLoRaPacket() {
     if (secondPipe > 0 && thirdPipe > 0) {
       String vehicleId = message.substring(firstPipe + 1, secondPipe);
       String status = message.substring(secondPipe + 1, thirdPipe);
+      // BSM count (5th field) lets the server drop retransmits and stale packets
+      int fourthPipe = message.indexOf('|', thirdPipe + 1);
+      String seqField = "";
+      if (fourthPipe > 0) {
+        seqField = ",\"seq\":" + message.substring(fourthPipe + 1);
+      }
       
       Serial.print(F("   Vehicle: ")); Serial.println(vehicleId);
       Serial.print(F("   Status: ")); Serial.println(status);
@@ -271,7 +277,7 @@ void handleLoRaPacket() {
         if (status == "EMERGENCY") {
           jsonMsg = "{\"type\":\"register_emergency\",\"device_id\":\"" + vehicleId + 
                     "\",\"source\":\"cv2x_lora\",\"rssi\":" + String(rssi) + 
-                    ",\"snr\":" + String(snr) + "}";
+                    ",\"snr\":" + String(snr) + seqField + "}";
         } else if (status == "CLEAR") {
           jsonMsg = "{\"type\":\"clear_emergency\",\"device_id\":\"" + vehicleId + 
                     "\",\"source\":\"cv2x_lora\"}";
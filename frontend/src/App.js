@@ -116,10 +116,10 @@ function App() {
         if (data.takeover) {
           setControlLocked(true);
           console.log('🚨 EMERGENCY TAKEOVER - Control locked!', data.message);
-          // Auto-move to right lane during takeover
-          setMyLane(3);
-          // Show visual alert
-          alert('🚨 EMERGENCY LOCKOUT ACTIVATED!\n\nYour vehicle controls have been locked.\nThe system is taking over to clear the way for the emergency vehicle.');
+          // Move to the lane the server assigned (right lane if none)
+          setMyLane(data.instruction?.target_lane ?? 3);
+          // Show visual alert (not when handed over from another emergency)
+          if (!data.reassigned) alert('🚨 EMERGENCY LOCKOUT ACTIVATED!\n\nYour vehicle controls have been locked.\nThe system is taking over to clear the way for the emergency vehicle.');
         } else {
           console.log('Emergency signal received:', data.message);
         }
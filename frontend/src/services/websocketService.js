@@ -12,6 +12,11 @@ class WebSocketService {
     this.reconnectAttempts = 0;
     this.maxReconnectAttempts = 5;
     this.reconnectDelay = 3000;
+    this.resumeToken = null;
+    this.registration = null;
+    this.deadReckoning = null;  // shared prediction settings from the server
+    this.roster = {};  // device_id -> {name, color}, kept current from full copies and deltas
+    this.lastSentPosition = null;  // { x, speed, time } the server is extrapolating from
     this.listeners = new Map();
   }
 
@@ -19,9 +24,17 @@ class WebSocketService {
    * Connect to the WebSocket server
    */
   connect(name, color, role = 'student') {
+    if (name) {
+      this.registration = { name, color, role };
+    }
+
     try {
       const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
-      const wsUrl = `${protocol}//${window.location.hostname}:8765`;
+      let wsUrl = `${protocol}//${window.location.hostname}:8765`;
+      if (this.resumeToken) {
+        // Ask the server to re-attach us to our previous vehicle
+        wsUrl += `?resume=${encodeURIComponent(this.resumeToken)}`;
+      }
 
       console.log('Connecting to WebSocket:', wsUrl);
       this.websocket = new WebSocket(wsUrl);
@@ -34,11 +47,6 @@ class WebSocketService {
 
         // Request current system state
         this.send({ type: 'get_system_state' });
-
-        // Send user registration (name/color)
-        if (name) {
-          this.send({ type: 'register_user', name, color, role });
-        }
       };
 
       this.websocket.onmessage = (event) => {
@@ -103,6 +111,14 @@ class WebSocketService {
         this.deviceId = data.device_id;
         this.vehicleType = data.vehicle_type;
         this.isEmergencyVehicle = data.vehicle_type === 'emergency_vehicle';
+        this.resumeToken = data.resume_token || null;
+        this.deadReckoning = data.dead_reckoning || null;
+        this.lastSentPosition = null;
+
+        // Send user registration (name/color) unless the server kept our session
+        if (this.registration && !data.resumed) {
+          this.send({ type: 'register_user', ...this.registration });
+        }
         this.emit('welcome', data);
         break;
 
@@ -111,7 +127,9 @@ class WebSocketService {
         break;
 
       case 'roster_update':
-        this.emit('rosterUpdate', data);
+        // Full copy for newcomers, otherwise only the entries that changed
+        this.roster = data.roster ? { ...data.roster } : { ...this.roster, ...data.changes };
+        this.emit('rosterUpdate', { ...data, roster: this.roster });
         break;
 
       case 'position_update':
@@ -186,9 +204,30 @@ class WebSocketService {
   }
 
   /**
-   * Send position update
+   * Check whether the server's dead-reckoned prediction has drifted from our true position
+   */
+  positionDrifted(position, now) {
+    const last = this.lastSentPosition;
+    const settings = this.deadReckoning;
+    if (!settings || !last || now - last.time >= settings.max_silence) {
+      return true;
+    }
+    const length = settings.road_length;
+    const predicted = (last.x + last.speed * (now - last.time)) % length;
+    let drift = Math.abs(position.x - predicted);
+    drift = Math.min(drift, length - drift);  // across the wrap point
+    return drift > settings.threshold;
+  }
+
+  /**
+   * Send position update (only when the server's prediction has drifted)
    */
   sendPositionUpdate(position) {
+    const now = performance.now() / 1000;
+    if (!this.positionDrifted(position, now)) {
+      return false;
+    }
+    this.lastSentPosition = { x: position.x, speed: position.speed || 0, time: now };
     return this.send({
       type: 'position_update',
       device_id: this.deviceId,
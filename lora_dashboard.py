@@ -330,8 +330,8 @@ def main():
     print("LoRa Distance Dashboard")
     print("=" * 60)
     
-    # Find serial port
-    port = find_serial_port()
+    # Use the port given on the command line (e.g. a lora_simulator.py pty), else auto-detect
+    port = sys.argv[1] if len(sys.argv) > 1 else find_serial_port()
     
     if not port:
         print("\n❌ No serial ports found!")
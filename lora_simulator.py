@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+LoRa Channel Simulator - Serial Ingestion Without Radios
+
+Opens a pseudo-terminal pair and writes the LoRa receiver's serial protocol
+to it, so the backend's ArduinoInterface (or lora_dashboard.py) can attach to
+the pty exactly as it would to the ESP32 over USB.
+
+The channel is configurable: packet rate, loss, duplication, arrival jitter
+and RSSI/SNR distributions. The emergency alternates between active and idle
+phases, like the transmitter's button being pressed and released.
+
+Usage:
+1. Run this script: python3 lora_simulator.py --rate 10 --loss 0.05
+2. Note the printed pty path (or use --link /tmp/ttyLORA)
+3. Start backend server: python3 backend/main.py --serial-port /tmp/ttyLORA
+   or the dashboard:     python3 lora_dashboard.py /tmp/ttyLORA  (with --protocol distance)
+4. Press Ctrl+C to stop and print channel statistics
+
+Protocols:
+- receiver: the RSU receiver lines ArduinoInterface parses
+  (RECEIVER_READY, Message:/RSSI:/SNR: per packet, EMERGENCY_DETECTED, EMERGENCY_CLEAR)
+- distance: the Wio-SX1262 JSON lines lora_dashboard.py parses
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tty
+
+class LoRaChannelSimulator:
+    """Emits receiver serial output for a simulated LoRa channel on a pty."""
+
+    def __init__(self, protocol='receiver', rate=10.0, loss=0.0, duplicate=0.0,
+                 jitter_ms=0.0, rssi_mean=-85.0, rssi_std=6.0, snr_mean=7.0, snr_std=2.5,
+                 active_time=5.0, idle_time=5.0, vehicle_id='EV-001', seed=None):
+        self.protocol = protocol
+        self.rate = rate
+        self.loss = loss
+        self.duplicate = duplicate
+        self.jitter_ms = jitter_ms
+        self.rssi_mean = rssi_mean
+        self.rssi_std = rssi_std
+        self.snr_mean = snr_mean
+        self.snr_std = snr_std
+        self.active_time = active_time
+        self.idle_time = idle_time
+        self.vehicle_id = vehicle_id
+        self.rng = random.Random(seed)
+
+        self.master_fd = None
+        self.slave_fd = None
+        self.port = None
+        self.link = None
+        self.start_time = time.monotonic()
+
+        # Channel statistics
+        self.transmitted = 0   # packets the simulated vehicle sent
+        self.delivered = 0     # packets written to the serial port (incl. duplicates)
+        self.lost = 0
+        self.duplicated = 0
+        self.overruns = 0      # lines dropped because nobody drained the serial buffer
+        self.lines = 0
+
+    def open(self, link=None):
+        """Open the pty pair and return the path clients should attach to."""
+        self.master_fd, self.slave_fd = os.openpty()
+        tty.setraw(self.slave_fd)  # no newline translation or echo, like a USB CDC port
+        os.set_blocking(self.master_fd, False)
+        self.port = os.ttyname(self.slave_fd)
+        if link:
+            if os.path.islink(link):
+                os.unlink(link)
+            os.symlink(self.port, link)
+            self.link = link
+        return link or self.port
+
+    def close(self):
+        """Close the pty pair and remove the symlink."""
+        if self.link and os.path.islink(self.link):
+            os.unlink(self.link)
+        for fd in (self.master_fd, self.slave_fd):
+            if fd is not None:
+                os.close(fd)
+        self.master_fd = self.slave_fd = None
+
+    def millis(self):
+        return int((time.monotonic() - self.start_time) * 1000)
+
+    def write_line(self, line):
+        """Write one serial line, dropping it if the port buffer is full."""
+        try:
+            os.write(self.master_fd, (line + '\r\n').encode('utf-8'))
+            self.lines += 1
+        except BlockingIOError:
+            self.overruns += 1
+
+    def sample_signal(self):
+        rssi = round(self.rng.gauss(self.rssi_mean, self.rssi_std))
+        snr = round(self.rng.gauss(self.snr_mean, self.snr_std), 1)
+        return min(rssi, -20), snr
+
+    def packet_lines(self, message, rssi, snr, status):
+        """Serial lines the receiver prints for one received packet."""
+        if self.protocol == 'distance':
+            distance = 10 ** ((-40 - rssi) / (10 * 2.5))  # same path-loss model as the sketch
+            return [json.dumps({
+                'type': 'data',
+                'distance': round(distance, 1),
+                'rssi': rssi,
+                'snr': snr,
+                'packets': self.delivered,
+                'message': message,
+                'timestamp': self.millis(),
+                'connected': True
+            })]
+        lines = [f'Message: {message}', f'RSSI: {rssi}', f'SNR: {snr}']
+        lines.append('EMERGENCY_DETECTED' if status == 'EMERGENCY' else 'EMERGENCY_CLEAR')
+        return lines
+
+    def receive(self, status):
+        """Pass one transmitted BSM through the channel."""
+        self.transmitted += 1
+        message = f'BSM|{self.vehicle_id}|{status}|{self.millis()}|{self.transmitted}'
+        if self.rng.random() < self.loss:
+            self.lost += 1
+            return
+        copies = 1
+        if self.rng.random() < self.duplicate:
+            copies = 2
+            self.duplicated += 1
+        rssi, snr = self.sample_signal()
+        for _ in range(copies):
+            self.delivered += 1
+            for line in self.packet_lines(message, rssi, snr, status):
+                self.write_line(line)
+
+    def next_interval(self):
+        """Inter-packet gap: the nominal BSM interval plus Gaussian jitter."""
+        interval = 1.0 / self.rate
+        if self.jitter_ms:
+            interval += self.rng.gauss(0, self.jitter_ms / 1000)
+        return max(0.0, interval)
+
+    def run(self, duration=None, cycles=None):
+        """Alternate active and idle phases until the duration or cycle count is reached."""
+        if self.protocol == 'distance':
+            self.write_line(json.dumps({'status': 'ready', 'message': 'SX1262 initialized successfully'}))
+        else:
+            self.write_line('RECEIVER_READY')
+
+        deadline = time.monotonic() + duration if duration else None
+        cycle = 0
+        while cycles is None or cycle < cycles:
+            phase_end = time.monotonic() + self.active_time
+            next_send = time.monotonic()
+            while time.monotonic() < phase_end:
+                if deadline and time.monotonic() >= deadline:
+                    return
+                self.receive('EMERGENCY')
+                next_send += self.next_interval()
+                time.sleep(max(0.0, next_send - time.monotonic()))
+            self.receive('CLEAR')
+            cycle += 1
+            if deadline and time.monotonic() + self.idle_time >= deadline:
+                time.sleep(max(0.0, deadline - time.monotonic()))
+                return
+            time.sleep(self.idle_time)
+
+    def get_stats(self):
+        """Get channel statistics."""
+        elapsed = max(time.monotonic() - self.start_time, 1e-9)
+        return {
+            'transmitted': self.transmitted,
+            'delivered': self.delivered,
+            'lost': self.lost,
+            'duplicated': self.duplicated,
+            'overruns': self.overruns,
+            'lines': self.lines,
+            'elapsed_s': round(elapsed, 2),
+            'delivered_per_s': round(self.delivered / elapsed, 1)
+        }
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate a LoRa receiver on a pseudo-terminal')
+    parser.add_argument('--protocol', choices=['receiver', 'distance'], default='receiver')
+    parser.add_argument('--rate', type=float, default=10.0, help='packets per second while active (default: 10 Hz BSM)')
+    parser.add_argument('--loss', type=float, default=0.0, help='packet loss probability')
+    parser.add_argument('--duplicate', type=float, default=0.0, help='packet duplication probability')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='std dev of arrival jitter')
+    parser.add_argument('--rssi', type=float, nargs=2, default=[-85.0, 6.0], metavar=('MEAN', 'STD'))
+    parser.add_argument('--snr', type=float, nargs=2, default=[7.0, 2.5], metavar=('MEAN', 'STD'))
+    parser.add_argument('--active', type=float, default=5.0, help='seconds the emergency is broadcasting')
+    parser.add_argument('--idle', type=float, default=5.0, help='seconds between emergencies')
+    parser.add_argument('--cycles', type=int, help='stop after this many emergencies')
+    parser.add_argument('--duration', type=float, help='stop after this many seconds')
+    parser.add_argument('--link', help='also expose the pty at this path, e.g. /tmp/ttyLORA')
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args()
+
+    simulator = LoRaChannelSimulator(
+        protocol=args.protocol, rate=args.rate, loss=args.loss, duplicate=args.duplicate,
+        jitter_ms=args.jitter_ms, rssi_mean=args.rssi[0], rssi_std=args.rssi[1],
+        snr_mean=args.snr[0], snr_std=args.snr[1], active_time=args.active,
+        idle_time=args.idle, seed=args.seed
+    )
+    port = simulator.open(args.link)
+
+    print("\n📡 LoRa Channel Simulator")
+    print(f"   Serial port: {port}")
+    print(f"   Protocol: {args.protocol}, {args.rate} pkt/s, loss {args.loss:.0%}, "
+          f"dup {args.duplicate:.0%}, jitter {args.jitter_ms}ms")
+    print("   Press Ctrl+C to stop\n")
+    sys.stdout.flush()
+
+    try:
+        simulator.run(duration=args.duration, cycles=args.cycles)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stats = simulator.get_stats()
+        simulator.close()
+        print("\n📊 Channel statistics:")
+        for key, value in stats.items():
+            print(f"   {key}: {value}")
+
+if __name__ == '__main__':
+    main()